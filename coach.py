@@ -13,6 +13,7 @@ from src.contracts import (
     TTSService,
 )
 from src.events.events import ReplEvent
+from src.mapstats import backfill_map_stats
 from src.persistence.runtime import build_persistence_services
 from src.runtime.playeridentity import build_player_identity_services
 from src.runtime.settings import (
@@ -42,6 +43,8 @@ def main(debug, repl, trace):
     configure_application_logging(logger=log)
     _install_rich_log_handler(log)
     persistence = build_persistence_services(settings)
+    persistence.replay_store.ensure_indexes()
+    backfill_map_stats(persistence.replay_store, settings=settings)
     player_identity = build_player_identity_services(
         settings,
         replay_store=persistence.replay_store,
@@ -105,6 +108,7 @@ def main(debug, repl, trace):
             session.handle(task)
             signal_queue.task_done()
             if repl and isinstance(task, ReplEvent):
+                session.coach.close()
                 return
         except queue.Empty:
             pass
@@ -113,6 +117,7 @@ def main(debug, repl, trace):
 
             if session.is_active():
                 session.close()
+            session.coach.close()
             if (
                 settings.audiomode in [AudioMode.voice_out, AudioMode.full]
                 and tts is not None
@@ -0,0 +1,112 @@
+"""Compare offset and cursor pagination of ReplayStore.list_replays.
+
+Seeds copies of a parsed replay into a scratch database and times page 1 and
+page 500 in both modes. Cursor mode has no page numbers, so reaching page 500
+walks the cursors of the previous pages first and only the last fetch is timed.
+
+Run from the repository root against a disposable database:
+
+    uv run python playground/benchmarks/api_pagination.py tests/testdata/replays/<file>.SC2Replay mongodb://localhost:27017
+"""
+
+from __future__ import annotations
+
+import sys
+from datetime import timedelta
+from pathlib import Path
+from time import perf_counter
+
+import click
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from pyodmongo.engines.utils import consolidate_dict
+
+from src.persistence.database import MongoDatabase, MongoDatabaseConfig
+from src.persistence.replay_store import ReplayStore
+from src.replays.reader import ReplayReader
+from src.replays.types import Replay
+from src.runtime.settings import get_config
+
+
+def seed(store: ReplayStore, replay: Replay, docs: int) -> None:
+    collection = store.database.raw[Replay._collection]
+    collection.drop()
+    template = consolidate_dict(obj=replay, dct={}, populate=False)
+    batch = []
+    for index in range(docs):
+        batch.append(
+            template
+            | {
+                "_id": f"{index:064x}",
+                # Every tenth replay shares its date, like a batch of imports
+                "date": replay.date - timedelta(minutes=index - index % 10),
+            }
+        )
+        if len(batch) == 1000:
+            collection.insert_many(batch)
+            batch = []
+    if batch:
+        collection.insert_many(batch)
+    store.ensure_indexes()
+
+
+def timed(function, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        function()
+        best = min(best, perf_counter() - start)
+    return best
+
+
+@click.command()
+@click.argument("replay_file")
+@click.argument("dsn")
+@click.option("--db", "db_name", default="sc2coach_pagination_benchmark")
+@click.option("--docs", default=30000, show_default=True)
+@click.option("--per-page", default=50, show_default=True)
+@click.option("--page", "deep_page", default=500, show_default=True)
+@click.option("--repeat", "-r", default=5, show_default=True)
+def main(
+    replay_file: str,
+    dsn: str,
+    db_name: str,
+    docs: int,
+    per_page: int,
+    deep_page: int,
+    repeat: int,
+):
+    settings = get_config().model_copy(update={"replay_cache_dir": None})
+    replay = ReplayReader(settings=settings).load_replay(replay_file)
+    database = MongoDatabase(MongoDatabaseConfig(mongo_uri=dsn, db_name=db_name))
+    store = ReplayStore(database)
+    seed(store, replay, docs)
+
+    after = None
+    for _ in range(deep_page - 1):
+        after = store.list_replays(
+            keyset=True, after=after, docs_per_page=per_page
+        ).next_cursor
+
+    cases = {
+        ("offset", 1): lambda: store.list_replays(docs_per_page=per_page),
+        ("offset", deep_page): lambda: store.list_replays(
+            current_page=deep_page, docs_per_page=per_page
+        ),
+        ("cursor", 1): lambda: store.list_replays(keyset=True, docs_per_page=per_page),
+        ("cursor", deep_page): lambda: store.list_replays(
+            keyset=True, after=after, docs_per_page=per_page
+        ),
+    }
+    click.echo(f"{docs} replays, {per_page} per page, best of {repeat}")
+    for (mode, page), function in cases.items():
+        seconds = timed(function, repeat)
+        click.echo(f"{mode:>6} page {page:>3}: {seconds * 1000:8.1f}ms")
+
+    database.raw.client.drop_database(db_name)
+    database.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Compare the vectorized APMTracker plugin with the former per-event loop.
+
+Run from the repository root:
+
+    uv run python playground/benchmarks/apm_tracker.py tests/testdata/replays
+"""
+
+from __future__ import annotations
+
+import glob
+import math
+import sys
+from collections import defaultdict
+from os.path import basename, isdir, join
+from pathlib import Path
+from time import perf_counter
+
+import click
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import sc2reader
+from src.replays.plugins.APMTracker import APMTracker
+from src.replays.reader import FULL_PROFILE, build_engine
+
+
+def reference_apm_tracker(replay):
+    """The per-event implementation APMTracker replaced."""
+    for player in replay.players:
+        player.aps = defaultdict(int)
+        player.apm = defaultdict(int)
+        player.seconds_played = replay.length.seconds
+
+        for event in player.events:
+            if (
+                event.name == "SelectionEvent"
+                or "CommandEvent" in event.name
+                or "ControlGroup" in event.name
+            ):
+                player.aps[event.second] += 1.4
+                player.apm[int(event.second / 60)] += 1.4
+
+            elif event.name == "PlayerLeaveEvent":
+                player.seconds_played = event.second
+
+        if len(player.apm) > 0 and player.seconds_played > 0:
+            player.avg_apm = (
+                sum(player.aps.values()) / float(player.seconds_played) * 60
+            )
+        else:
+            player.avg_apm = 0
+
+    return replay
+
+
+def snapshot(replay) -> list[tuple]:
+    return [
+        (dict(p.aps), dict(p.apm), p.avg_apm, p.seconds_played) for p in replay.players
+    ]
+
+
+def same_counts(expected: dict, actual: dict) -> bool:
+    return expected.keys() == actual.keys() and all(
+        math.isclose(expected[k], actual[k], rel_tol=1e-9) for k in expected
+    )
+
+
+def timed(func, replay, repeat: int) -> float:
+    best = math.inf
+    for _ in range(repeat):
+        start = perf_counter()
+        func(replay)
+        best = min(best, perf_counter() - start)
+    return best
+
+
+@click.command()
+@click.argument("replays", nargs=-1, required=True)
+@click.option("--repeat", "-r", default=5, show_default=True)
+def main(replays: tuple[str, ...], repeat: int):
+    files = []
+    for replay in replays:
+        files.extend(
+            sorted(glob.glob(join(replay, "*.SC2Replay")))
+            if isdir(replay)
+            else [replay]
+        )
+
+    apm_tracker = APMTracker()
+    total_reference = total_vectorized = 0.0
+    mismatches = 0
+    click.echo(f"{'replay':<50}{'events':>9}{'loop ms':>10}{'numpy ms':>10}  same")
+    # The engine plugins of the coach, EventSecondCorrector sets real-time seconds
+    engine = build_engine(FULL_PROFILE)
+    for file_path in files:
+        replay = sc2reader.load_replay(file_path, engine=engine)
+        events = sum(len(p.events) for p in replay.players)
+
+        expected = snapshot(reference_apm_tracker(replay))
+        actual = snapshot(apm_tracker(replay))
+        same = all(
+            same_counts(e[0], a[0])
+            and same_counts(e[1], a[1])
+            and math.isclose(e[2], a[2], rel_tol=1e-9)
+            and e[3] == a[3]
+            for e, a in zip(expected, actual)
+        )
+        mismatches += not same
+
+        reference = timed(reference_apm_tracker, replay, repeat)
+        vectorized = timed(apm_tracker, replay, repeat)
+        total_reference += reference
+        total_vectorized += vectorized
+        click.echo(
+            f"{basename(file_path)[:48]:<50}{events:>9}"
+            f"{reference * 1000:>10.2f}{vectorized * 1000:>10.2f}  {same}"
+        )
+
+    click.echo(
+        f"{'total':<59}{total_reference * 1000:>10.2f}{total_vectorized * 1000:>10.2f}"
+        f"  {mismatches} mismatches"
+    )
+
+
+if __name__ == "__main__":
+    main()
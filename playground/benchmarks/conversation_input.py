@@ -0,0 +1,111 @@
+"""Time request input assembly of a long conversation over a tool loop.
+
+Seeds a conversation with alternating chat messages and tool calls into a
+scratch database, then runs tool loop iterations that each append a function
+call and its output and assemble the request input. The reload case reads and
+converts the whole history on every iteration, like AICoach did before it
+kept the input in memory.
+
+Run from the repository root against a disposable database:
+
+    uv run python playground/benchmarks/conversation_input.py mongodb://localhost:27017
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+from time import perf_counter
+
+import click
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from src.ai.aicoach import AICoach
+from src.persistence.conversation_store import ConversationStore
+from src.persistence.database import MongoDatabase, MongoDatabaseConfig
+from src.replays.types import AIConversationTrigger, AIMessageRole
+from src.runtime.settings import get_config
+
+
+def seed(store: ConversationStore, items: int) -> str:
+    conversation = store.create_conversation(trigger=AIConversationTrigger.twitch_chat)
+    for index in range(items // 2):
+        if index % 2:
+            store.append_message(
+                conversation, role=AIMessageRole.user, text=f"chat message {index}"
+            )
+            store.append_message(
+                conversation,
+                role=AIMessageRole.assistant,
+                text=f"coach answer {index} " * 20,
+            )
+        else:
+            call_id = f"call-{index}"
+            store.append_function_call(
+                conversation,
+                call_id=call_id,
+                name="QueryReplayDB",
+                arguments={"filter": json.dumps({"map_name": f"Map {index}"})},
+            )
+            store.append_function_call_output(
+                conversation,
+                call_id=call_id,
+                output=json.dumps([{"map_name": f"Map {index}", "result": "Win"}]),
+            )
+    store.flush(conversation)
+    return str(conversation.id)
+
+
+def tool_loop(
+    coach: AICoach, conversation_id: str, iterations: int, reload: bool
+) -> float:
+    store = coach.store
+    start = perf_counter()
+    for index in range(iterations):
+        conversation = store.get_conversation(conversation_id)
+        if reload:
+            coach._rebuild_input(conversation_id)
+        coach._assemble_input(conversation)
+        call_id = f"loop-{reload}-{index}"
+        coach._track_item(
+            store.append_function_call(
+                conversation, call_id=call_id, name="QueryReplayDB", arguments={}
+            )
+        )
+        coach._track_item(
+            store.append_function_call_output(
+                conversation, call_id=call_id, output="[]"
+            )
+        )
+    return perf_counter() - start
+
+
+@click.command()
+@click.argument("dsn")
+@click.option("--db", "db_name", default="sc2coach_conversation_benchmark")
+@click.option("--items", default=500, show_default=True)
+@click.option("--iterations", default=50, show_default=True)
+def main(dsn: str, db_name: str, items: int, iterations: int):
+    database = MongoDatabase(MongoDatabaseConfig(mongo_uri=dsn, db_name=db_name))
+    store = ConversationStore(database)
+    conversation_id = seed(store, items)
+    coach = AICoach(client=object(), store=store, settings=get_config())  # type: ignore[arg-type]
+    coach.set_active_conversation(conversation_id)
+
+    click.echo(f"{items} items, {iterations} tool loop iterations")
+    for reload in (True, False):
+        seconds = tool_loop(coach, conversation_id, iterations, reload)
+        label = "reload" if reload else "incremental"
+        click.echo(
+            f"{label:>11}: {seconds * 1000:8.1f}ms, "
+            f"{seconds / iterations * 1000:6.2f}ms per iteration"
+        )
+
+    database.raw.client.drop_database(db_name)
+    database.close()
+
+
+if __name__ == "__main__":
+    main()
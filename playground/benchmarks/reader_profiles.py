@@ -0,0 +1,55 @@
+"""Time replay loading per ReplayReader profile.
+
+Run from the repository root:
+
+    uv run python playground/benchmarks/reader_profiles.py tests/testdata/replays
+"""
+
+from __future__ import annotations
+
+import glob
+import sys
+from os.path import isdir, join
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+
+import click
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from src.replays.reader import READER_PROFILES, ReplayReader
+from src.runtime.settings import get_config
+
+
+@click.command()
+@click.argument("replays", nargs=-1, required=True)
+@click.option("--repeat", "-r", default=3, show_default=True)
+def main(replays: tuple[str, ...], repeat: int):
+    files = []
+    for replay in replays:
+        files.extend(
+            glob.glob(join(replay, "*.SC2Replay")) if isdir(replay) else [replay]
+        )
+
+    settings = get_config()
+    click.echo(f"{len(files)} replays, best of {repeat} runs")
+    click.echo(f"{'profile':<15}{'total s':>10}{'median ms':>12}")
+    for name, profile in READER_PROFILES.items():
+        best: list[float] | None = None
+        for _ in range(repeat):
+            # A fresh reader per run so the factory cache does not help.
+            reader = ReplayReader(settings=settings, profile=profile)
+            timings = []
+            for file_path in files:
+                start = perf_counter()
+                reader.load_replay_raw(file_path)
+                timings.append(perf_counter() - start)
+            if best is None or sum(timings) < sum(best):
+                best = timings
+        assert best is not None
+        click.echo(f"{name:<15}{sum(best):>10.2f}{median(best) * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Parse-to-Replay throughput in replays per second.
+
+Reports the full ``ReplayReader.load_replay`` path and, separately, the
+``replay_to_dict`` + ``Replay`` validation step on already loaded replays,
+compared with the former extra recursive ``convert_keys_to_strings`` pass.
+
+Run from the repository root:
+
+    uv run python playground/benchmarks/replay_parse.py tests/testdata/replays
+"""
+
+from __future__ import annotations
+
+import glob
+import sys
+from os.path import isdir, join
+from pathlib import Path
+from time import perf_counter
+
+import click
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from src.replays.reader import ReplayReader, replay_to_dict
+from src.replays.types import Replay
+from src.runtime.settings import get_config
+
+
+def convert_keys_to_strings(d):
+    """The recursive pass replay_to_dict used to run over the whole dict."""
+    if isinstance(d, dict):
+        return {str(k): convert_keys_to_strings(v) for k, v in d.items()}
+    elif isinstance(d, list):
+        return [convert_keys_to_strings(i) for i in d]
+    else:
+        return d
+
+
+def rate(count: int, seconds: float) -> str:
+    return f"{count / seconds:,.1f} replays/s ({seconds / count * 1000:.1f}ms each)"
+
+
+@click.command()
+@click.argument("replays", nargs=-1, required=True)
+@click.option("--repeat", "-r", default=5, show_default=True)
+def main(replays: tuple[str, ...], repeat: int):
+    files = []
+    for replay in replays:
+        files.extend(
+            sorted(glob.glob(join(replay, "*.SC2Replay")))
+            if isdir(replay)
+            else [replay]
+        )
+
+    settings = get_config().model_copy(update={"replay_cache_dir": None})
+
+    reader = ReplayReader(settings=settings)
+    raw_replays = []
+    start = perf_counter()
+    for file_path in files:
+        raw_replay = reader.load_replay_raw(file_path)
+        reader.to_typed_replay(raw_replay)
+        raw_replays.append(raw_replay)
+    click.echo(f"full parse:             {rate(len(files), perf_counter() - start)}")
+
+    for raw_replay in raw_replays:
+        replay_dict = replay_to_dict(raw_replay)
+        assert convert_keys_to_strings(replay_dict) == replay_dict, raw_replay.filename
+
+    for label, convert in [
+        ("replay_to_dict + Replay", lambda raw: Replay(**replay_to_dict(raw))),
+        (
+            "former recursive pass",
+            lambda raw: Replay(**convert_keys_to_strings(replay_to_dict(raw))),
+        ),
+    ]:
+        best = None
+        for _ in range(repeat):
+            start = perf_counter()
+            for raw_replay in raw_replays:
+                convert(raw_replay)
+            elapsed = perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        assert best is not None
+        click.echo(f"{label + ':':<24}{rate(len(raw_replays) * 1, best)}")
+
+
+if __name__ == "__main__":
+    main()
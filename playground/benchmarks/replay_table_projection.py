@@ -0,0 +1,91 @@
+"""Payload size and latency of GET /api/replays with the detail and table
+projections.
+
+Seeds copies of the given replays into a scratch database and requests the
+first page through the API app, so model validation and JSON serialization
+are part of the timing.
+
+Run from the repository root against a disposable database:
+
+    uv run python playground/benchmarks/replay_table_projection.py tests/testdata/replays mongodb://localhost:27017
+"""
+
+from __future__ import annotations
+
+import glob
+import sys
+from os.path import isdir, join
+from pathlib import Path
+from time import perf_counter
+
+import click
+from fastapi.testclient import TestClient
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from pyodmongo.engines.utils import consolidate_dict
+
+from src.api.app import create_app
+from src.persistence.runtime import build_persistence_services
+from src.replays.reader import ReplayReader
+from src.replays.types import Replay
+from src.runtime.settings import get_config
+
+
+@click.command()
+@click.argument("replays")
+@click.argument("dsn")
+@click.option("--db", "db_name", default="sc2coach_projection_benchmark")
+@click.option("--docs", default=1000, show_default=True)
+@click.option("--per-page", default=50, show_default=True)
+@click.option("--repeat", "-r", default=10, show_default=True)
+def main(replays: str, dsn: str, db_name: str, docs: int, per_page: int, repeat: int):
+    files = (
+        sorted(glob.glob(join(replays, "*.SC2Replay"))) if isdir(replays) else [replays]
+    )
+    settings = get_config().model_copy(
+        update={"replay_cache_dir": None, "mongo_dsn": dsn, "db_name": db_name}
+    )
+    reader = ReplayReader(settings=settings)
+    templates = []
+    for file_path in files:
+        try:
+            replay = reader.load_replay(file_path)
+        except ValueError:
+            continue
+        templates.append(consolidate_dict(obj=replay, dct={}, populate=False))
+
+    app = create_app(
+        settings_loader=lambda: settings,
+        persistence_builder=build_persistence_services,
+    )
+    with TestClient(app) as client:
+        raw = app.state.persistence.database.raw
+        raw[Replay._collection].drop()
+        raw[Replay._collection].insert_many(
+            templates[index % len(templates)] | {"_id": f"{index:064x}"}
+            for index in range(docs)
+        )
+        app.state.persistence.replay_store.ensure_indexes()
+
+        click.echo(f"{docs} replays, {per_page} per page, best of {repeat}")
+        for projection in ("detail", "table"):
+            best = float("inf")
+            for _ in range(repeat):
+                start = perf_counter()
+                response = client.get(
+                    "/api/replays",
+                    params={"projection": projection, "docs_per_page": per_page},
+                )
+                best = min(best, perf_counter() - start)
+            response.raise_for_status()
+            click.echo(
+                f"{projection:>6}: {len(response.content) / 1024:10,.1f} KiB"
+                f" {best * 1000:8.1f}ms"
+            )
+
+        raw.client.drop_database(db_name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Compare the streaming player_worker_micro with the former row-based version.
+
+Run from the repository root:
+
+    uv run python playground/benchmarks/worker_micro.py tests/testdata/replays
+"""
+
+from __future__ import annotations
+
+import glob
+import math
+import sys
+from os.path import basename, isdir, join
+from pathlib import Path
+from time import perf_counter
+
+import click
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import sc2reader
+from src.replays.plugins.ReplayStats import (
+    MAX_TIME_TO_ANALYZE,
+    WORKERS,
+    player_worker_micro,
+)
+from src.replays.reader import FULL_PROFILE, build_engine
+
+
+def reference_player_worker_micro(replay) -> dict[int, tuple]:
+    """The row-based implementation player_worker_micro replaced."""
+    columns = [
+        "time",
+        "player",
+        "player_sid",
+        "event",
+        "object",
+        "action",
+        "target",
+        "target_type",
+    ]
+    rep = []
+
+    skip = [
+        "CameraEvent",
+        "PlayerStatsEvent",
+        "ControlGroupEvent",
+        "SetControlGroupEvent",
+        "GetControlGroupEvent",
+        "ProgressEvent",
+    ]
+
+    for event in replay.game_events:
+        if event.second > MAX_TIME_TO_ANALYZE:
+            break
+
+        if event.name in skip:
+            continue
+
+        values = [
+            event.second,
+            event.player.name if hasattr(event, "player") else np.nan,
+            event.player.sid if hasattr(event, "player") else np.nan,
+            event.name,
+            (
+                event.objects[0].name
+                if hasattr(event, "objects") and len(event.objects) > 0
+                else np.nan
+            ),
+            (event.ability_name if hasattr(event, "ability_name") else np.nan),
+            (
+                event.target.name
+                if hasattr(event, "target") and hasattr(event.target, "name")
+                else np.nan
+            ),
+            (
+                event.target.type
+                if hasattr(event, "target") and hasattr(event.target, "type")
+                else np.nan
+            ),
+        ]
+        rep.append(dict(zip(columns, values)))
+
+    ret = {}
+    for player in replay.players:
+        p = [r for r in rep if r["player_sid"] == player.sid]
+        ret[player.sid] = reference_micro_score(p)
+    return ret
+
+
+def reference_micro_score(p0: list) -> tuple:
+    micro_score = 0
+    split_score = 0
+    found_unit_target = False
+    for row in reversed(p0):
+        if (
+            row["event"] == "SelectionEvent"
+            and found_unit_target
+            and row["object"] in WORKERS
+        ):
+            if row["time"] > 2:
+                micro_score += 1
+            else:
+                split_score += 1
+
+        if (
+            row["event"] == "TargetPointCommandEvent"
+            or row["event"] == "UpdateTargetPointCommandEvent"
+        ):
+            continue
+        if row["event"] == "UpdateTargetUnitCommandEvent":
+            if "MineralField" in row["target"]:
+                found_unit_target = True
+                continue
+        else:
+            found_unit_target = False
+    return (split_score, micro_score)
+
+
+def timed(func, replay, repeat: int) -> float:
+    best = math.inf
+    for _ in range(repeat):
+        start = perf_counter()
+        func(replay)
+        best = min(best, perf_counter() - start)
+    return best
+
+
+@click.command()
+@click.argument("replays", nargs=-1, required=True)
+@click.option("--repeat", "-r", default=20, show_default=True)
+def main(replays: tuple[str, ...], repeat: int):
+    files = []
+    for replay in replays:
+        files.extend(
+            sorted(glob.glob(join(replay, "*.SC2Replay")))
+            if isdir(replay)
+            else [replay]
+        )
+
+    total_reference = total_streaming = 0.0
+    mismatches = 0
+    click.echo(f"{'replay':<50}{'rows ms':>10}{'stream ms':>11}  result")
+    # The engine plugins of the coach, EventSecondCorrector sets real-time seconds
+    engine = build_engine(FULL_PROFILE)
+    for file_path in files:
+        replay = sc2reader.load_replay(file_path, engine=engine)
+
+        expected = reference_player_worker_micro(replay)
+        actual = player_worker_micro(replay)
+        mismatches += expected != actual
+
+        reference = timed(reference_player_worker_micro, replay, repeat)
+        streaming = timed(player_worker_micro, replay, repeat)
+        total_reference += reference
+        total_streaming += streaming
+        click.echo(
+            f"{basename(file_path)[:48]:<50}{reference * 1000:>10.3f}"
+            f"{streaming * 1000:>11.3f}  {actual}{'' if expected == actual else ' MISMATCH'}"
+        )
+
+    click.echo(
+        f"{'total':<50}{total_reference * 1000:>10.3f}{total_streaming * 1000:>11.3f}"
+        f"  {mismatches} mismatches"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -21,12 +21,14 @@ from rich.theme import Theme
 
 from src.ai.utils import force_valid_json_string
 from src.playeridentity import PlayerIdentityEnrichmentError
+from src.replays.ingest import ReplayParseResult, parse_replay_files
 from src.runtime.playeridentity import build_player_identity_services
 from src.runtime.settings import Config, get_config
 
 if TYPE_CHECKING:
     from src.persistence.replay_store import PlayerInfo, ReplayStore
     from src.playeridentity import PlayerIdentityEnricher
+    from src.replays.manifest import ReplayManifest
     from src.replays.reader import ReplayReader
     from src.replays.types import Replay
 
@@ -39,6 +41,9 @@ custom_theme = Theme(
 
 console = Console(theme=custom_theme)
 
+# Replays written per bulk write during a sync
+REPLAY_BATCH_SIZE = 100
+
 
 @dataclass
 class RepCliRuntime:
@@ -48,6 +53,7 @@ class RepCliRuntime:
     replay_model: type["Replay"]
     player_info_model: type["PlayerInfo"]
     player_identity_enricher: "PlayerIdentityEnricher"
+    replay_manifest: "ReplayManifest | None" = None
 
 
 def load_runtime_settings() -> "Config":
@@ -76,10 +82,12 @@ def _build_runtime() -> RepCliRuntime:
 
     from src.persistence.replay_store import PlayerInfo
     from src.persistence.runtime import build_persistence_services
+    from src.replays.manifest import ReplayManifest
     from src.replays.reader import ReplayReader
     from src.replays.types import Replay
 
     persistence = build_persistence_services(settings)
+    persistence.replay_store.ensure_indexes()
     player_identity = build_player_identity_services(
         settings,
         replay_store=persistence.replay_store,
@@ -92,6 +100,7 @@ def _build_runtime() -> RepCliRuntime:
         replay_model=Replay,
         player_info_model=PlayerInfo,
         player_identity_enricher=player_identity.enricher,
+        replay_manifest=ReplayManifest(persistence.replay_store),
     )
 
 
@@ -139,6 +148,7 @@ class SyncSummary(Summary):
     portraits_added: int = Field(title="Portraits added", default=0)
     portraits_constructed: int = Field(title="Portraits constructed", default=0)
     filtered_replays: int = Field(title="Filtered replays", default=0)
+    unchanged_replays: int = Field(title="Unchanged replays skipped", default=0)
     players: Annotated[list[str], False] = []
 
 
@@ -227,8 +237,28 @@ def cli(ctx, clean, debug, simulation, verbose, add_student):
     default=False,
     help="Create or update a player record for the configured student during this sync",
 )
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of processes used to parse replays",
+)
+@click.option(
+    "--rescan",
+    is_flag=True,
+    default=False,
+    help="Parse every replay again, even if the sync manifest lists it as unchanged",
+)
 def sync(
-    ctx, from_: datetime, to_: datetime, from_most_recent: bool, add_student: bool
+    ctx,
+    from_: datetime,
+    to_: datetime,
+    from_most_recent: bool,
+    add_student: bool,
+    workers: int,
+    rescan: bool,
 ):
     """Sync replays and players from replay folder to MongoDB"""
     ctx.obj["ADD_STUDENT"] = _student_sync_enabled(ctx, add_student)
@@ -262,60 +292,120 @@ def sync(
     list_of_files.sort(key=getmtime)
     console.print(f"Found {len(list_of_files)} potential replays to sync")
 
-    summary = _sync(list_of_files, ctx, runtime)
+    summary = _sync(list_of_files, ctx, runtime, workers=workers, rescan=rescan)
 
     console.print(summary.to_table())
 
 
-def _sync(list_of_files, ctx, runtime: RepCliRuntime) -> SyncSummary:
+def _sync(
+    list_of_files,
+    ctx,
+    runtime: RepCliRuntime,
+    workers: int = 1,
+    rescan: bool = False,
+) -> SyncSummary:
     summary = SyncSummary()
     summary.total_replays = len(list_of_files)
+    manifest = runtime.replay_manifest
+
+    # Unchanged files listed in the manifest are settled with a stat call;
+    # filtered ones replay their recorded outcome so --clean still applies.
+    files_to_parse = list_of_files
+    if manifest is not None and not rescan:
+        manifest.preload(list_of_files)
+        files_to_parse = []
+        for file_path in list_of_files:
+            entry = manifest.lookup(file_path)
+            if entry is None:
+                files_to_parse.append(file_path)
+            elif entry.imported:
+                summary.unchanged_replays += 1
+            else:
+                _sync_filtered(
+                    ctx,
+                    ReplayParseResult.from_manifest_entry(file_path, entry),
+                    summary,
+                )
 
-    for file_path in list_of_files:
-        replay_raw = runtime.reader.load_replay_raw(file_path)
-        if runtime.reader.apply_filters(replay_raw):
-            console.print(f"Adding {basename(file_path)}")
-            replay = runtime.reader.to_typed_replay(replay_raw)
+    # Parsing may run in worker processes; DB writes, summary accounting and
+    # deletions always happen here so results match the serial mode. Accepted
+    # replays are written in batches with one bulk write each.
+    pending: list[ReplayParseResult] = []
+    for parsed in parse_replay_files(
+        files_to_parse, reader=runtime.reader, workers=workers
+    ):
+        if parsed.replay is not None:
+            console.print(f"Adding {basename(parsed.file_path)}")
+            replay = parsed.replay
 
-            syncreplay(ctx, replay, summary, runtime)
             syncplayer(ctx, replay, summary, runtime)
             if ctx.obj["ADD_STUDENT"]:
                 syncstudent(ctx, replay, summary, runtime)
+            pending.append(parsed)
+            if len(pending) >= REPLAY_BATCH_SIZE:
+                _flush_replays(ctx, pending, summary, runtime)
+                pending = []
         else:
-            console.print(f"Filtered {basename(file_path)}")
-            summary.filtered_replays += 1
-            if runtime.reader.is_archon_mode(replay_raw):
-                console.print(
-                    f":couple: Archon mode is not supported {basename(file_path)}"
-                )
-                continue
-            if runtime.reader.is_instant_leave(replay_raw):
-                summary.instant_leave_replays += 1
-                if ctx.obj["CLEAN"]:
-                    summary.deleted_replays += 1
-                    os.remove(file_path)
-                    console.print(f":litter_in_bin_sign: Deleted {basename(file_path)}")
-                    continue
-            if runtime.reader.has_afk_player(replay_raw):
-                summary.afk_replays += 1
-                if ctx.obj["CLEAN"]:
-                    summary.deleted_replays += 1
-                    os.remove(file_path)
-                    console.print(f":litter_in_bin_sign: Deleted {basename(file_path)}")
-                    continue
+            _sync_filtered(ctx, parsed, summary)
+            if manifest is not None and not ctx.obj["SIMULATION"]:
+                manifest.record(parsed, imported=False)
+
+    if pending:
+        _flush_replays(ctx, pending, summary, runtime)
     return summary
 
 
+def _flush_replays(
+    ctx, pending: list[ReplayParseResult], summary: SyncSummary, runtime
+) -> None:
+    stored = syncreplays(ctx, [parsed.replay for parsed in pending], summary, runtime)
+    manifest = runtime.replay_manifest
+    if manifest is None or ctx.obj["SIMULATION"]:
+        return
+    for parsed in pending:
+        manifest.record(parsed, imported=str(parsed.replay.id) in stored)
+
+
+def _sync_filtered(ctx, parsed: ReplayParseResult, summary: SyncSummary) -> None:
+    file_path = parsed.file_path
+    console.print(f"Filtered {basename(file_path)}")
+    summary.filtered_replays += 1
+    if parsed.is_archon_mode:
+        console.print(f":couple: Archon mode is not supported {basename(file_path)}")
+        return
+    if parsed.is_instant_leave:
+        summary.instant_leave_replays += 1
+        if ctx.obj["CLEAN"]:
+            summary.deleted_replays += 1
+            os.remove(file_path)
+            console.print(f":litter_in_bin_sign: Deleted {basename(file_path)}")
+            return
+    if parsed.has_afk_player:
+        summary.afk_replays += 1
+        if ctx.obj["CLEAN"]:
+            summary.deleted_replays += 1
+            os.remove(file_path)
+            console.print(f":litter_in_bin_sign: Deleted {basename(file_path)}")
+            return
+
+
 @cli.command()
 @click.option("--logfile", "-l", type=click.Path(), help="Log file for stack traces")
-def validate(logfile):
+@click.option(
+    "--batch-size",
+    type=click.IntRange(min=1),
+    default=100,
+    show_default=True,
+    help="Replays fetched from the DB per round trip",
+)
+def validate(logfile, batch_size):
     "Validate all replays in the DB. Shows replays in DB which can't be read"
 
     runtime = _get_runtime(click.get_current_context())
     summary = ValidationSummary()
 
     for replay in runtime.replay_store.find_many_dict(
-        runtime.replay_model, raw_query={}
+        runtime.replay_model, raw_query={}, batch_size=batch_size
     ):
         console.print(f"Validating {basename(replay['filename'])}", end=" ")
         try:
@@ -353,20 +443,35 @@ def players(ctx, query):
     query = force_valid_json_string(query)
     query = json.loads(query)
 
-    players = runtime.replay_store.db.find_many(
+    for document in runtime.replay_store.find_many_dict(
         runtime.player_info_model, raw_query=query
-    )
-
-    if not isinstance(players, list):
-        console.print(f":x: Expected list of players, got {type(players).__name__}")
-        return
-
-    for player in players:
+    ):
+        player = runtime.player_info_model.model_validate(document)
         console.print_json(str(player))
         if ctx.obj["VERBOSE"]:
             print_player_portrait(player)
 
 
+@cli.group()
+@click.pass_context
+def mapstats(ctx):
+    "Maintain the per-day map stats of the student"
+    pass
+
+
+@mapstats.command()
+@click.pass_context
+def rebuild(ctx):
+    """Recount the map stats from all replays in the DB"""
+    from src.mapstats import rebuild_map_stats
+
+    runtime = _get_runtime(ctx)
+    games = rebuild_map_stats(runtime.replay_store, settings=runtime.settings)
+    console.print(
+        f":white_heavy_check_mark: Counted {games} games of {runtime.settings.student.name}"
+    )
+
+
 @cli.command()
 @click.pass_context
 @click.argument("replay", type=click.Path(exists=False), required=True, nargs=-1)
@@ -376,7 +481,15 @@ def players(ctx, query):
     default=False,
     help="Create or update a player record for the configured student during this import",
 )
-def add(ctx, replay, add_student):
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of processes used to parse replays",
+)
+def add(ctx, replay, add_student, workers):
     """Add one or more replays to the DB"""
     ctx.obj["ADD_STUDENT"] = _student_sync_enabled(ctx, add_student)
     runtime = _get_runtime(ctx)
@@ -396,7 +509,7 @@ def add(ctx, replay, add_student):
         console.print(f":x: No replays found for {replay}")
         return
 
-    summary = _sync(list_of_files, ctx, runtime)
+    summary = _sync(list_of_files, ctx, runtime, workers=workers, rescan=True)
 
     console.print(summary.to_table())
 
@@ -481,16 +594,35 @@ def syncstudent(ctx, replay, summary: SyncSummary, runtime: RepCliRuntime):
         )
 
 
-def syncreplay(ctx, replay, summary: SyncSummary, runtime: RepCliRuntime):
+def syncreplays(
+    ctx, replays: list["Replay"], summary: SyncSummary, runtime: RepCliRuntime
+) -> set[str]:
+    """Upsert ``replays`` with a bulk write and return the ids that were stored."""
     if ctx.obj["SIMULATION"]:
-        console.print(f"Simulation, would add {replay}")
-    else:
-        result = runtime.replay_store.upsert(replay)
-        if result.acknowledged:
-            console.print(f":white_heavy_check_mark: {replay} added to DB")
-            summary.replays_added += 1
-        else:
-            console.print(f":x: {replay} not added to DB")
+        for replay in replays:
+            console.print(f"Simulation, would add {replay}")
+        return set()
+
+    result = runtime.replay_store.bulk_upsert(replays, batch_size=REPLAY_BATCH_SIZE)
+    errors = {error.id: error for error in result.errors}
+    stored = set()
+    for replay in replays:
+        error = errors.get(str(replay.id))
+        if error is not None:
+            console.print(f":x: {replay} not added to DB: {error.message}")
+            continue
+        console.print(f":white_heavy_check_mark: {replay} added to DB")
+        summary.replays_added += 1
+        stored.add(str(replay.id))
+
+    from src.mapstats import record_map_stats
+
+    record_map_stats(
+        [replay for replay in replays if str(replay.id) in stored],
+        runtime.replay_store,
+        settings=runtime.settings,
+    )
+    return stored
 
 
 if __name__ == "__main__":
@@ -1,7 +1,11 @@
 import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from datetime import datetime
 from hashlib import sha256
+from time import monotonic
 from typing import Any, Generator, Literal, Optional, Type, TypeVar
 
 from openai import OpenAI
@@ -42,13 +46,24 @@ class AICoach:
         self.replay_store = replay_store
         self.trace = trace
         self.active_conversation_id: str | None = None
+        # Request input of one conversation, extended as the coach appends items
+        self._input_conversation_id: str | None = None
+        self._input_items: list[dict[str, Any]] = []
+        self._input_item_count = 0
         self.init_additional_instructions()
         self._init_functions()
 
     def _init_functions(self):
         configured_functions = build_ai_functions(self.replay_store)
         self.functions = {function.name: function for function in configured_functions}
+        self.tools = responses_tools(configured_functions)
         self.max_tool_iterations = 8
+        # Tool calls run concurrently on one pool, at most this many at once
+        self.max_parallel_tools = 4
+        self.tool_timeout = 30.0
+        self._tool_executor = ThreadPoolExecutor(
+            max_workers=self.max_parallel_tools, thread_name_prefix="aicoach-tool"
+        )
 
     def init_additional_instructions(self, more_instructions: str = ""):
         """Store optional per-conversation developer guidance for future requests."""
@@ -90,6 +105,7 @@ class AICoach:
             conversation.developer_instructions = self.additional_instructions
             self.store.save(conversation)
         self.active_conversation_id = str(conversation.id)
+        self._rebuild_input(self.active_conversation_id)
         log.debug(f"Created conversation {self.active_conversation_id}")
         return self.active_conversation_id
 
@@ -106,8 +122,16 @@ class AICoach:
             role=role,
             text=message,
         )
+        self._track_item(item)
+        # No tool turn follows a message added here to write it out
+        self.store.flush(self.active_conversation_id)
         return str(item.id)
 
+    def close(self) -> None:
+        """Write conversation items the store still buffers and stop the tool pool."""
+        self.store.flush()
+        self._tool_executor.shutdown(wait=False, cancel_futures=True)
+
     def stream_conversation(self):
         if self.active_conversation_id is None:
             self.create_conversation()
@@ -125,6 +149,7 @@ class AICoach:
         if conversation is None:
             raise ValueError(f"Conversation {conversation_id} not found")
         self.active_conversation_id = str(conversation.id)
+        self._rebuild_input(self.active_conversation_id)
 
     def get_conversation_id(self) -> str | None:
         return self.active_conversation_id
@@ -147,8 +172,10 @@ class AICoach:
         if conversation is None:
             raise ValueError(f"Conversation {conversation_id} not found")
 
-        self.store.append_message(
-            conversation, role=AIMessageRole.user, text=message_text
+        self._track_item(
+            self.store.append_message(
+                conversation, role=AIMessageRole.user, text=message_text
+            )
         )
 
         for _ in range(self.max_tool_iterations):
@@ -164,15 +191,18 @@ class AICoach:
                 continue
 
             response_text = self._extract_response_text(response)
-            self.store.append_assistant_response(
-                conversation,
-                text=response_text,
-                response_id=getattr(response, "id", None),
-                model=getattr(response, "model", None),
+            self._track_item(
+                self.store.append_assistant_response(
+                    conversation,
+                    text=response_text,
+                    response_id=getattr(response, "id", None),
+                    model=getattr(response, "model", None),
+                )
             )
             self.store.record_response(conversation, response)
             return response_text
 
+        self.store.flush(conversation_id)
         log.warning(
             f"Tool loop exceeded max iterations for conversation {conversation_id}"
         )
@@ -211,13 +241,13 @@ class AICoach:
                 conversation,
                 additional_instructions=additional_instructions,
             ),
-            "input": self._assemble_input(conversation),
+            "input": [*self._assemble_input(conversation), self._clock_input()],
             "store": False,
             "prompt_cache_key": self._prompt_cache_key(conversation),
         }
 
         if include_tools:
-            request_kwargs["tools"] = responses_tools(list(self.functions.values()))
+            request_kwargs["tools"] = self.tools
 
         include = self._include_param()
         if include is not None:
@@ -238,8 +268,8 @@ class AICoach:
         additional_instructions: str | None = None,
     ) -> str:
         sections = [
-            Templates.initial_instructions.render(
-                {"student": str(self.settings.student.name)}
+            Templates.render_static(
+                "initial_instructions.jinja2", student=str(self.settings.student.name)
             ).strip(),
         ]
 
@@ -255,25 +285,48 @@ class AICoach:
         if inline_instructions:
             sections.append(inline_instructions)
 
-        sections.append(
-            Templates.additional_instructions.render(
+        return "\n\n".join(section for section in sections if section)
+
+    def _clock_input(self) -> dict[str, Any]:
+        # The clock changes on every request. As the last input item it keeps
+        # tools, instructions and history a stable prefix for the prompt cache.
+        now = datetime.now()
+        return {
+            "role": "developer",
+            "content": Templates.additional_instructions.render(
                 {
-                    "today": datetime.now().strftime("%A, %B %d, %Y"),
-                    "timestamp": datetime.now().timestamp(),
+                    "today": now.strftime("%A, %B %d, %Y"),
+                    "timestamp": now.timestamp(),
                 }
-            ).strip()
-        )
-
-        return "\n\n".join(section for section in sections if section)
+            ).strip(),
+        }
 
     def _assemble_input(self, conversation) -> list[dict[str, Any]]:
-        # Chapter 5 intentionally replays the full persisted history on every request.
-        input_items: list[dict[str, Any]] = []
-        for item in self.store.list_items(conversation):
-            assembled = self._conversation_item_to_input(item)
-            if assembled is not None:
-                input_items.append(assembled)
-        return input_items
+        # Chapter 5 intentionally replays the full history on every request. It
+        # is kept in memory and only reloaded for another conversation or when
+        # items were appended by someone else.
+        conversation_id = str(conversation.id)
+        if (
+            conversation_id != self._input_conversation_id
+            or conversation.item_count != self._input_item_count
+        ):
+            self._rebuild_input(conversation_id)
+        return list(self._input_items)
+
+    def _rebuild_input(self, conversation_id: str) -> None:
+        self._input_conversation_id = conversation_id
+        self._input_items = []
+        self._input_item_count = 0
+        for item in self.store.list_items(conversation_id):
+            self._track_item(item)
+
+    def _track_item(self, item) -> None:
+        if str(item.conversation) != self._input_conversation_id:
+            return
+        assembled = self._conversation_item_to_input(item)
+        if assembled is not None:
+            self._input_items.append(assembled)
+        self._input_item_count += 1
 
     def _conversation_item_to_input(self, item) -> dict[str, Any] | None:
         if item.type == "message":
@@ -382,45 +435,85 @@ class AICoach:
         conversation,
         function_calls: list[dict[str, Any]],
     ) -> None:
-        for function_call in function_calls:
-            name = function_call["name"]
-            call_id = function_call["call_id"]
-            arguments = function_call["arguments"]
-            response_id = function_call.get("response_id")
+        outputs = self._invoke_tools(function_calls)
 
-            self.store.append_function_call(
-                conversation,
-                call_id=call_id,
-                name=name,
-                arguments=arguments,
-                response_id=response_id,
+        for function_call, output in zip(function_calls, outputs):
+            call_id = function_call["call_id"]
+            self._track_item(
+                self.store.append_function_call(
+                    conversation,
+                    call_id=call_id,
+                    name=function_call["name"],
+                    arguments=function_call["arguments"],
+                    response_id=function_call.get("response_id"),
+                )
             )
-            log.info(
-                "Executing tool %s with input %s",
-                name,
-                json.dumps(arguments, default=str, sort_keys=True),
+            self._track_item(
+                self.store.append_function_call_output(
+                    conversation,
+                    call_id=call_id,
+                    output=output,
+                )
             )
 
-            tool = self.functions.get(name)
-            if tool is None:
-                output = json.dumps({"error": f"Unknown tool: {name}"})
-                log.warning(f"Unknown tool requested by model: {name}")
-            else:
-                try:
-                    result = tool.invoke(arguments)
-                    output = self._stringify_tool_output(result)
-                    log.info(f"Tool {name} completed")
-                except Exception as exc:  # noqa: BLE001
-                    log.exception(f"Tool {name} failed")
-                    output = json.dumps(
-                        {"error": f"Tool {name} failed", "details": str(exc)}
-                    )
+    def _invoke_tools(self, function_calls: list[dict[str, Any]]) -> list[str]:
+        started = [threading.Event() for _ in function_calls]
+        started_at = [0.0] * len(function_calls)
 
-            self.store.append_function_call_output(
-                conversation,
-                call_id=call_id,
-                output=output,
-            )
+        def invoke(index: int, function_call: dict[str, Any]) -> str:
+            started_at[index] = monotonic()
+            started[index].set()
+            return self._invoke_tool(function_call["name"], function_call["arguments"])
+
+        futures = [
+            self._tool_executor.submit(invoke, index, function_call)
+            for index, function_call in enumerate(function_calls)
+        ]
+        outputs = []
+        for index, (function_call, future) in enumerate(zip(function_calls, futures)):
+            name = function_call["name"]
+            # The timeout runs from when the tool starts, a tool that gets no
+            # worker within it because others hang is given up as well
+            if not started[index].wait(self.tool_timeout):
+                future.cancel()
+                outputs.append(self._tool_timeout_output(name))
+                continue
+            remaining = started_at[index] + self.tool_timeout - monotonic()
+            try:
+                outputs.append(future.result(max(0, remaining)))
+            except FutureTimeoutError:
+                outputs.append(self._tool_timeout_output(name))
+        return outputs
+
+    def _tool_timeout_output(self, name: str) -> str:
+        log.warning(f"Tool {name} timed out after {self.tool_timeout}s")
+        return json.dumps(
+            {
+                "error": f"Tool {name} timed out",
+                "details": f"No result after {self.tool_timeout}s",
+            }
+        )
+
+    def _invoke_tool(self, name: str, arguments: dict[str, Any]) -> str:
+        log.info(
+            "Executing tool %s with input %s",
+            name,
+            json.dumps(arguments, default=str, sort_keys=True),
+        )
+
+        tool = self.functions.get(name)
+        if tool is None:
+            log.warning(f"Unknown tool requested by model: {name}")
+            return json.dumps({"error": f"Unknown tool: {name}"})
+
+        try:
+            result = tool.invoke(arguments)
+            output = self._stringify_tool_output(result)
+            log.info(f"Tool {name} completed")
+        except Exception as exc:  # noqa: BLE001
+            log.exception(f"Tool {name} failed")
+            output = json.dumps({"error": f"Tool {name} failed", "details": str(exc)})
+        return output
 
     def _parse_function_arguments(self, arguments: Any) -> dict[str, Any]:
         if arguments is None:
@@ -517,8 +610,10 @@ class AICoach:
         if conversation is None:
             raise ValueError(f"Conversation {conversation_id} not found")
 
-        self.store.append_message(
-            conversation, role=AIMessageRole.user, text=message_text
+        self._track_item(
+            self.store.append_message(
+                conversation, role=AIMessageRole.user, text=message_text
+            )
         )
         response_format = self._structured_response_format(schema)
 
@@ -540,15 +635,18 @@ class AICoach:
                 continue
 
             response_text = self._extract_response_text(response)
-            self.store.append_assistant_response(
-                conversation,
-                text=response_text,
-                response_id=getattr(response, "id", None),
-                model=getattr(response, "model", None),
+            self._track_item(
+                self.store.append_assistant_response(
+                    conversation,
+                    text=response_text,
+                    response_id=getattr(response, "id", None),
+                    model=getattr(response, "model", None),
+                )
             )
             self.store.record_response(conversation, response)
             return schema.model_validate_json(response_text)
 
+        self.store.flush(conversation_id)
         raise RuntimeError(
             f"Structured tool loop exceeded max iterations for conversation {conversation_id}"
         )
@@ -583,8 +681,10 @@ class AICoach:
         if conversation is None:
             raise ValueError(f"Conversation {conversation_id} not found")
 
-        self.store.append_message(
-            conversation, role=AIMessageRole.user, text=message_text
+        self._track_item(
+            self.store.append_message(
+                conversation, role=AIMessageRole.user, text=message_text
+            )
         )
         yield from self._stream_until_done(conversation_id)
 
@@ -605,11 +705,13 @@ class AICoach:
                 yield response_text
 
             if response_text:
-                self.store.append_assistant_response(
-                    conversation,
-                    text=response_text,
-                    response_id=getattr(response, "id", None),
-                    model=getattr(response, "model", None),
+                self._track_item(
+                    self.store.append_assistant_response(
+                        conversation,
+                        text=response_text,
+                        response_id=getattr(response, "id", None),
+                        model=getattr(response, "model", None),
+                    )
                 )
 
             self.store.record_response(conversation, response, streamed=True)
@@ -620,6 +722,7 @@ class AICoach:
 
             return
 
+        self.store.flush(conversation_id)
         log.warning(
             f"Tool loop exceeded max iterations for conversation {conversation_id}"
         )
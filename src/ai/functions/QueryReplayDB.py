@@ -1,12 +1,10 @@
 import logging
-from typing import Annotated, cast
+from typing import Annotated, Any
 
 from bson.json_util import dumps, loads
 from pydantic import BaseModel, ConfigDict, Field
-from pyodmongo import ResponsePaginate
 
 from src.persistence.replay_store import ReplayStore, get_replay_store
-from src.replays.types import Replay
 from src.runtime.settings import get_config
 
 from ..utils import force_valid_json_string
@@ -178,27 +176,127 @@ def _query_replay_db(
 
     try:
         replay_store = replay_store or get_replay_store()
-        response = cast(
-            ResponsePaginate,
-            replay_store.db.find_many(
-                Model=Replay,
-                paginate=True,
-                current_page=1,
-                docs_per_page=limit,
-                raw_query=loads(str(filter)),
-                raw_sort=loads(str(sort)),
-            ),
+        return replay_store.aggregate_replays(
+            query_pipeline(
+                loads(str(filter)),
+                projection=loads(projection),
+                sort=loads(str(sort)),
+                limit=limit,
+                limit_time=limit_time,
+            )
         )
-        result_replays: list[Replay] = response.docs
-        return [
-            result_replay.projection(limit=limit_time, projection=loads(projection))
-            for result_replay in result_replays
-        ]
     except Exception as e:
         log.error(e)
         return []
 
 
+# Player arrays whose elements carry a "m:ss" time string and are cut at limit_time
+TIMED_PLAYER_ARRAYS = ("build_order", "abilities_used", "units_lost")
+
+
+def _seconds(time: str) -> dict:
+    """Aggregation expression for ``src.util.time2secs`` of a "m:ss" string."""
+    parts = {"$split": [time, ":"]}
+    return {
+        "$add": [
+            {"$multiply": [{"$toInt": {"$arrayElemAt": [parts, 0]}}, 60]},
+            {"$toInt": {"$arrayElemAt": [parts, 1]}},
+        ]
+    }
+
+
+def _trimmed_array(field: str, limit_time: int | None) -> dict:
+    array = f"$$player.{field}"
+    elements: Any = array
+    if limit_time is not None:
+        elements = {
+            "$filter": {
+                "input": array,
+                "as": "item",
+                "cond": {"$lte": [_seconds("$$item.time"), limit_time]},
+            }
+        }
+    if field == "build_order":
+        # Only chrono boosted entries keep the flag, like Replay.projection
+        elements = {
+            "$map": {
+                "input": elements,
+                "as": "item",
+                "in": {
+                    "$cond": [
+                        {"$eq": ["$$item.is_chronoboosted", True]},
+                        "$$item",
+                        {
+                            "$unsetField": {
+                                "field": "is_chronoboosted",
+                                "input": "$$item",
+                            }
+                        },
+                    ]
+                },
+            }
+        }
+    return {"$cond": [{"$isArray": array}, elements, "$$REMOVE"]}
+
+
+def _project_stage(projection: dict) -> dict:
+    """Map the projection onto the stored document, where ``id`` is ``_id``.
+
+    Like ``Replay.projection``, the id is only returned when it is asked for.
+    """
+    projection = dict(projection)
+    if "id" in projection:
+        projection["_id"] = projection.pop("id")
+    if any(projection.values()):
+        projection.setdefault("_id", 0)
+    return {"$project": projection}
+
+
+def query_pipeline(
+    filter: dict,
+    *,
+    projection: dict,
+    sort: dict | None = None,
+    limit: int = 10,
+    limit_time: int | None = None,
+) -> list[dict]:
+    """Aggregation pipeline which returns the QueryReplayDB result documents.
+
+    Projection and ``limit_time`` trimming run in MongoDB so only the requested
+    fields leave the database, and the results skip ``Replay`` validation.
+    """
+    pipeline: list[dict] = [{"$match": filter}]
+    if sort:
+        pipeline.append({"$sort": sort})
+    pipeline.append({"$limit": limit})
+    pipeline.append(
+        {
+            "$set": {
+                "players": {
+                    "$map": {
+                        "input": "$players",
+                        "as": "player",
+                        "in": {
+                            "$mergeObjects": [
+                                "$$player",
+                                {
+                                    field: _trimmed_array(field, limit_time)
+                                    for field in TIMED_PLAYER_ARRAYS
+                                },
+                            ]
+                        },
+                    }
+                }
+            }
+        }
+    )
+    if projection:
+        pipeline.append(_project_stage(projection))
+    pipeline.append({"$set": {"id": "$_id"}})
+    pipeline.append({"$unset": "_id"})
+    return pipeline
+
+
 def build_query_replay_db_function(replay_store: ReplayStore):
     return AIFunction(
         fn=lambda **kwargs: _query_replay_db(replay_store=replay_store, **kwargs),
@@ -7,7 +7,9 @@ from openai.lib._pydantic import to_strict_json_schema
 from pydantic import BaseModel
 
 
+@functools.cache
 def strict_json_schema(model: type[BaseModel]) -> dict[str, Any]:
+    # Generated once per model and shared by every request, do not mutate
     return to_strict_json_schema(model)
 
 
@@ -25,6 +27,7 @@ class AIFunction:
         self.args_model = args_model
         self.name = name or fn.__name__
         self.description = inspect.cleandoc(description or inspect.getdoc(fn) or "")
+        self._json: dict[str, Any] | None = None
 
     def __call__(self, *args, **kwargs):
         return self.fn(*args, **kwargs)
@@ -42,10 +45,12 @@ class AIFunction:
         return self.fn(**kwargs)
 
     def json(self) -> dict[str, Any]:
-        return {
-            "type": "function",
-            "name": self.name,
-            "description": self.description,
-            "parameters": strict_json_schema(self.args_model),
-            "strict": True,
-        }
+        if self._json is None:
+            self._json = {
+                "type": "function",
+                "name": self.name,
+                "description": self.description,
+                "parameters": strict_json_schema(self.args_model),
+                "strict": True,
+            }
+        return self._json
@@ -39,6 +39,7 @@ class Jinja2Loader:
         self.env = LoggingEnvironment(
             loader=FileSystemLoader(searchpath="./templates/prompts/")
         )
+        self._static: dict[tuple[str, tuple[tuple[str, str], ...]], str] = {}
         self.new_game = self.env.get_template("new_game.jinja2")
         self.new_replay = self.env.get_template("new_replay.jinja2")
         self.summary = self.env.get_template("summary.jinja2")
@@ -59,5 +60,13 @@ class Jinja2Loader:
         template = self.env.get_template(template_name)
         return template.render(replacements)
 
+    def render_static(self, template_name: str, **replacements: str) -> str:
+        """Render a template whose output depends on nothing but its
+        replacements, once per distinct set of replacements."""
+        key = (template_name, tuple(sorted(replacements.items())))
+        if key not in self._static:
+            self._static[key] = self.render(template_name, replacements)
+        return self._static[key]
+
 
 Templates = Jinja2Loader()
@@ -22,6 +22,7 @@ from src.api.routers import (
     build_tools_router,
 )
 from src.api.webapp import build_webapp_router
+from src.persistence.keyset import InvalidCursorError, InvalidSortError
 from src.persistence.runtime import PersistenceServices, build_persistence_services
 from src.runtime.settings import ApiSettings, load_api_settings
 
@@ -65,6 +66,28 @@ def create_app(
             message=str(exc.detail),
         )
 
+    @app.exception_handler(InvalidCursorError)
+    async def handle_invalid_cursor(
+        _request: Request,
+        exc: InvalidCursorError,
+    ) -> JSONResponse:
+        return json_error(
+            status_code=400,
+            code="invalid_cursor",
+            message=str(exc),
+        )
+
+    @app.exception_handler(InvalidSortError)
+    async def handle_invalid_sort(
+        _request: Request,
+        exc: InvalidSortError,
+    ) -> JSONResponse:
+        return json_error(
+            status_code=400,
+            code="invalid_sort",
+            message=str(exc),
+        )
+
     @app.exception_handler(RequestValidationError)
     async def handle_validation_error(
         _request: Request,
@@ -24,12 +24,19 @@ class ErrorResponse(BaseModel):
     error: ErrorBody
 
 
+Pagination = Literal["offset", "cursor"]
+"""``offset`` pages by ``current_page`` with a total count, ``cursor`` continues
+after the ``next_cursor`` of the previous page and does not count."""
+
+
 class QueryRequest(BaseModel):
     filter: dict[str, Any] = Field(default_factory=dict)
     sort: dict[str, Literal[1, -1]] = Field(default_factory=dict)
     current_page: int = 1
     docs_per_page: int = 50
     projection: str | None = None
+    pagination: Pagination = "offset"
+    after: str | None = None
 
 
 class PlayerAliasResponse(BaseModel):
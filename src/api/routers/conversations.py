@@ -7,10 +7,11 @@ from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import Response
 
 from src.api.errors import raise_api_error
-from src.api.models import QueryRequest
+from src.api.models import Pagination, QueryRequest
 from src.api.state import get_persistence
 from src.api.validation import (
     parse_sort,
+    use_keyset,
     validate_patch_document,
     validate_query_filter,
 )
@@ -20,6 +21,7 @@ from src.persistence.conversation_store import (
     AIConversationStatus,
     AIConversationTrigger,
     AIResponseRecord,
+    ConversationUsage,
 )
 
 
@@ -41,9 +43,13 @@ def build_conversations_router() -> APIRouter:
         twitch_user: str | None = None,
         from_date: datetime | None = None,
         to_date: datetime | None = None,
+        pagination: Pagination = "offset",
+        after: str | None = None,
     ):
         persistence = get_persistence(request)
         return persistence.conversation_store.list_conversations(
+            keyset=use_keyset(pagination, after),
+            after=after,
             current_page=current_page,
             docs_per_page=docs_per_page,
             session=session,
@@ -64,6 +70,8 @@ def build_conversations_router() -> APIRouter:
         persistence = get_persistence(request)
         validate_query_filter(query.filter)
         return persistence.conversation_store.list_conversations(
+            keyset=use_keyset(query.pagination, query.after),
+            after=query.after,
             current_page=query.current_page,
             docs_per_page=query.docs_per_page,
             raw_query=query.filter,
@@ -171,4 +179,15 @@ def build_conversations_router() -> APIRouter:
         persistence = get_persistence(request)
         return persistence.conversation_store.list_response_records(conversation_id)
 
+    @router.get("/{conversation_id}/usage", response_model=ConversationUsage)
+    def get_conversation_usage(
+        conversation_id: str,
+        request: Request,
+    ) -> ConversationUsage:
+        persistence = get_persistence(request)
+        conversation = persistence.conversation_store.get_conversation(conversation_id)
+        if conversation is None:
+            raise HTTPException(status_code=404, detail="Conversation not found")
+        return persistence.conversation_store.get_usage(conversation)
+
     return router
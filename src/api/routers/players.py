@@ -6,15 +6,21 @@ from fastapi import APIRouter, Request
 from fastapi.responses import Response
 
 from src.api.errors import player_not_found, raise_api_error
-from src.api.models import PlayerAliasResponse, PlayerInfoResponse, QueryRequest
+from src.api.models import (
+    Pagination,
+    PlayerAliasResponse,
+    PlayerInfoResponse,
+    QueryRequest,
+)
 from src.api.state import get_persistence
 from src.api.validation import (
     parse_sort,
+    use_keyset,
     validate_patch_document,
     validate_projection,
     validate_query_filter,
 )
-from src.persistence.replay_store import PlayerInfo
+from src.persistence.replay_store import REPLAY_TABLE_PROJECTION, PlayerInfo
 
 
 def _player_page_payload(page: Any) -> dict[str, Any]:
@@ -88,10 +94,14 @@ def build_players_router() -> APIRouter:
         projection: str | None = "table",
         q: str | None = None,
         tag: str | None = None,
+        pagination: Pagination = "offset",
+        after: str | None = None,
     ) -> dict[str, Any]:
         persistence = get_persistence(request)
         validate_projection(projection, allowed={None, "detail", "table"})
         page = persistence.replay_store.list_players(
+            keyset=use_keyset(pagination, after),
+            after=after,
             current_page=current_page,
             docs_per_page=docs_per_page,
             q=q,
@@ -106,6 +116,8 @@ def build_players_router() -> APIRouter:
         validate_projection(query.projection, allowed={None, "detail", "table"})
         validate_query_filter(query.filter)
         page = persistence.replay_store.list_players(
+            keyset=use_keyset(query.pagination, query.after),
+            after=query.after,
             current_page=query.current_page,
             docs_per_page=query.docs_per_page,
             raw_query=query.filter,
@@ -235,6 +247,7 @@ def build_players_router() -> APIRouter:
             docs_per_page=docs_per_page,
             raw_query={"players.toon_handle": toon_handle},
             raw_sort=parse_sort(sort),
+            projection=REPLAY_TABLE_PROJECTION if projection == "table" else None,
         )
 
     @router.get("/{toon_handle}/aliases", response_model=list[PlayerAliasResponse])
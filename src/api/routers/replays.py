@@ -7,15 +7,21 @@ from fastapi import APIRouter, Request
 from fastapi.responses import Response
 
 from src.api.errors import raise_api_error, replay_metadata_not_found, replay_not_found
-from src.api.models import PlayerInfoResponse, QueryRequest, ReplayPlayerRelationship
+from src.api.models import (
+    Pagination,
+    PlayerInfoResponse,
+    QueryRequest,
+    ReplayPlayerRelationship,
+)
 from src.api.state import get_persistence
 from src.api.validation import (
     parse_sort,
+    use_keyset,
     validate_patch_document,
     validate_projection,
     validate_query_filter,
 )
-from src.persistence.replay_store import Metadata
+from src.persistence.replay_store import REPLAY_TABLE_PROJECTION, Metadata
 from src.replays.types import Replay
 
 
@@ -35,10 +41,14 @@ def build_replays_router() -> APIRouter:
         result: str | None = None,
         from_date: datetime | None = None,
         to_date: datetime | None = None,
+        pagination: Pagination = "offset",
+        after: str | None = None,
     ):
         persistence = get_persistence(request)
         validate_projection(projection, allowed={None, "detail", "table"})
         return persistence.replay_store.list_replays(
+            keyset=use_keyset(pagination, after),
+            after=after,
             current_page=current_page,
             docs_per_page=docs_per_page,
             player=player,
@@ -48,6 +58,7 @@ def build_replays_router() -> APIRouter:
             from_date=from_date,
             to_date=to_date,
             raw_sort=parse_sort(sort),
+            projection=REPLAY_TABLE_PROJECTION if projection == "table" else None,
         )
 
     @router.post("/query")
@@ -56,10 +67,15 @@ def build_replays_router() -> APIRouter:
         validate_projection(query.projection, allowed={None, "detail", "table"})
         validate_query_filter(query.filter)
         return persistence.replay_store.list_replays(
+            keyset=use_keyset(query.pagination, query.after),
+            after=query.after,
             current_page=query.current_page,
             docs_per_page=query.docs_per_page,
             raw_query=query.filter,
             raw_sort=dict(query.sort) or None,
+            projection=(
+                REPLAY_TABLE_PROJECTION if query.projection == "table" else None
+            ),
         )
 
     @router.post("", response_model=Replay)
@@ -3,9 +3,14 @@ from __future__ import annotations
 from fastapi import APIRouter, Request
 
 from src.api.errors import response_not_found
-from src.api.models import QueryRequest
+from src.api.models import Pagination, QueryRequest
 from src.api.state import get_persistence
-from src.api.validation import parse_sort, validate_projection, validate_query_filter
+from src.api.validation import (
+    parse_sort,
+    use_keyset,
+    validate_projection,
+    validate_query_filter,
+)
 from src.persistence.conversation_store import AIResponseRecord
 
 
@@ -23,9 +28,13 @@ def build_responses_router() -> APIRouter:
         response_id: str | None = None,
         model: str | None = None,
         status: str | None = None,
+        pagination: Pagination = "offset",
+        after: str | None = None,
     ):
         persistence = get_persistence(request)
         return persistence.conversation_store.list_response_record_resources(
+            keyset=use_keyset(pagination, after),
+            after=after,
             current_page=current_page,
             docs_per_page=docs_per_page,
             conversation=conversation,
@@ -42,6 +51,8 @@ def build_responses_router() -> APIRouter:
         validate_projection(query.projection)
         validate_query_filter(query.filter)
         return persistence.conversation_store.list_response_record_resources(
+            keyset=use_keyset(query.pagination, query.after),
+            after=query.after,
             current_page=query.current_page,
             docs_per_page=query.docs_per_page,
             raw_query=query.filter,
@@ -4,7 +4,9 @@ from datetime import datetime
 
 from fastapi import APIRouter, HTTPException, Request
 
+from src.api.models import Pagination
 from src.api.state import get_persistence
+from src.api.validation import use_keyset
 from src.persistence.conversation_store import AIConversation
 from src.runtime.settings import AIBackend
 
@@ -20,9 +22,13 @@ def build_sessions_router() -> APIRouter:
         from_date: datetime | None = None,
         to_date: datetime | None = None,
         ai_backend: AIBackend | None = None,
+        pagination: Pagination = "offset",
+        after: str | None = None,
     ):
         persistence = get_persistence(request)
         return persistence.session_store.list(
+            keyset=use_keyset(pagination, after),
+            after=after,
             current_page=current_page,
             docs_per_page=docs_per_page,
             from_date=from_date,
@@ -1,15 +1,20 @@
 from __future__ import annotations
 
+import json
+
 from fastapi import APIRouter
+from fastapi.responses import Response
 
 from src.ai.functions import responses_tools
 
 
 def build_tools_router() -> APIRouter:
     router = APIRouter(prefix="/api/tools", tags=["tools"])
+    # The tool definitions are fixed for the process, serialize them once
+    payload = json.dumps(responses_tools()).encode()
 
-    @router.get("")
-    def get_tools() -> list[dict]:
-        return responses_tools()
+    @router.get("", response_model=list[dict])
+    def get_tools() -> Response:
+        return Response(content=payload, media_type="application/json")
 
     return router
@@ -58,6 +58,10 @@ def parse_sort(sort_value: str | None) -> dict[str, int] | None:
     return raw_sort
 
 
+def use_keyset(pagination: str, after: str | None) -> bool:
+    return pagination == "cursor" or after is not None
+
+
 def validate_projection(
     projection: str | None,
     *,
@@ -9,9 +9,12 @@ from watchdog.observers import Observer as ObserverType
 
 from shared import signal_queue
 from src.events import NewReplayEvent
+from src.mapstats import record_map_stats
 from src.persistence.replay_store import ReplayStore, get_replay_store
 from src.playeridentity import PlayerIdentityEnricher, PlayerIdentityEnrichmentError
-from src.replays.reader import ReplayReader
+from src.replays.ingest import ReplayParseResult, parse_replay_file
+from src.replays.manifest import ReplayManifest
+from src.replays.reader import COACH_LIVE_PROFILE, ReplayReader
 from src.runtime.settings import Config, get_config
 from src.util import wait_for_file
 
@@ -37,6 +40,7 @@ class NewReplayHandler(FileSystemEventHandler):
         *,
         replay_store: ReplayStore | None = None,
         player_identity_enricher: PlayerIdentityEnricher | None = None,
+        replay_manifest: ReplayManifest | None = None,
         settings: Config | None = None,
     ):
         super().__init__()
@@ -45,7 +49,8 @@ class NewReplayHandler(FileSystemEventHandler):
         if player_identity_enricher is None:
             raise ValueError("player_identity_enricher must be provided")
         self.player_identity_enricher = player_identity_enricher
-        self.reader = ReplayReader(settings=self.settings)
+        self.replay_manifest = replay_manifest or ReplayManifest(self.replay_store)
+        self.reader = ReplayReader(settings=self.settings, profile=COACH_LIVE_PROFILE)
 
     def on_created(self, event):
         if event.is_directory:
@@ -55,13 +60,25 @@ class NewReplayHandler(FileSystemEventHandler):
                 self.process_new_file(str(event.src_path))
 
     def process_new_file(self, file_path: str):
-        replay_raw = self.reader.load_replay_raw(file_path)
-        if self.reader.apply_filters(replay_raw):
+        entry = self.replay_manifest.lookup(file_path)
+        if entry is not None and entry.imported:
+            log.info(f"Skipping already imported replay {basename(file_path)}")
+            return
+
+        if entry is not None:
+            parsed = ReplayParseResult.from_manifest_entry(file_path, entry)
+        else:
+            parsed = parse_replay_file(self.reader, file_path)
+
+        if parsed.replay is not None:
             log.info(f"New replay {basename(file_path)}")
-            replay = self.reader.to_typed_replay(replay_raw)
+            replay = parsed.replay
             result = self.replay_store.upsert(replay)
             if not result.acknowledged:
                 log.error(f"Failed to save {replay}")
+            else:
+                self.replay_manifest.record(parsed, imported=True)
+                record_map_stats([replay], self.replay_store, settings=self.settings)
             try:
                 self.player_identity_enricher.save_from_replay(replay)
             except PlayerIdentityEnrichmentError as exc:
@@ -69,9 +86,9 @@ class NewReplayHandler(FileSystemEventHandler):
 
             signal_queue.put(NewReplayEvent(replay=replay))
         else:
-            if self.reader.is_instant_leave(replay_raw) or self.reader.has_afk_player(
-                replay_raw
-            ):
+            if entry is None:
+                self.replay_manifest.record(parsed, imported=False)
+            if parsed.is_instant_leave or parsed.has_afk_player:
                 wait_for_delete(Path(file_path))
                 log.info(f"Deleted {basename(file_path)}")
 
@@ -1,20 +1,30 @@
 import logging
-from datetime import datetime
-from functools import cached_property
-from typing import Any, ClassVar
+import os
+from datetime import datetime, timedelta
+from functools import cache, cached_property
+from pathlib import Path
+from typing import Any, ClassVar, Iterable
 from urllib.parse import urlparse, urlunparse
 
-from anyio import Path
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, Template
 from pydantic import HttpUrl, computed_field
 from pyodmongo import DbModel, MainBaseModel
 
 from log import DEFAULT_LOGGER_NAME
-from src.persistence.replay_store import ReplayStore, get_replay_store
+from src.persistence.replay_store import (
+    MAP_STATS_DAY_KEY,
+    MapStatsDay,
+    ReplayStore,
+    get_replay_store,
+)
+from src.replays.types import Replay
 from src.runtime.settings import ApiSettings, Config, get_config
 
 log = logging.getLogger(f"{DEFAULT_LOGGER_NAME}.{__name__}")
 
+# Overlay file -> key of the stats it was last rendered from
+_overlay_keys: dict[Path, tuple[Any, ...]] = {}
+
 
 class Matchup(MainBaseModel):
     matchup: str
@@ -32,15 +42,15 @@ class MatchupsByMap(DbModel):
     map: str
     matchups: list[Matchup]
     _collection: ClassVar = "replays"
-    _pipeline: ClassVar[list[dict[str, Any]]] = []
 
 
-def _map_stats_pipeline(settings: ApiSettings) -> list[dict[str, Any]]:
+def _student_games_stages(settings: ApiSettings) -> list[dict[str, Any]]:
     return [
         {"$match": {"players.name": settings.student.name}},
         {
             "$project": {
                 "map_name": 1,
+                "date": 1,
                 "players": 1,
                 "student": {
                     "$arrayElemAt": [
@@ -72,24 +82,23 @@ def _map_stats_pipeline(settings: ApiSettings) -> list[dict[str, Any]]:
                 },
             }
         },
-        {"$match": {"$expr": {"$eq": ["$student.play_race", settings.student.race]}}},
-        {
-            "$group": {
-                "_id": {
-                    "map_name": "$map_name",
-                    "matchup": {
-                        "$concat": ["$student.play_race", "v", "$opponent.play_race"]
-                    },
-                },
-                "totalGames": {"$sum": 1},
-                "wins": {
-                    "$sum": {"$cond": [{"$eq": ["$student.result", "Win"]}, 1, 0]}
-                },
-                "losses": {
-                    "$sum": {"$cond": [{"$eq": ["$student.result", "Loss"]}, 1, 0]}
-                },
-            }
-        },
+    ]
+
+
+def _student_game_counters() -> dict[str, Any]:
+    return {
+        "totalGames": {"$sum": 1},
+        "wins": {"$sum": {"$cond": [{"$eq": ["$student.result", "Win"]}, 1, 0]}},
+        "losses": {"$sum": {"$cond": [{"$eq": ["$student.result", "Loss"]}, 1, 0]}},
+    }
+
+
+_MATCHUP = {"$concat": ["$student.play_race", "v", "$opponent.play_race"]}
+
+
+def _matchups_by_map_stages() -> list[dict[str, Any]]:
+    """Nest counters grouped by ``map_name`` and ``matchup`` into MatchupsByMap."""
+    return [
         {
             "$project": {
                 "map_name": "$_id.map_name",
@@ -116,9 +125,72 @@ def _map_stats_pipeline(settings: ApiSettings) -> list[dict[str, Any]]:
     ]
 
 
-def _configure_matchups_pipeline(settings: ApiSettings) -> None:
-    MatchupsByMap._pipeline.clear()
-    MatchupsByMap._pipeline.extend(_map_stats_pipeline(settings))
+def _map_stats_pipeline(settings: ApiSettings) -> list[dict[str, Any]]:
+    return [
+        *_student_games_stages(settings),
+        {"$match": {"$expr": {"$eq": ["$student.play_race", settings.student.race]}}},
+        {
+            "$group": {
+                "_id": {"map_name": "$map_name", "matchup": _MATCHUP},
+                **_student_game_counters(),
+            }
+        },
+        *_matchups_by_map_stages(),
+    ]
+
+
+def _map_stats_days_stages() -> list[dict[str, Any]]:
+    return [
+        {
+            "$group": {
+                "_id": {"map_name": "$map", "matchup": "$matchup"},
+                "totalGames": {"$sum": "$totalGames"},
+                "wins": {"$sum": "$wins"},
+                "losses": {"$sum": "$losses"},
+            }
+        },
+        *_matchups_by_map_stages(),
+    ]
+
+
+def _rebuild_map_stats_pipeline(settings: ApiSettings) -> list[dict[str, Any]]:
+    return [
+        *_student_games_stages(settings),
+        {
+            "$group": {
+                "_id": {
+                    "map": "$map_name",
+                    "matchup": _MATCHUP,
+                    "day": {"$dateTrunc": {"date": "$date", "unit": "day"}},
+                },
+                "race": {"$first": "$student.play_race"},
+                "replays": {"$push": "$_id"},
+                **_student_game_counters(),
+            }
+        },
+        {
+            "$project": {
+                "_id": 0,
+                "student": {"$literal": settings.student.name},
+                "race": 1,
+                "map": "$_id.map",
+                "matchup": "$_id.matchup",
+                "day": "$_id.day",
+                "totalGames": 1,
+                "wins": 1,
+                "losses": 1,
+                "replays": 1,
+            }
+        },
+        {
+            "$merge": {
+                "into": MapStatsDay._collection,
+                "on": list(MAP_STATS_DAY_KEY),
+                "whenMatched": "replace",
+                "whenNotMatched": "insert",
+            }
+        },
+    ]
 
 
 def _sort_map_stats(stats: list[MatchupsByMap]) -> list[MatchupsByMap]:
@@ -134,6 +206,30 @@ def _sort_map_stats(stats: list[MatchupsByMap]) -> list[MatchupsByMap]:
     )
 
 
+def _merge_map_stats(stats: Iterable[MatchupsByMap]) -> list[MatchupsByMap]:
+    merged: dict[str, dict[str, Matchup]] = {}
+    for entry in stats:
+        matchups = merged.setdefault(entry.map, {})
+        for matchup in entry.matchups:
+            counted = matchups.get(matchup.matchup)
+            if counted is not None:
+                matchup = Matchup(
+                    matchup=matchup.matchup,
+                    totalGames=counted.totalGames + matchup.totalGames,
+                    wins=counted.wins + matchup.wins,
+                    losses=counted.losses + matchup.losses,
+                )
+            matchups[matchup.matchup] = matchup
+    return [
+        MatchupsByMap(map=map_name, matchups=list(matchups.values()))
+        for map_name, matchups in merged.items()
+    ]
+
+
+def _start_of_day(value: datetime) -> datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
 def list_map_stats(
     map_name: str | None = None,
     min_date: datetime | None = None,
@@ -141,25 +237,146 @@ def list_map_stats(
     *,
     settings: ApiSettings | None = None,
 ) -> list[MatchupsByMap]:
+    """The student's results per map and matchup since ``min_date``."""
     settings = settings or get_config()
     if min_date is None:
         min_date = settings.season_start
+    return list_map_stats_windows(
+        {"stats": min_date},
+        map_name=map_name,
+        replay_store=replay_store,
+        settings=settings,
+    )["stats"]
+
 
+def list_map_stats_windows(
+    min_dates: dict[str, datetime | None],
+    *,
+    map_name: str | None = None,
+    replay_store: ReplayStore | None = None,
+    settings: ApiSettings | None = None,
+) -> dict[str, list[MatchupsByMap]]:
+    """The student's results per map and matchup for several windows at once.
+
+    ``min_dates`` names the start of each window, None for all games. All
+    windows are summed from the per-day counters in one ``$facet``
+    aggregation. Windows starting after midnight aggregate the rest of their
+    first day from the replays, again in one ``$facet`` for all of them.
+    """
+    settings = settings or get_config()
     replay_store = replay_store or get_replay_store()
-    _configure_matchups_pipeline(settings)
 
-    raw_query: dict[str, Any] = {}
+    days: dict[str, list[dict[str, Any]]] = {}
+    partial_days: dict[str, list[dict[str, Any]]] = {}
+    for name, min_date in min_dates.items():
+        days[name] = _map_stats_days_stages()
+        if min_date is None:
+            continue
+        from_day = _start_of_day(min_date)
+        if from_day < min_date:
+            from_day += timedelta(days=1)
+            partial_days[name] = [
+                {"$match": {"date": {"$gte": min_date, "$lt": from_day}}},
+                *_map_stats_pipeline(settings),
+            ]
+        days[name].insert(0, {"$match": {"day": {"$gte": from_day}}})
+
+    match: dict[str, Any] = {
+        "student": settings.student.name,
+        "race": settings.student.race,
+    }
     if map_name is not None:
-        raw_query["map_name"] = map_name
-    if min_date is not None:
-        raw_query["date"] = {"$gte": min_date}
+        match["map"] = map_name
+    (documents,) = replay_store.aggregate_map_stats(
+        [{"$match": match}, {"$facet": days}]
+    )
+
+    if partial_days:
+        dates = [min_dates[name] for name in partial_days]
+        replay_match: dict[str, Any] = {
+            "players.name": settings.student.name,
+            "date": {
+                "$gte": min(dates),
+                "$lt": _start_of_day(max(dates)) + timedelta(days=1),
+            },
+        }
+        if map_name is not None:
+            replay_match["map_name"] = map_name
+        (partial_documents,) = replay_store.aggregate_replays(
+            [{"$match": replay_match}, {"$facet": partial_days}]
+        )
+        for name, stats in partial_documents.items():
+            documents[name] += stats
+
+    return {
+        name: _sort_map_stats(
+            _merge_map_stats(MatchupsByMap(**stats) for stats in documents[name])
+        )
+        for name in min_dates
+    }
+
+
+def map_stats_day(replay: Replay, settings: ApiSettings) -> MapStatsDay | None:
+    """The counters ``replay`` adds to the student's map stats, None if the
+    student did not play in it."""
+    return MapStatsDay.from_replay(replay, settings.student.name)
 
-    find_many_kwargs: dict[str, Any] = {"Model": MatchupsByMap}
-    if raw_query:
-        find_many_kwargs["raw_query"] = raw_query
 
-    maps: list[MatchupsByMap] = replay_store.db.find_many(**find_many_kwargs)
-    return _sort_map_stats(maps)
+def record_map_stats(
+    replays: Iterable[Replay],
+    replay_store: ReplayStore | None = None,
+    *,
+    settings: ApiSettings | None = None,
+) -> int:
+    """Count newly ingested ``replays`` in the map stats collection.
+
+    Returns the number of replays counted; replays counted before are skipped.
+    """
+    settings = settings or get_config()
+    replay_store = replay_store or get_replay_store()
+    days = [
+        day
+        for replay in replays
+        if (day := map_stats_day(replay, settings)) is not None
+    ]
+    return replay_store.increment_map_stats(days)
+
+
+def rebuild_map_stats(
+    replay_store: ReplayStore | None = None,
+    *,
+    settings: ApiSettings | None = None,
+) -> int:
+    """Recount the student's map stats from all stored replays.
+
+    Returns the number of games counted.
+    """
+    settings = settings or get_config()
+    replay_store = replay_store or get_replay_store()
+    replay_store.clear_map_stats(settings.student.name)
+    replay_store.aggregate_replays(_rebuild_map_stats_pipeline(settings))
+    counted = replay_store.aggregate_map_stats(
+        [
+            {"$match": {"student": settings.student.name}},
+            {"$group": {"_id": None, "games": {"$sum": "$totalGames"}}},
+        ]
+    )
+    return counted[0]["games"] if counted else 0
+
+
+def backfill_map_stats(
+    replay_store: ReplayStore | None = None,
+    *,
+    settings: ApiSettings | None = None,
+) -> None:
+    """Rebuild the student's map stats once if none were recorded yet."""
+    settings = settings or get_config()
+    replay_store = replay_store or get_replay_store()
+    if not replay_store.aggregate_map_stats(
+        [{"$match": {"student": settings.student.name}}, {"$limit": 1}]
+    ):
+        games = rebuild_map_stats(replay_store, settings=settings)
+        log.info(f"Back-filled map stats with {games} games")
 
 
 def add_path_segment(url: HttpUrl, *segments: Any) -> str:
@@ -173,25 +390,54 @@ def add_path_segment(url: HttpUrl, *segments: Any) -> str:
     return updated_url
 
 
+@cache
+def _map_stats_template() -> Template:
+    return Environment(loader=FileSystemLoader("templates")).get_template(
+        "map_stats.jinja2"
+    )
+
+
+def _write_atomic(path: Path, content: str) -> None:
+    # OBS may read the overlay at any time, never let it see a partial file
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(content)
+    os.replace(tmp_path, path)
+
+
 def update_map_stats(
     map: str,
     replay_store: ReplayStore | None = None,
     *,
     settings: Config | None = None,
 ):
+    """Render the map stats overlay for OBS.
+
+    The overlay is only rendered again when the map, the day or the student's
+    latest replay changed since it was last written.
+    """
     settings = settings or get_config()
-    season_stats = get_map_stats(
+    replay_store = replay_store or get_replay_store()
+    stats_html_file = Path(settings.obs_dir) / "map_stats_obs.html"
+    today = _start_of_day(datetime.now())
+    key = (
         map,
+        today,
+        replay_store.get_latest_replay_id(settings.student.name),
+        settings.student.name,
         settings.season_start,
-        replay_store=replay_store,
-        settings=settings,
     )
-    todays_stats = get_map_stats(
-        map,
-        min_date=datetime.now().replace(hour=0, minute=0, second=0, microsecond=0),
+    if _overlay_keys.get(stats_html_file) == key and stats_html_file.exists():
+        log.debug(f"Map stats overlay for {map} is up to date")
+        return
+
+    windows = list_map_stats_windows(
+        {"season": settings.season_start, "today": today},
+        map_name=map,
         replay_store=replay_store,
         settings=settings,
     )
+    season_stats = next(iter(windows["season"]), None)
+    todays_stats = next(iter(windows["today"]), None)
 
     if season_stats is not None:
         # Initialize with empty list if None
@@ -210,14 +456,11 @@ def update_map_stats(
                         losses=0,
                     )
                 )
-        stats_html_file = Path(settings.obs_dir) / "map_stats_obs.html"
-        env = Environment(loader=FileSystemLoader("templates"))
-        template = env.get_template("map_stats.jinja2")
-        rendered = template.render(
+        rendered = _map_stats_template().render(
             map_name=map, map_stats_season=season_stats, map_stats_today=todays_stats
         )
-        with open(stats_html_file, "w") as f:
-            f.write(rendered)
+        _write_atomic(stats_html_file, rendered)
+    _overlay_keys[stats_html_file] = key
 
 
 def get_map_stats(
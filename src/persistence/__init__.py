@@ -3,6 +3,7 @@ from src.persistence.conversation_store import (
     AIConversationItem,
     AIResponseRecord,
     ConversationStore,
+    ConversationUsage,
     get_conversation_store,
     reset_conversation_store,
 )
@@ -15,8 +16,13 @@ from src.persistence.database import (
 )
 from src.persistence.replay_store import (
     Alias,
+    BulkUpsertError,
+    BulkUpsertResult,
+    MapStatsDay,
     Metadata,
     PlayerInfo,
+    ReplayImportOutcome,
+    ReplayManifestEntry,
     ReplayStore,
     get_replay_store,
     reset_replay_store,
@@ -28,11 +34,17 @@ __all__ = [
     "AIConversationItem",
     "AIResponseRecord",
     "Alias",
+    "BulkUpsertError",
+    "BulkUpsertResult",
     "ConversationStore",
+    "ConversationUsage",
+    "MapStatsDay",
     "Metadata",
     "MongoDatabase",
     "MongoDatabaseConfig",
     "PlayerInfo",
+    "ReplayImportOutcome",
+    "ReplayManifestEntry",
     "ReplayStore",
     "Session",
     "SessionStore",
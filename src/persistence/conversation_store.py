@@ -1,15 +1,22 @@
 from __future__ import annotations
 
+import threading
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import TYPE_CHECKING, Any, ClassVar, TypeVar, cast
 
 from bson import ObjectId
-from pydantic import Field, field_validator
-from pymongo import ASCENDING, IndexModel
+from pydantic import BaseModel, Field, computed_field, field_validator
+from pymongo import ASCENDING, IndexModel, ReturnDocument
+from pymongo.errors import BulkWriteError
 from pyodmongo import DbModel, Id, ResponsePaginate
+from pyodmongo.engines.utils import consolidate_dict
 from pyodmongo.queries import eq, sort
 
 from src.persistence.database import MongoDatabase, get_database
+from src.persistence.keyset import CursorPage, find_cursor_page
+from src.persistence.patches import document_id, now, set_fields
+from src.persistence.replay_store import DUPLICATE_KEY_ERROR
 from src.replays.types import (
     AIContentPart,
     AIConversationItemType,
@@ -212,9 +219,40 @@ class AIResponseRecord(DbModel):
         )
 
 
+class ConversationUsage(BaseModel):
+    """Token usage of a conversation, summed over its response records."""
+
+    responses: int = 0
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+    total_cost: float = 0
+
+    @computed_field
+    @property
+    def cached_token_ratio(self) -> float:
+        """Share of the input tokens served from the provider's prompt cache."""
+        if not self.input_tokens:
+            return 0.0
+        return self.cached_tokens / self.input_tokens
+
+
+@dataclass
+class _ConversationState:
+    """Item bookkeeping of a conversation this store appends to."""
+
+    session: Id | str | None
+    next_order: int
+    pending: list[AIConversationItem] = field(default_factory=list)
+    """Appended items not yet written, flushed before the conversation is read."""
+
+
 class ConversationStore:
     def __init__(self, database: MongoDatabase | None = None):
         self._database = database
+        self._states: dict[str, _ConversationState] = {}
+        self._lock = threading.RLock()
+        self._item_indexes_created = False
 
     @property
     def database(self) -> MongoDatabase:
@@ -257,6 +295,7 @@ class ConversationStore:
     def get_conversation(
         self, conversation: AIConversation | Id | str
     ) -> AIConversation | None:
+        self.flush(conversation)
         return self.db.find_one(
             Model=AIConversation,
             query=eq(AIConversation.id, self._id(conversation)),  # type: ignore[arg-type]
@@ -268,6 +307,7 @@ class ConversationStore:
         conversation: AIConversation,
     ) -> AIConversation:
         conversation.id = self._id(conversation_id)
+        self.flush(conversation)
         normalized = self._normalize_lifecycle_state(conversation)
         self.db.save(
             normalized,
@@ -280,21 +320,34 @@ class ConversationStore:
         conversation_id: AIConversation | Id | str,
         patch: dict[str, Any],
     ) -> AIConversation | None:
-        existing = self.get_conversation(conversation_id)
-        if existing is None:
+        self.flush(conversation_id)
+        fields = set_fields(AIConversation, patch, exclude={"id"})
+        # Same lifecycle rule as _normalize_lifecycle_state, applied after the patch
+        closed_at = {
+            "$cond": [
+                {"$eq": ["$status", AIConversationStatus.closed.value]},
+                {"$ifNull": ["$closed_at", fields["updated_at"]]},
+                None,
+            ]
+        }
+        document = self.database.raw[AIConversation._collection].find_one_and_update(
+            {"_id": document_id(self._id(conversation_id))},
+            [
+                {"$set": {path: {"$literal": value} for path, value in fields.items()}},
+                {"$set": {"closed_at": closed_at}},
+            ],
+            return_document=ReturnDocument.AFTER,
+        )
+        if document is None:
             return None
-
-        merged = self._merge_dict(existing.model_dump(mode="python"), patch)
-        merged["id"] = str(existing.id)
-        patched = AIConversation.model_validate(merged)
-        assert existing.id is not None
-        return self.replace_conversation(existing.id, patched)
+        return AIConversation.model_validate(document)
 
     def delete_conversation(self, conversation_id: AIConversation | Id | str) -> bool:
         existing = self.get_conversation(conversation_id)
         if existing is None:
             return False
 
+        self._forget(existing)
         self.db.delete(
             AIConversation,
             query=eq(AIConversation.id, existing.id),  # type: ignore[arg-type]
@@ -313,7 +366,9 @@ class ConversationStore:
                 "updated_at",
             },
         )
-        return self._append_item(item.conversation, **fields)
+        appended = self._append_item(item.conversation, **fields)
+        self.flush(item.conversation)
+        return appended
 
     def append_message(
         self,
@@ -381,6 +436,7 @@ class ConversationStore:
         conversation: AIConversation | Id | str,
     ) -> list[AIConversationItem]:
         conversation_id = self._id(conversation)
+        self.flush(conversation_id)
         query = eq(AIConversationItem.conversation, conversation_id)  # type: ignore[arg-type]
 
         return cast(
@@ -396,6 +452,7 @@ class ConversationStore:
         self,
         item_id: AIConversationItem | Id | str,
     ) -> AIConversationItem | None:
+        self.flush()
         return self.db.find_one(
             Model=AIConversationItem,
             query=eq(AIConversationItem.id, self._id(item_id)),  # type: ignore[arg-type]
@@ -413,6 +470,7 @@ class ConversationStore:
         raw_query: dict[str, Any] | None = None,
         raw_sort: dict[str, int] | None = None,
     ) -> ResponsePaginate:
+        self.flush()
         query = dict(raw_query or {})
         if conversation is not None:
             query["conversation"] = ObjectId(str(self._id(conversation)))
@@ -450,6 +508,31 @@ class ConversationStore:
             ),
         )
 
+    def get_usage(self, conversation: AIConversation | Id | str) -> ConversationUsage:
+        documents = self.database.raw[AIResponseRecord._collection].aggregate(
+            [
+                {"$match": {"conversation": document_id(self._id(conversation))}},
+                {
+                    "$group": {
+                        "_id": None,
+                        "responses": {"$sum": 1},
+                        **{
+                            field: {"$sum": f"${field}"}
+                            for field in (
+                                "input_tokens",
+                                "cached_tokens",
+                                "output_tokens",
+                                "total_cost",
+                            )
+                        },
+                    }
+                },
+            ]
+        )
+        for document in documents:
+            return ConversationUsage.model_validate(document)
+        return ConversationUsage()
+
     def get_response_record_by_response_id(
         self,
         response_id: str,
@@ -480,7 +563,9 @@ class ConversationStore:
         status: str | None = None,
         raw_query: dict[str, Any] | None = None,
         raw_sort: dict[str, int] | None = None,
-    ) -> ResponsePaginate:
+        keyset: bool = False,
+        after: str | None = None,
+    ) -> ResponsePaginate | CursorPage:
         query = dict(raw_query or {})
         if conversation is not None:
             query["conversation"] = ObjectId(str(self._id(conversation)))
@@ -493,6 +578,16 @@ class ConversationStore:
         if status is not None:
             query["status"] = status
 
+        if keyset:
+            return find_cursor_page(
+                self.database.raw[AIResponseRecord._collection],
+                AIResponseRecord,
+                query,
+                raw_sort or {"created_at": -1},
+                after=after,
+                docs_per_page=docs_per_page,
+            )
+
         return cast(
             ResponsePaginate,
             self.db.find_many(
@@ -522,7 +617,10 @@ class ConversationStore:
         raw_query: dict[str, Any] | None = None,
         raw_sort: dict[str, int] | None = None,
         paginate: bool = False,
-    ) -> list[AIConversation] | ResponsePaginate:
+        keyset: bool = False,
+        after: str | None = None,
+    ) -> list[AIConversation] | ResponsePaginate | CursorPage:
+        self.flush()
         query = dict(raw_query or {})
         if session is not None:
             query["session"] = ObjectId(str(self._id(session)))
@@ -546,6 +644,16 @@ class ConversationStore:
                 created_at_query["$lte"] = to_date
             query["created_at"] = created_at_query
 
+        if keyset:
+            return find_cursor_page(
+                self.database.raw[AIConversation._collection],
+                AIConversation,
+                query,
+                raw_sort or {"created_at": -1},
+                after=after,
+                docs_per_page=docs_per_page,
+            )
+
         if paginate:
             return cast(
                 ResponsePaginate,
@@ -572,6 +680,7 @@ class ConversationStore:
         conversation = self._conversation(conversation)
         conversation.close()
         self.save(conversation)
+        self._forget(conversation)
 
     def record_response(
         self,
@@ -606,6 +715,7 @@ class ConversationStore:
     ) -> None:
         for conversation in conversations:
             conversation_id = self._id(conversation)
+            self._forget(conversation_id)
             item_query = eq(AIConversationItem.conversation, conversation_id)  # type: ignore[arg-type]
             conversation_query = eq(AIConversation.id, conversation_id)  # type: ignore[arg-type]
             self.db.delete(AIConversationItem, query=item_query)
@@ -621,7 +731,7 @@ class ConversationStore:
         self.db.save(model)  # type: ignore
         return model
 
-    def _next_order(self, conversation: AIConversation) -> int:
+    def _next_order(self, conversation: AIConversation | Id | str) -> int:
         latest = self.db.find_one(
             Model=AIConversationItem,
             query=eq(AIConversationItem.conversation, self._id(conversation)),  # type: ignore[arg-type]
@@ -636,20 +746,100 @@ class ConversationStore:
         conversation: AIConversation | Id | str,
         **fields: Any,
     ) -> AIConversationItem:
-        conversation_id = self._id(conversation)
-        conversation = self._conversation(conversation)
-        item = self.save(
-            AIConversationItem(
-                conversation=conversation_id,
-                session=conversation.session,
-                order=self._next_order(conversation),
+        created_at = now()
+        with self._lock:
+            state = self._state(conversation)
+            item = AIConversationItem(
+                id=Id(ObjectId()),
+                conversation=self._id(conversation),
+                session=state.session,
+                order=state.next_order,
+                created_at=created_at,
+                updated_at=created_at,
                 **fields,
             )
-        )
-        conversation.add_item(item)
-        self.save(conversation)
+            state.next_order += 1
+            state.pending.append(item)
         return item
 
+    def flush(self, conversation: AIConversation | Id | str | None = None) -> int:
+        """Write the buffered items of ``conversation``, or of every conversation.
+
+        Items of one conversation go out with one ``insert_many`` and the
+        conversation counters with one ``update_one``. Returns the number of
+        items written.
+        """
+        with self._lock:
+            if conversation is None:
+                keys = list(self._states)
+            else:
+                keys = [str(self._id(conversation))]
+            return sum(self._flush(key) for key in keys)
+
+    def _flush(self, key: str) -> int:
+        state = self._states.get(key)
+        if state is None or not state.pending:
+            return 0
+
+        self._insert_items(key, state)
+        items, state.pending = state.pending, []
+        self.database.raw[AIConversation._collection].update_one(
+            {"_id": document_id(key)},
+            {
+                "$inc": {"item_count": len(items)},
+                "$set": {"last_item_at": items[-1].created_at, "updated_at": now()},
+            },
+        )
+        return len(items)
+
+    def _insert_items(self, key: str, state: _ConversationState) -> None:
+        collection = self.database.raw[AIConversationItem._collection]
+        if not self._item_indexes_created:
+            collection.create_indexes(AIConversationItem._indexes)
+            self._item_indexes_created = True
+
+        try:
+            collection.insert_many(
+                [
+                    consolidate_dict(obj=item, dct={}, populate=False)
+                    for item in state.pending
+                ]
+            )
+        except BulkWriteError as exc:
+            # Another store appended to the conversation meanwhile and took
+            # some of the buffered orders, continue after its items
+            details = exc.details
+            if any(
+                error["code"] != DUPLICATE_KEY_ERROR for error in details["writeErrors"]
+            ):
+                raise
+            remaining = state.pending[details["nInserted"] :]
+            state.next_order = self._next_order(key)
+            for item in remaining:
+                item.order = state.next_order
+                state.next_order += 1
+            collection.insert_many(
+                [
+                    consolidate_dict(obj=item, dct={}, populate=False)
+                    for item in remaining
+                ]
+            )
+
+    def _state(self, conversation: AIConversation | Id | str) -> _ConversationState:
+        key = str(self._id(conversation))
+        state = self._states.get(key)
+        if state is None:
+            found = self._conversation(conversation)
+            state = _ConversationState(
+                session=found.session, next_order=self._next_order(key)
+            )
+            self._states[key] = state
+        return state
+
+    def _forget(self, conversation: AIConversation | Id | str) -> None:
+        with self._lock:
+            self._states.pop(str(self._id(conversation)), None)
+
     def _conversation(self, conversation: AIConversation | Id | str) -> AIConversation:
         found = self.get_conversation(conversation)
         if found is None:
@@ -692,17 +882,6 @@ class ConversationStore:
             return AIMessageRole(message[0]), message[1]
         return AIMessageRole.user, message
 
-    def _merge_dict(
-        self, current: dict[str, Any], patch: dict[str, Any]
-    ) -> dict[str, Any]:
-        merged = dict(current)
-        for key, value in patch.items():
-            if isinstance(value, dict) and isinstance(merged.get(key), dict):
-                merged[key] = self._merge_dict(merged[key], value)
-            else:
-                merged[key] = value
-        return merged
-
 
 _conversation_store: ConversationStore | None = None
 
@@ -0,0 +1,192 @@
+"""Keyset (seek) pagination over a MongoDB collection.
+
+Offset pagination counts the matching documents and skips everything before
+the requested page, so deep pages get slower. A keyset page instead continues
+after the sort key and ``_id`` of the last document of the previous page,
+carried in an opaque ``after`` cursor, and never counts.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+from types import NoneType, UnionType
+from typing import Any, Union, get_args, get_origin
+
+import bson
+from bson.errors import BSONError
+from pydantic import BaseModel
+from pymongo import ASCENDING
+from pymongo.collection import Collection
+
+# Same cap pyodmongo applies to offset pages
+MAX_DOCS_PER_PAGE = 1000
+
+ARRAY_TYPES = (list, tuple, set, frozenset)
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+class InvalidSortError(ValueError):
+    pass
+
+
+class CursorPage(BaseModel):
+    docs: list[Any]
+    docs_per_page: int
+    next_cursor: str | None = None
+
+
+def _sort_keys(sort: dict[str, int]) -> list[tuple[str, int]]:
+    keys = [(field, direction) for field, direction in sort.items() if field != "_id"]
+    # _id breaks ties between equal sort values, in the direction of the last key
+    tie_break = keys[-1][1] if keys else ASCENDING
+    return [*keys, ("_id", sort.get("_id", tie_break))]
+
+
+def _value(document: dict[str, Any], path: str) -> Any:
+    value: Any = document
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def encode_cursor(sort: dict[str, int], document: dict[str, Any]) -> str:
+    keys = _sort_keys(sort)
+    token = bson.encode(
+        {
+            "sort": [[field, direction] for field, direction in keys],
+            "values": [_value(document, field) for field, _ in keys],
+        }
+    )
+    return base64.urlsafe_b64encode(token).decode().rstrip("=")
+
+
+def decode_cursor(sort: dict[str, int], after: str) -> list[Any]:
+    """Sort key values of the document the page continues after."""
+    try:
+        token = bson.decode(base64.urlsafe_b64decode(after + "=" * (-len(after) % 4)))
+    except (binascii.Error, BSONError, ValueError) as exc:
+        raise InvalidCursorError("Malformed cursor.") from exc
+
+    keys = _sort_keys(sort)
+    issued_for = token.get("sort")
+    if (
+        not isinstance(issued_for, list)
+        or [tuple(key) if isinstance(key, list) else key for key in issued_for] != keys
+    ):
+        raise InvalidCursorError("Cursor was issued for a different sort order.")
+    values = token.get("values")
+    # seek_query indexes one value per sort key
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise InvalidCursorError("Malformed cursor.")
+    return values
+
+
+def seek_query(sort: dict[str, int], values: list[Any]) -> dict[str, Any]:
+    """Documents strictly after ``values`` in ``sort`` order.
+
+    Null and missing values sort before every other value, so ``$gt`` and
+    ``$lt`` against them would match nothing.
+    """
+    keys = _sort_keys(sort)
+    clauses = []
+    for index, (field, direction) in enumerate(keys):
+        clause = {prefix: values[i] for i, (prefix, _) in enumerate(keys[:index])}
+        value = values[index]
+        if direction == ASCENDING:
+            clause[field] = {"$ne": None} if value is None else {"$gt": value}
+        elif value is None:
+            # Nothing sorts after null in descending order
+            continue
+        elif field == "_id":
+            clause[field] = {"$lt": value}
+        else:
+            clause["$or"] = [{field: {"$lt": value}}, {field: None}]
+        clauses.append(clause)
+    return {"$or": clauses}
+
+
+def _is_array(annotation: Any) -> bool:
+    return annotation in ARRAY_TYPES or get_origin(annotation) in ARRAY_TYPES
+
+
+def _check_sort(model: type[BaseModel], sort: dict[str, int]) -> None:
+    """Reject sort fields that are arrays or inside one.
+
+    MongoDB sorts arrays by their smallest or largest element, which a cursor
+    holding one value per sort key cannot continue after.
+    """
+    for field in sort:
+        current: Any = model
+        for part in field.split("."):
+            if not (isinstance(current, type) and issubclass(current, BaseModel)):
+                break
+            declared = next(
+                (
+                    info
+                    for name, info in current.model_fields.items()
+                    if part in (name, info.alias)
+                ),
+                None,
+            )
+            if declared is None:
+                break
+            annotation = declared.annotation
+            if get_origin(annotation) in (Union, UnionType):
+                options = [arg for arg in get_args(annotation) if arg is not NoneType]
+                annotation = options[0] if len(options) == 1 else Any
+            if _is_array(annotation):
+                raise InvalidSortError(
+                    f"Cannot page by {field} with a cursor, it is an array or inside one."
+                )
+            current = annotation
+
+
+def lean_document(document: dict[str, Any]) -> dict[str, Any]:
+    """A projected document as returned without model validation, ``_id`` as ``id``."""
+    return {"id": document.pop("_id", None), **document}
+
+
+def find_cursor_page(
+    collection: Collection,
+    model: type[BaseModel],
+    query: dict[str, Any],
+    sort: dict[str, int],
+    *,
+    after: str | None = None,
+    docs_per_page: int = 50,
+    projection: dict[str, int] | None = None,
+) -> CursorPage:
+    """One keyset page, validated as ``model`` or, with a ``projection``, as
+    lean documents."""
+    _check_sort(model, sort)
+    docs_per_page = max(1, min(docs_per_page, MAX_DOCS_PER_PAGE))
+    if after:
+        seek = seek_query(sort, decode_cursor(sort, after))
+        query = {"$and": [query, seek]} if query else seek
+    if projection and any(projection.values()):
+        # The next cursor is read from the sort keys of the last document
+        projection = projection | {field: 1 for field, _ in _sort_keys(sort)}
+
+    documents = list(
+        collection.find(
+            query, projection, sort=_sort_keys(sort), limit=docs_per_page + 1
+        )
+    )
+    page = documents[:docs_per_page]
+    next_cursor = None
+    if len(documents) > docs_per_page:
+        next_cursor = encode_cursor(sort, page[-1])
+    return CursorPage(
+        docs=[
+            lean_document(document) if projection else model.model_validate(document)
+            for document in page
+        ],
+        docs_per_page=docs_per_page,
+        next_cursor=next_cursor,
+    )
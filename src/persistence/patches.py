@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, get_args, get_origin
+
+from bson import ObjectId
+from pydantic import BaseModel, TypeAdapter
+from pyodmongo import Id, MainBaseModel
+from pyodmongo.engines.utils import consolidate_dict
+
+
+def document_id(value: Any) -> Any:
+    """The stored ``_id`` for ``value``, an ObjectId where pyodmongo writes one."""
+    value = str(value)
+    return ObjectId(value) if ObjectId.is_valid(value) else value
+
+
+def set_fields(
+    model: type[BaseModel],
+    patch: dict[str, Any],
+    *,
+    exclude: set[str] | frozenset[str] = frozenset(),
+) -> dict[str, Any]:
+    """Translate a patch document into dotted ``$set`` paths.
+
+    Nested documents of required model or dict fields are merged key by key,
+    everything else replaces the stored value. Only the patched values are
+    validated, by the field they land on including its field validators. Keys
+    the model does not declare are dropped, like ``model_validate`` ignores them.
+    """
+    fields: dict[str, Any] = {}
+    _collect(model, patch, "", exclude, fields)
+    fields["updated_at"] = now()
+    return fields
+
+
+def now() -> datetime:
+    # MongoDB stores milliseconds, keep returned models equal to stored ones
+    value = datetime.now()
+    return value.replace(microsecond=value.microsecond // 1000 * 1000)
+
+
+def _collect(
+    model: type[BaseModel],
+    patch: dict[str, Any],
+    prefix: str,
+    exclude: set[str] | frozenset[str],
+    fields: dict[str, Any],
+) -> None:
+    for name, value in patch.items():
+        field = model.model_fields.get(name)
+        if field is None or (not prefix and name in exclude):
+            continue
+        path = f"{prefix}{name}"
+        annotation = field.annotation
+
+        if isinstance(value, dict) and _is_model(annotation):
+            _collect(annotation, value, f"{path}.", exclude, fields)
+        elif isinstance(value, dict) and get_origin(annotation) is dict:
+            value_type = get_args(annotation)[1] if get_args(annotation) else Any
+            adapter = TypeAdapter(value_type)
+            for key, item in value.items():
+                fields[f"{path}.{key}"] = _to_document(adapter.validate_python(item))
+        else:
+            validated = _validate_field(model, name, value)
+            if _is_id_field(model, name) and validated is not None:
+                validated = document_id(validated)
+            fields[path] = _to_document(validated)
+
+
+def _validate_field(model: type[BaseModel], name: str, value: Any) -> Any:
+    # Assignment validation runs the field's validators, which a TypeAdapter of
+    # the annotation would skip, on a throwaway instance
+    instance = model.model_construct()
+    model.__pydantic_validator__.validate_assignment(instance, name, value)
+    return instance.__dict__[name]
+
+
+def _is_model(annotation: Any) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+
+def _is_id_field(model: type[BaseModel], name: str) -> bool:
+    # pyodmongo stores fields typed as Id as ObjectIds, see consolidate_dict
+    db_field = getattr(model, name, None)
+    return getattr(db_field, "field_type", None) is Id
+
+
+def _to_document(value: Any) -> Any:
+    if isinstance(value, MainBaseModel):
+        return consolidate_dict(obj=value, dct={}, populate=False)
+    if isinstance(value, (list, tuple)):
+        return [_to_document(item) for item in value]
+    return value
@@ -1,16 +1,28 @@
 from __future__ import annotations
 
 import re
-from copy import deepcopy
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, ClassVar, List, Optional, TypeVar, cast
+from enum import Enum
+from math import ceil
+from typing import Any, ClassVar, Iterable, Iterator, List, Optional, TypeVar, cast
 
 from pydantic import Field, ValidationError
+from pymongo import ASCENDING, IndexModel, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
 from pyodmongo import DbModel, Id, MainBaseModel, ResponsePaginate
+from pyodmongo.engines.utils import consolidate_dict
 from pyodmongo.models.responses import DbResponse
 from pyodmongo.queries import eq, sort
 
 from src.persistence.database import MongoDatabase, get_database
+from src.persistence.keyset import (
+    MAX_DOCS_PER_PAGE,
+    CursorPage,
+    find_cursor_page,
+    lean_document,
+)
+from src.persistence.patches import document_id, set_fields
 from src.replays.types import (
     BsonBinary,
     Player,
@@ -29,6 +41,7 @@ class Metadata(DbModel):
     replay_summary_conversation: str | None = None
 
     _collection: ClassVar = "meta"
+    _indexes: ClassVar = [IndexModel([("replay", ASCENDING)])]
 
 
 class Alias(MainBaseModel):
@@ -70,6 +83,10 @@ class PlayerInfo(DbModel):
     tags: list[str] | None = None
 
     _collection: ClassVar = "players"
+    _indexes: ClassVar = [
+        IndexModel([("name", ASCENDING)]),
+        IndexModel([("aliases.name", ASCENDING)]),
+    ]
 
     def update_aliases(self, seen_on: Optional[datetime] = None):
         seen_on = seen_on or datetime.now()
@@ -110,10 +127,137 @@ class PlayerInfo(DbModel):
         return self.__str__()
 
 
+class ReplayImportOutcome(str, Enum):
+    imported = "imported"
+    filtered = "filtered"
+
+
+class ReplayManifestEntry(DbModel):
+    """A replay file that was already processed by a sync or the replay watcher.
+
+    ``size`` and ``mtime_ns`` identify the file version the outcome belongs to.
+    """
+
+    path: str
+    size: int
+    mtime_ns: int
+    filehash: str | None = None
+    outcome: ReplayImportOutcome
+    is_archon_mode: bool = False
+    is_instant_leave: bool = False
+    has_afk_player: bool = False
+
+    _collection: ClassVar = "replay_manifest"
+    _indexes: ClassVar = [IndexModel([("path", ASCENDING)], unique=True)]
+
+    @property
+    def imported(self) -> bool:
+        return self.outcome == ReplayImportOutcome.imported
+
+
+class MapStatsDay(DbModel):
+    """The student's results on one map in one matchup on one day.
+
+    Counters are incremented when a replay is ingested; ``replays`` holds the
+    ids already counted so re-ingesting a replay does not count it twice.
+    """
+
+    student: str
+    race: str
+    map: str
+    matchup: str
+    day: datetime
+    totalGames: int = 0
+    wins: int = 0
+    losses: int = 0
+    replays: list[str] = Field(default_factory=list)
+
+    _collection: ClassVar = "map_stats"
+    _indexes: ClassVar = [
+        IndexModel(
+            [
+                ("student", ASCENDING),
+                ("day", ASCENDING),
+                ("map", ASCENDING),
+                ("matchup", ASCENDING),
+            ],
+            unique=True,
+        )
+    ]
+
+    @classmethod
+    def from_replay(cls, replay: Replay, student: str) -> "MapStatsDay | None":
+        """The counters ``replay`` adds to ``student``'s map stats, None if the
+        student did not play in it."""
+        names = [player.name for player in replay.players]
+        if student not in names:
+            return None
+        index = names.index(student)
+        player = replay.players[index]
+        opponent = replay.players[1 if index == 0 else 0]
+        return cls(
+            student=student,
+            race=player.play_race,
+            map=replay.map_name,
+            matchup=f"{player.play_race}v{opponent.play_race}",
+            day=replay.date.replace(hour=0, minute=0, second=0, microsecond=0),
+            totalGames=1,
+            wins=int(player.result == "Win"),
+            losses=int(player.result == "Loss"),
+            replays=[str(replay.id)],
+        )
+
+
+MAP_STATS_DAY_KEY = ("student", "day", "map", "matchup")
+# Replay fields MapStatsDay.from_replay reads
+MAP_STATS_REPLAY_FIELDS = frozenset({"map_name", "date", "players"})
+DUPLICATE_KEY_ERROR = 11000
+
 ReplayStoreUpsertModel = Replay | Metadata | PlayerInfo
+
+PLAYER_INFO_WITHOUT_PORTRAITS = {
+    "portrait": 0,
+    "portrait_constructed": 0,
+    "aliases.portraits": 0,
+}
+# Columns of the webapp replay table, players reduced to what a row shows
+REPLAY_TABLE_PROJECTION = {
+    "date": 1,
+    "map_name": 1,
+    "game_length": 1,
+    "real_length": 1,
+    "real_type": 1,
+    "players.name": 1,
+    "players.toon_handle": 1,
+    "players.play_race": 1,
+    "players.result": 1,
+    "players.scaled_rating": 1,
+    "created_at": 1,
+    "updated_at": 1,
+}
 T = TypeVar("T", bound=ReplayStoreUpsertModel)
 
 
+@dataclass
+class BulkUpsertError:
+    index: int
+    """Position of the model in the models passed to ``bulk_upsert``."""
+    id: str
+    message: str
+
+
+@dataclass
+class BulkUpsertResult:
+    matched_count: int = 0
+    modified_count: int = 0
+    upserted_count: int = 0
+    errors: list[BulkUpsertError] = field(default_factory=list)
+
+    @property
+    def failed_ids(self) -> set[str]:
+        return {error.id for error in self.errors}
+
+
 class ReplayStore:
     def __init__(self, database: MongoDatabase | None = None):
         self._database = database
@@ -128,6 +272,15 @@ class ReplayStore:
     def db(self):
         return self.database.engine
 
+    def ensure_indexes(self) -> None:
+        """Create the indexes declared by the stored models.
+
+        pyodmongo only creates ``_indexes`` when a model is saved, so read paths
+        on an existing database would scan until the first write.
+        """
+        for model in (Replay, Metadata, PlayerInfo, ReplayManifestEntry, MapStatsDay):
+            self.database.raw[model._collection].create_indexes(model._indexes)
+
     def list_replays(
         self,
         *,
@@ -141,7 +294,15 @@ class ReplayStore:
         to_date: datetime | None = None,
         raw_query: dict[str, Any] | None = None,
         raw_sort: dict[str, int] | None = None,
-    ) -> ResponsePaginate:
+        keyset: bool = False,
+        after: str | None = None,
+        projection: dict[str, int] | None = None,
+    ) -> ResponsePaginate | CursorPage:
+        """A page of replays, newest first unless ``raw_sort`` says otherwise.
+
+        With a ``projection`` the page holds lean documents as stored instead
+        of validated ``Replay`` models, see ``REPLAY_TABLE_PROJECTION``.
+        """
         query = dict(raw_query or {})
 
         if player:
@@ -170,6 +331,26 @@ class ReplayStore:
                 date_query["$lte"] = to_date
             query["date"] = date_query
 
+        if keyset:
+            return find_cursor_page(
+                self.database.raw[Replay._collection],
+                Replay,
+                query,
+                raw_sort or {"date": -1},
+                after=after,
+                docs_per_page=docs_per_page,
+                projection=projection,
+            )
+        if projection:
+            return self._find_lean_page(
+                Replay,
+                query,
+                raw_sort or {"date": -1},
+                projection,
+                current_page=current_page,
+                docs_per_page=docs_per_page,
+            )
+
         return cast(
             ResponsePaginate,
             self.db.find_many(
@@ -182,6 +363,36 @@ class ReplayStore:
             ),
         )
 
+    def _find_lean_page(
+        self,
+        model: type[DbModel],
+        query: dict[str, Any],
+        sort: dict[str, int],
+        projection: dict[str, int],
+        *,
+        current_page: int,
+        docs_per_page: int,
+    ) -> ResponsePaginate:
+        """An offset page like ``find_many(paginate=True)``, of projected
+        documents that skip model validation."""
+        collection = self.database.raw[model._collection]
+        current_page = max(1, current_page)
+        docs_per_page = max(1, min(docs_per_page, MAX_DOCS_PER_PAGE))
+        count = collection.count_documents(query)
+        documents = collection.find(
+            query,
+            projection,
+            sort=list(sort.items()),
+            skip=(current_page - 1) * docs_per_page,
+            limit=docs_per_page,
+        )
+        return ResponsePaginate(
+            current_page=current_page,
+            page_quantity=ceil(count / docs_per_page),
+            docs_quantity=count,
+            docs=[lean_document(document) for document in documents],
+        )
+
     def get_replay(self, replay_or_id: Replay | ReplayId | str) -> Replay | None:
         replay_id = self._replay_id(replay_or_id)
         return self.db.find_one(
@@ -198,11 +409,13 @@ class ReplayStore:
         replay_id: ReplayId | str,
         replay: Replay,
     ) -> Replay:
+        existing = self.get_replay(replay_id)
         replay.id = str(replay_id)
         self.db.save(
             replay,
             query=eq(Replay.id, replay.id),  # type: ignore[arg-type]
         )
+        self.move_map_stats(existing, replay)
         return replay
 
     def patch_replay(
@@ -210,19 +423,20 @@ class ReplayStore:
         replay_id: ReplayId | str,
         patch: dict[str, Any],
     ) -> Replay | None:
-        existing = self.get_replay(replay_id)
-        if existing is None:
-            return None
-
-        merged = self._merge_dict(existing.model_dump(), patch)
-        merged["id"] = str(existing.id)
-        patched = Replay.model_validate(merged)
-        return self.replace_replay(existing.id, patched)
+        counted = MAP_STATS_REPLAY_FIELDS.intersection(patch)
+        existing = self.get_replay(replay_id) if counted else None
+        patched = self._patch(
+            Replay, {"_id": self._replay_id(replay_id)}, patch, exclude={"id"}
+        )
+        if counted and patched is not None:
+            self.move_map_stats(existing, patched)
+        return patched
 
     def delete_replay(self, replay_id: ReplayId | str) -> bool:
         existing = self.get_replay(replay_id)
         if existing is None:
             return False
+        self.move_map_stats(existing, None)
 
         metadata = self.get_metadata_by_replay_id(str(existing.id))
         if metadata is not None:
@@ -257,6 +471,169 @@ class ReplayStore:
                 }
             )
 
+    def bulk_upsert(
+        self, models: Iterable[Replay | PlayerInfo], batch_size: int = 100
+    ) -> BulkUpsertResult:
+        """Replace or insert ``models`` by id with one unordered bulk write per batch.
+
+        A failing document does not stop the rest of its batch; it is reported
+        in ``BulkUpsertResult.errors`` instead of raising.
+        """
+        result = BulkUpsertResult()
+        batch: list[tuple[int, Replay | PlayerInfo]] = []
+        for index, model in enumerate(models):
+            batch.append((index, model))
+            if len(batch) >= batch_size:
+                self._bulk_upsert_batch(batch, result)
+                batch = []
+        if batch:
+            self._bulk_upsert_batch(batch, result)
+        return result
+
+    def _bulk_upsert_batch(
+        self, batch: list[tuple[int, Replay | PlayerInfo]], result: BulkUpsertResult
+    ) -> None:
+        now = datetime.now()
+        now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+        by_collection: dict[str, list[tuple[int, Replay | PlayerInfo]]] = {}
+        for index, model in batch:
+            by_collection.setdefault(model._collection, []).append((index, model))
+
+        for collection, items in by_collection.items():
+            operations = []
+            for _, model in items:
+                if model.id is None:
+                    raise ValueError(f"{model.__class__.__name__} without id")
+                document = consolidate_dict(obj=model, dct={}, populate=False)
+                model_id = document.pop("_id")
+                # Like pyodmongo's save, keep created_at of documents already stored
+                created_at = document.pop("created_at") or now
+                document["updated_at"] = now
+                operations.append(
+                    UpdateOne(
+                        {"_id": model_id},
+                        {"$set": document, "$setOnInsert": {"created_at": created_at}},
+                        upsert=True,
+                    )
+                )
+
+            try:
+                details = (
+                    self.database.raw[collection]
+                    .bulk_write(operations, ordered=False)
+                    .bulk_api_result
+                )
+            except BulkWriteError as exc:
+                details = exc.details
+
+            result.matched_count += details["nMatched"]
+            result.modified_count += details["nModified"]
+            result.upserted_count += details["nUpserted"]
+            for error in details["writeErrors"]:
+                index, model = items[error["index"]]
+                result.errors.append(
+                    BulkUpsertError(
+                        index=index, id=str(model.id), message=error["errmsg"]
+                    )
+                )
+
+    def increment_map_stats(self, days: Iterable[MapStatsDay]) -> int:
+        """Add the counters of ``days`` to the stored days with ``$inc``.
+
+        Each of ``days`` holds the counters of the replays it lists. Days of
+        replays that were already counted are skipped. Returns the number of
+        days that were added.
+        """
+        operations = []
+        for day in days:
+            key = {field: getattr(day, field) for field in MAP_STATS_DAY_KEY}
+            operations.append(
+                UpdateOne(
+                    {**key, "replays": {"$nin": day.replays}},
+                    {
+                        "$inc": {
+                            "totalGames": day.totalGames,
+                            "wins": day.wins,
+                            "losses": day.losses,
+                        },
+                        "$push": {"replays": {"$each": day.replays}},
+                        "$set": {"race": day.race},
+                    },
+                    upsert=True,
+                )
+            )
+        if not operations:
+            return 0
+
+        collection = self.database.raw[MapStatsDay._collection]
+        try:
+            details = collection.bulk_write(operations, ordered=False).bulk_api_result
+        except BulkWriteError as exc:
+            # The upsert of an already counted replay collides with its day
+            details = exc.details
+            if any(
+                error["code"] != DUPLICATE_KEY_ERROR for error in details["writeErrors"]
+            ):
+                raise
+        return details["nModified"] + details["nUpserted"]
+
+    def move_map_stats(self, before: Replay | None, after: Replay | None) -> None:
+        """Move a replay from the map stats days it counted in as ``before`` to
+        the days it counts in as ``after``, None when it is not stored.
+
+        Only students that have map stats are counted; a replay whose counted
+        fields did not change is left alone.
+        """
+        collection = self.database.raw[MapStatsDay._collection]
+        students = collection.distinct("student")
+        removed, added = (
+            [
+                day
+                for student in students
+                if replay is not None
+                and (day := MapStatsDay.from_replay(replay, student)) is not None
+            ]
+            for replay in (before, after)
+        )
+        if [day.model_dump() for day in removed] == [day.model_dump() for day in added]:
+            return
+
+        operations = []
+        for day in removed:
+            key = {field: getattr(day, field) for field in MAP_STATS_DAY_KEY}
+            operations.append(
+                UpdateOne(
+                    {**key, "replays": {"$in": day.replays}},
+                    {
+                        "$inc": {
+                            "totalGames": -day.totalGames,
+                            "wins": -day.wins,
+                            "losses": -day.losses,
+                        },
+                        "$pullAll": {"replays": day.replays},
+                    },
+                )
+            )
+        if operations:
+            collection.bulk_write(operations, ordered=False)
+            collection.delete_many(
+                {"student": {"$in": students}, "totalGames": {"$lte": 0}}
+            )
+        self.increment_map_stats(added)
+
+    def clear_map_stats(self, student: str) -> int:
+        return (
+            self.database.raw[MapStatsDay._collection]
+            .delete_many({"student": student})
+            .deleted_count
+        )
+
+    def aggregate_map_stats(
+        self, pipeline: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """Run ``pipeline`` on the map stats collection and return the raw documents."""
+        return list(self.database.raw[MapStatsDay._collection].aggregate(pipeline))
+
     def get_most_recent_for_player(self, player_name: str) -> Replay:
         most_recent = self.db.find_one(
             Model=Replay,
@@ -267,6 +644,15 @@ class ReplayStore:
             raise ValueError(f"No replays found for {player_name}")
         return most_recent
 
+    def get_latest_replay_id(self, player_name: str) -> str | None:
+        """Id of the most recent replay of ``player_name``, without loading it."""
+        document = self.database.raw[Replay._collection].find_one(
+            {"players.name": player_name},
+            {"_id": 1},
+            sort=[("unix_timestamp", -1)],
+        )
+        return None if document is None else str(document["_id"])
+
     def get_recent_for_player(
         self, toon_handle: ToonHandle, *, limit: int = 5
     ) -> list[Replay]:
@@ -280,28 +666,52 @@ class ReplayStore:
         )
         return response.docs
 
+    def aggregate_replays(self, pipeline: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Run ``pipeline`` on the replay collection and return the raw documents."""
+        return list(self.database.raw[Replay._collection].aggregate(pipeline))
+
     def find(self, model: T) -> T | None:
         model_class = model.__class__
         query = eq(model_class.id, model.id)  # type: ignore[arg-type]
         return self.db.find_one(Model=model_class, query=query)
 
-    def find_many_dict(self, model, raw_query: dict):
-        current_page = 1
-        while True:
-            response: ResponsePaginate = self.db.find_many(
-                Model=model,
-                paginate=True,
-                current_page=current_page,
-                docs_per_page=100,
-                raw_query=raw_query,
-                as_dict=True,
-            )  # type: ignore[assignment]
-            for doc in response.docs:
-                yield doc
+    def find_many_dict(
+        self,
+        model,
+        raw_query: dict,
+        *,
+        projection: dict[str, Any] | None = None,
+        batch_size: int = 100,
+    ) -> Iterator[dict[str, Any]]:
+        """Stream raw documents of ``model`` from a single cursor.
+
+        The server hands out ``batch_size`` documents per round trip, so a scan
+        over the whole collection runs in constant memory without counting or
+        skipping.
+        """
+        with self.database.raw[model._collection].find(
+            raw_query, projection, batch_size=batch_size
+        ) as cursor:
+            yield from cursor
+
+    def get_manifest_entry(self, path: str) -> ReplayManifestEntry | None:
+        return self.db.find_one(
+            Model=ReplayManifestEntry,
+            raw_query={"path": path},
+        )
+
+    def list_manifest_entries(self, paths: list[str]) -> list[ReplayManifestEntry]:
+        return cast(
+            list[ReplayManifestEntry],
+            self.db.find_many(
+                Model=ReplayManifestEntry,
+                raw_query={"path": {"$in": paths}},
+            ),
+        )
 
-            if current_page >= response.page_quantity:
-                break
-            current_page += 1
+    def save_manifest_entry(self, entry: ReplayManifestEntry) -> ReplayManifestEntry:
+        self.db.save(entry, raw_query={"path": entry.path})
+        return entry
 
     def get_metadata(self, metadata_or_id: Metadata | Id | str) -> Metadata | None:
         metadata_id = self._id(metadata_or_id)
@@ -370,15 +780,9 @@ class ReplayStore:
         replay_id: ReplayId | str,
         patch: dict[str, Any],
     ) -> Metadata | None:
-        existing = self.get_metadata_by_replay_id(replay_id)
-        if existing is None:
-            return None
-
-        merged = self._merge_dict(existing.model_dump(), patch)
-        merged["id"] = str(existing.id)
-        merged["replay"] = str(replay_id)
-        patched = Metadata.model_validate(merged)
-        return self.replace_metadata_for_replay(replay_id, patched)
+        return self._patch(
+            Metadata, {"replay": str(replay_id)}, patch, exclude={"id", "replay"}
+        )
 
     def list_players(
         self,
@@ -389,7 +793,9 @@ class ReplayStore:
         tag: str | None = None,
         raw_query: dict[str, Any] | None = None,
         raw_sort: dict[str, int] | None = None,
-    ) -> ResponsePaginate:
+        keyset: bool = False,
+        after: str | None = None,
+    ) -> ResponsePaginate | CursorPage:
         filters: list[dict[str, Any]] = []
         if raw_query:
             filters.append(dict(raw_query))
@@ -414,6 +820,16 @@ class ReplayStore:
         else:
             query = {"$and": filters}
 
+        if keyset:
+            return find_cursor_page(
+                self.database.raw[PlayerInfo._collection],
+                PlayerInfo,
+                query,
+                raw_sort or {"name": 1},
+                after=after,
+                docs_per_page=docs_per_page,
+            )
+
         return cast(
             ResponsePaginate,
             self.db.find_many(
@@ -455,16 +871,12 @@ class ReplayStore:
         toon_handle: ToonHandle | str,
         patch: dict[str, Any],
     ) -> PlayerInfo | None:
-        existing = self.get_player_info(toon_handle)
-        if existing is None:
-            return None
-
-        merged = self._merge_dict(existing.model_dump(), patch)
-        normalized = str(existing.toon_handle)
-        merged["id"] = normalized
-        merged["toon_handle"] = normalized
-        patched = PlayerInfo.model_validate(merged)
-        return self.replace_player(existing.toon_handle, patched)
+        return self._patch(
+            PlayerInfo,
+            {"_id": str(ToonHandle(str(toon_handle)))},
+            patch,
+            exclude={"id", "toon_handle"},
+        )
 
     def delete_player(self, toon_handle: ToonHandle | str) -> bool:
         existing = self.get_player_info(toon_handle)
@@ -480,15 +892,38 @@ class ReplayStore:
     def get_replay_players(
         self,
         replay_id: ReplayId | str,
+        *,
+        player_projection: dict[str, int] | None = PLAYER_INFO_WITHOUT_PORTRAITS,
     ) -> list[tuple[Player, PlayerInfo | None]] | None:
-        replay = self.get_replay(replay_id)
-        if replay is None:
+        """Players of a replay with their stored player info, in one aggregation.
+
+        ``player_projection`` applies to the player info documents; by default
+        the portrait blobs are left out. Pass None to load full documents.
+        """
+        lookup: dict[str, Any] = {
+            "from": PlayerInfo._collection,
+            "localField": "players.toon_handle",
+            "foreignField": "_id",
+            "as": "player_infos",
+        }
+        if player_projection:
+            lookup["pipeline"] = [{"$project": player_projection}]
+        documents = self.aggregate_replays(
+            [
+                {"$match": {"_id": self._replay_id(replay_id)}},
+                {"$project": {"players": 1}},
+                {"$lookup": lookup},
+            ]
+        )
+        if not documents:
             return None
 
-        return [
-            (replay_player, self.get_player_info(replay_player.toon_handle))
-            for replay_player in replay.players
-        ]
+        player_infos = {
+            info["_id"]: PlayerInfo.model_validate(info)
+            for info in documents[0]["player_infos"]
+        }
+        players = [Player.model_validate(player) for player in documents[0]["players"]]
+        return [(player, player_infos.get(player.toon_handle)) for player in players]
 
     def replace_metadata(self, metadata_id: Id | str, metadata: Metadata) -> Metadata:
         metadata.id = self._id(metadata_id)
@@ -503,15 +938,12 @@ class ReplayStore:
         metadata_id: Id | str,
         patch: dict[str, Any],
     ) -> Metadata | None:
-        existing = self.get_metadata(metadata_id)
-        if existing is None:
-            return None
-
-        merged = self._merge_dict(existing.model_dump(), patch)
-        merged["id"] = str(existing.id)
-        patched = Metadata.model_validate(merged)
-        assert existing.id is not None
-        return self.replace_metadata(existing.id, patched)
+        return self._patch(
+            Metadata,
+            {"_id": document_id(self._id(metadata_id))},
+            patch,
+            exclude={"id"},
+        )
 
     def delete_metadata(self, metadata_id: Id | str) -> bool:
         existing = self.get_metadata(metadata_id)
@@ -540,16 +972,22 @@ class ReplayStore:
             raise ValueError("Replay must be saved before use")
         return str(model_id)
 
-    def _merge_dict(
-        self, current: dict[str, Any], patch: dict[str, Any]
-    ) -> dict[str, Any]:
-        merged = deepcopy(current)
-        for key, value in patch.items():
-            if isinstance(value, dict) and isinstance(merged.get(key), dict):
-                merged[key] = self._merge_dict(merged[key], value)
-            else:
-                merged[key] = value
-        return merged
+    def _patch(
+        self,
+        model: type[T],
+        query: dict[str, Any],
+        patch: dict[str, Any],
+        *,
+        exclude: set[str],
+    ) -> T | None:
+        document = self.database.raw[model._collection].find_one_and_update(
+            query,
+            {"$set": set_fields(model, patch, exclude=exclude)},
+            return_document=ReturnDocument.AFTER,
+        )
+        if document is None:
+            return None
+        return model.model_validate(document)
 
 
 _replay_store: ReplayStore | None = None
@@ -8,6 +8,7 @@ from pyodmongo import DbModel, Id, ResponsePaginate
 from pyodmongo.queries import eq, sort
 
 from src.persistence.database import MongoDatabase, get_database
+from src.persistence.keyset import CursorPage, find_cursor_page
 from src.runtime.settings import AIBackend
 
 if TYPE_CHECKING:
@@ -79,7 +80,9 @@ class SessionStore:
         from_date: datetime | None = None,
         to_date: datetime | None = None,
         ai_backend: AIBackend | None = None,
-    ) -> ResponsePaginate:
+        keyset: bool = False,
+        after: str | None = None,
+    ) -> ResponsePaginate | CursorPage:
         raw_query: dict[str, object] = {}
         if from_date is not None or to_date is not None:
             session_date_query: dict[str, datetime] = {}
@@ -92,6 +95,16 @@ class SessionStore:
         if ai_backend is not None:
             raw_query["ai_backend"] = ai_backend.value
 
+        if keyset:
+            return find_cursor_page(
+                self.database.raw[Session._collection],
+                Session,
+                raw_query,
+                {"session_date": -1},
+                after=after,
+                docs_per_page=docs_per_page,
+            )
+
         return self.db.find_many(
             Model=Session,
             paginate=True,
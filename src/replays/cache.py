@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import bson
+from pydantic import ValidationError
+
+from log import DEFAULT_LOGGER_NAME
+
+from .types import Replay
+
+if TYPE_CHECKING:
+    from src.replays.reader import ReaderProfile
+
+log = logging.getLogger(f"{DEFAULT_LOGGER_NAME}.{__name__}")
+
+# Bump when replay_to_dict or the Replay model change what ends up in a replay.
+REPLAY_CACHE_VERSION = 1
+
+_VERSIONED_PACKAGES = ["sc2reader", "sc2reader-plugins", "spawningtool"]
+
+
+def _package_version(name: str) -> str:
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def reader_version(profile: ReaderProfile, include_map_details: bool) -> str:
+    """Short hash of everything besides the file that shapes a typed replay."""
+    parts = [
+        f"cache={REPLAY_CACHE_VERSION}",
+        f"profile={profile.name}",
+        f"map_details={include_map_details}",
+        *(f"{name}={_package_version(name)}" for name in _VERSIONED_PACKAGES),
+    ]
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:12]
+
+
+def file_sha256(file_path: str | Path) -> str:
+    with open(file_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class TypedReplayCache:
+    """On-disk cache of typed replays stored as BSON.
+
+    Entries are keyed by the replay filehash and the reader version, so a
+    plugin upgrade or a different reader profile never serves stale data.
+    Once the cache grows beyond ``max_bytes`` the least recently used entries
+    are evicted; a hit refreshes the entry's mtime.
+    """
+
+    def __init__(self, cache_dir: str | Path, *, reader_version: str, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.reader_version = reader_version
+        self.max_bytes = max_bytes
+        self._size: int | None = None
+
+    def entry_path(self, filehash: str) -> Path:
+        return self.cache_dir / filehash[:2] / f"{filehash}.{self.reader_version}.bson"
+
+    def get(self, filehash: str) -> Replay | None:
+        path = self.entry_path(filehash)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except OSError as exc:
+            log.warning(f"Failed to read cached replay {path}: {exc}")
+            return None
+
+        try:
+            replay = Replay.model_validate(bson.decode(data))
+        except (bson.errors.InvalidBSON, ValidationError) as exc:
+            log.warning(f"Discarding unreadable cached replay {path}: {exc}")
+            self._discard(path)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return replay
+
+    def put(self, replay: Replay) -> None:
+        path = self.entry_path(replay.filehash)
+        data = bson.encode(replay.model_dump(mode="python"))
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            log.warning(f"Failed to cache replay {path}: {exc}")
+            return
+
+        self._size = self._current_size() + len(data)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache is below 90% of max_bytes."""
+        entries = self._scan()
+        size = sum(entry_size for _, entry_size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        for _, entry_size, path in sorted(entries):
+            if size <= target:
+                break
+            if self._discard(path):
+                size -= entry_size
+        self._size = size
+
+    def _current_size(self) -> int:
+        if self._size is None:
+            self._size = sum(entry_size for _, entry_size, _ in self._scan())
+        return self._size
+
+    def _scan(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for path in self.cache_dir.glob("*/*.bson"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _discard(self, path: Path) -> bool:
+        try:
+            path.unlink()
+            return True
+        except OSError:
+            return False
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+from log import DEFAULT_LOGGER_NAME
+
+if TYPE_CHECKING:
+    from src.persistence.replay_store import ReplayManifestEntry
+    from src.replays.reader import ReaderProfile, ReplayReader
+    from src.replays.types import Replay
+    from src.runtime.settings import Config
+
+log = logging.getLogger(f"{DEFAULT_LOGGER_NAME}.{__name__}")
+
+
+@dataclass
+class ReplayParseResult:
+    """Outcome of parsing and filtering a single replay file.
+
+    ``replay`` is set when the replay passed all reader filters; otherwise the
+    filter flags tell the caller why it was filtered.
+    """
+
+    file_path: str
+    replay: Replay | None = None
+    filehash: str | None = None
+    is_archon_mode: bool = False
+    is_instant_leave: bool = False
+    has_afk_player: bool = False
+
+    @property
+    def accepted(self) -> bool:
+        return self.replay is not None
+
+    @classmethod
+    def from_manifest_entry(
+        cls, file_path: str | Path, entry: ReplayManifestEntry
+    ) -> ReplayParseResult:
+        """Rebuild the filter outcome of a replay without parsing it again."""
+        return cls(
+            file_path=str(file_path),
+            filehash=entry.filehash,
+            is_archon_mode=entry.is_archon_mode,
+            is_instant_leave=entry.is_instant_leave,
+            has_afk_player=entry.has_afk_player,
+        )
+
+
+def parse_replay_file(reader: ReplayReader, file_path: str | Path) -> ReplayParseResult:
+    """Parse a replay in two stages.
+
+    The header stage rejects non-ladder, archon and instant-leave replays
+    without reading events; survivors are served from the reader's typed
+    replay cache or get the full load with plugins. AFK players can only be
+    detected after the full load.
+    """
+    replay_header = reader.load_replay_header(file_path)
+    if not reader.apply_header_filters(replay_header):
+        return ReplayParseResult(
+            file_path=str(file_path),
+            filehash=getattr(replay_header, "filehash", None),
+            is_archon_mode=reader.is_archon_mode(replay_header),
+            is_instant_leave=reader.is_instant_leave(replay_header),
+        )
+
+    # Only replays that passed every filter are cached.
+    filehash = getattr(replay_header, "filehash", None)
+    cached = reader.get_cached_replay(filehash)
+    if cached is not None:
+        return ReplayParseResult(
+            file_path=str(file_path), replay=cached, filehash=filehash
+        )
+
+    replay_raw = reader.load_replay_raw(file_path)
+    filehash = getattr(replay_raw, "filehash", filehash)
+    if reader.apply_filters(replay_raw):
+        replay = reader.to_typed_replay(replay_raw)
+        reader.cache_replay(replay)
+        return ReplayParseResult(
+            file_path=str(file_path), replay=replay, filehash=filehash
+        )
+
+    return ReplayParseResult(
+        file_path=str(file_path),
+        filehash=filehash,
+        is_archon_mode=reader.is_archon_mode(replay_raw),
+        is_instant_leave=reader.is_instant_leave(replay_raw),
+        has_afk_player=reader.has_afk_player(replay_raw),
+    )
+
+
+_worker_reader: ReplayReader | None = None
+
+
+def _init_worker(settings: Config, profile: ReaderProfile) -> None:
+    global _worker_reader
+
+    from src.replays.reader import ReplayReader
+
+    logging.getLogger("sc2reader").setLevel(logging.CRITICAL)
+    _worker_reader = ReplayReader(settings=settings, profile=profile)
+
+
+def _parse_in_worker(file_path: str) -> ReplayParseResult:
+    assert _worker_reader is not None, "Worker process was not initialized"
+    return parse_replay_file(_worker_reader, file_path)
+
+
+def parse_replay_files(
+    file_paths: Iterable[str | Path],
+    *,
+    reader: ReplayReader,
+    workers: int = 1,
+) -> Iterator[ReplayParseResult]:
+    """Parse replay files, optionally in a process pool.
+
+    Results are yielded in input order, so callers see the same sequence
+    regardless of the number of workers. Each worker process builds its own
+    ``ReplayReader`` from ``reader.settings`` and ``reader.profile``.
+    """
+    paths = [str(file_path) for file_path in file_paths]
+
+    if workers <= 1 or len(paths) <= 1:
+        for file_path in paths:
+            yield parse_replay_file(reader, file_path)
+        return
+
+    workers = min(workers, len(paths))
+    log.debug(f"Parsing {len(paths)} replays with {workers} worker processes")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(reader.settings, reader.profile),
+    ) as executor:
+        yield from executor.map(_parse_in_worker, paths, chunksize=4)
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import logging
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable
+
+from src.persistence.replay_store import ReplayImportOutcome, ReplayManifestEntry
+
+from log import DEFAULT_LOGGER_NAME
+
+if TYPE_CHECKING:
+    from src.persistence.replay_store import ReplayStore
+    from src.replays.ingest import ReplayParseResult
+
+log = logging.getLogger(f"{DEFAULT_LOGGER_NAME}.{__name__}")
+
+
+def _manifest_path(file_path: str | Path) -> str:
+    return str(Path(file_path).resolve())
+
+
+def _stat(path: str) -> os.stat_result | None:
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+class ReplayManifest:
+    """Tracks which replay files were already imported or filtered.
+
+    A manifest entry is only trusted while the file's size and mtime match, so
+    checking a known replay costs a single ``stat`` call instead of a parse.
+    """
+
+    def __init__(self, replay_store: ReplayStore):
+        self.replay_store = replay_store
+        self._entries: dict[str, ReplayManifestEntry | None] = {}
+
+    def preload(self, file_paths: Iterable[str | Path]) -> None:
+        """Fetch the entries for many files with one query."""
+        paths = [_manifest_path(file_path) for file_path in file_paths]
+        if not paths:
+            return
+        self._entries.update(dict.fromkeys(paths))
+        for entry in self.replay_store.list_manifest_entries(paths):
+            self._entries[entry.path] = entry
+
+    def lookup(self, file_path: str | Path) -> ReplayManifestEntry | None:
+        """Return the entry for an unchanged file, or None if it must be parsed."""
+        path = _manifest_path(file_path)
+        stat = _stat(path)
+        if stat is None:
+            return None
+
+        if path in self._entries:
+            entry = self._entries[path]
+        else:
+            entry = self.replay_store.get_manifest_entry(path)
+
+        if (
+            entry is None
+            or entry.size != stat.st_size
+            or entry.mtime_ns != stat.st_mtime_ns
+        ):
+            return None
+        return entry
+
+    def record(self, parsed: ReplayParseResult, *, imported: bool) -> None:
+        path = _manifest_path(parsed.file_path)
+        stat = _stat(path)
+        if stat is None:
+            return
+
+        entry = ReplayManifestEntry(
+            path=path,
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            filehash=parsed.filehash,
+            outcome=(
+                ReplayImportOutcome.imported
+                if imported
+                else ReplayImportOutcome.filtered
+            ),
+            is_archon_mode=parsed.is_archon_mode,
+            is_instant_leave=parsed.is_instant_leave,
+            has_afk_player=parsed.has_afk_player,
+        )
+        try:
+            self._entries[path] = self.replay_store.save_manifest_entry(entry)
+        except Exception as exc:
+            log.warning(f"Failed to record {path} in replay manifest: {exc}")
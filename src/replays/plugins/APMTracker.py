@@ -1,5 +1,49 @@
-from sc2reader.factories.plugins.utils import plugin
 from collections import defaultdict
+from operator import attrgetter
+
+import numpy as np
+from sc2reader.factories.plugins.utils import plugin
+
+# LotV game seconds are 1.4 times faster than real seconds.
+ACTION_WEIGHT = 1.4
+
+OTHER_EVENT = 0
+ACTION_EVENT = 1
+LEAVE_EVENT = 2
+
+
+def event_kind(name: str) -> int:
+    if name == "SelectionEvent" or "CommandEvent" in name or "ControlGroup" in name:
+        return ACTION_EVENT
+    if name == "PlayerLeaveEvent":
+        return LEAVE_EVENT
+    return OTHER_EVENT
+
+
+class EventKinds(dict[str, int]):
+    """Caches the kind per event name, so the substring checks in
+    ``event_kind`` run once per distinct name instead of once per event."""
+
+    def __missing__(self, name: str) -> int:
+        kind = self[name] = event_kind(name)
+        return kind
+
+
+def player_event_arrays(events, kinds: EventKinds) -> tuple[np.ndarray, np.ndarray]:
+    """Columnar ``seconds`` and ``kinds`` arrays of a player's events."""
+    seconds = np.fromiter(map(attrgetter("second"), events), np.int64, len(events))
+    event_kinds = np.fromiter(
+        map(kinds.__getitem__, map(attrgetter("name"), events)), np.int8, len(events)
+    )
+    return seconds, event_kinds
+
+
+def _weighted_counts(counts: np.ndarray) -> dict[int, float]:
+    indices = np.flatnonzero(counts)
+    return {
+        int(index): int(count) * ACTION_WEIGHT
+        for index, count in zip(indices, counts[indices])
+    }
 
 
 @plugin
@@ -11,27 +55,28 @@ def APMTracker(replay):
     Also provides ``player.avg_apm`` which is defined as the sum of all the
     above actions divided by the number of seconds played by the player (not
     necessarily the whole game) multiplied by 60.
+
+    Actions are counted per second and minute with ``np.bincount`` over a
+    columnar event array instead of accumulating per event.
     """
+    kinds = EventKinds()
     for player in replay.players:
-        player.aps = defaultdict(int)
-        player.apm = defaultdict(int)
-        player.seconds_played = replay.length.seconds
-
-        for event in player.events:
-            if (
-                event.name == "SelectionEvent"
-                or "CommandEvent" in event.name
-                or "ControlGroup" in event.name
-            ):
-                player.aps[event.second] += 1.4
-                player.apm[int(event.second / 60)] += 1.4
-
-            elif event.name == "PlayerLeaveEvent":
-                player.seconds_played = event.second
-
-        if len(player.apm) > 0 and player.seconds_played > 0:
+        seconds, event_kinds = player_event_arrays(player.events, kinds)
+
+        action_seconds = seconds[event_kinds == ACTION_EVENT]
+        leave_seconds = seconds[event_kinds == LEAVE_EVENT]
+        player.seconds_played = (
+            int(leave_seconds[-1]) if len(leave_seconds) else replay.length.seconds
+        )
+
+        per_second = np.bincount(action_seconds)
+        per_minute = np.bincount(action_seconds // 60)
+        player.aps = defaultdict(int, _weighted_counts(per_second))
+        player.apm = defaultdict(int, _weighted_counts(per_minute))
+
+        if len(action_seconds) > 0 and player.seconds_played > 0:
             player.avg_apm = (
-                sum(player.aps.values()) / float(player.seconds_played) * 60
+                len(action_seconds) * ACTION_WEIGHT / float(player.seconds_played) * 60
             )
         else:
             player.avg_apm = 0
@@ -1,4 +1,3 @@
-import numpy as np
 from Levenshtein import distance as levenshtein
 from sc2reader.factories.plugins.utils import plugin
 
@@ -40,97 +39,76 @@ def loserDoesGG(replay) -> bool:
     return any(is_gg(m.text.lower()) for m in loser_messages)
 
 
+SKIPPED_EVENTS = {
+    "CameraEvent",
+    "PlayerStatsEvent",
+    "ControlGroupEvent",
+    "SetControlGroupEvent",
+    "GetControlGroupEvent",
+    "ProgressEvent",
+}
+# Commands which neither confirm nor cancel a pending worker selection.
+TARGET_POINT_EVENTS = {"TargetPointCommandEvent", "UpdateTargetPointCommandEvent"}
+
+
+class WorkerMicroState:
+    """Streaming worker micro score of one player.
+
+    A worker selection counts once the next relevant command sends the
+    workers to a mineral field; any other event drops the pending selection.
+    Selections in the first 2 seconds count as split, later ones as micro.
+    """
+
+    __slots__ = ("split_score", "micro_score", "pending_second")
+
+    def __init__(self):
+        self.split_score = 0
+        self.micro_score = 0
+        self.pending_second: int | None = None
+
+    def feed(self, event) -> None:
+        name = event.name
+        if name in TARGET_POINT_EVENTS:
+            return
+        if name == "UpdateTargetUnitCommandEvent":
+            if "MineralField" in getattr(event.target, "name", ""):
+                if self.pending_second is not None:
+                    if self.pending_second > 2:
+                        self.micro_score += 1
+                    else:
+                        self.split_score += 1
+                    self.pending_second = None
+            return
+
+        self.pending_second = None
+        if (
+            name == "SelectionEvent"
+            and event.objects
+            and event.objects[0].name in WORKERS
+        ):
+            self.pending_second = event.second
+
+    @property
+    def score(self) -> tuple[int, int]:
+        return (self.split_score, self.micro_score)
+
+
 def player_worker_micro(replay) -> dict[int, tuple]:
     """Calculate worker micro score for each player.
     If player commands workers to minerals in the first 2 seconds, add to split score
     If player commands workers to minerals after 2 seconds, add to micro score
     """
+    states = {player.sid: WorkerMicroState() for player in replay.players}
 
-    columns = [
-        "time",
-        "player",
-        "player_sid",
-        "event",
-        "object",
-        "action",
-        "target",
-        "target_type",
-    ]
-    rep = []
-
-    skip = [
-        "CameraEvent",
-        "PlayerStatsEvent",
-        "ControlGroupEvent",
-        "SetControlGroupEvent",
-        "GetControlGroupEvent",
-        "ProgressEvent",
-    ]
-
-    for i, event in enumerate(replay.game_events):
+    for event in replay.game_events:
         if event.second > MAX_TIME_TO_ANALYZE:
             break
-
-        if event.name in skip:
+        player = getattr(event, "player", None)
+        if player is None or event.name in SKIPPED_EVENTS:
             continue
 
-        values = [
-            event.second,
-            event.player.name if hasattr(event, "player") else np.nan,
-            event.player.sid if hasattr(event, "player") else np.nan,
-            event.name,
-            (
-                event.objects[0].name
-                if hasattr(event, "objects") and len(event.objects) > 0
-                else np.nan
-            ),
-            (event.ability_name if hasattr(event, "ability_name") else np.nan),
-            (
-                event.target.name
-                if hasattr(event, "target") and hasattr(event.target, "name")
-                else np.nan
-            ),
-            (
-                event.target.type
-                if hasattr(event, "target") and hasattr(event.target, "type")
-                else np.nan
-            ),
-        ]
-        rep.append(dict(zip(columns, values)))
-
-    ret = {}
+        state = states.get(player.sid)
+        if state is not None:
+            state.feed(event)
 
-    for player in replay.players:
-        p = [r for r in rep if r["player_sid"] == player.sid]
-        ret[player.sid] = get_micro_score(p)
-
-    return ret
-
-
-def get_micro_score(p0: list) -> tuple:
-    micro_score = 0
-    split_score = 0
-    found_unit_target = False
-    for row in reversed(p0):
-        if (
-            row["event"] == "SelectionEvent"
-            and found_unit_target
-            and row["object"] in WORKERS
-        ):
-            if row["time"] > 2:
-                micro_score += 1
-            else:
-                split_score += 1
-
-        if (
-            row["event"] == "TargetPointCommandEvent"
-            or row["event"] == "UpdateTargetPointCommandEvent"
-        ):
-            continue
-        if row["event"] == "UpdateTargetUnitCommandEvent":
-            if "MineralField" in row["target"]:
-                found_unit_target = True
-                continue
-        else:
-            found_unit_target = False
-    return (split_score, micro_score)
+    return {sid: state.score for sid, state in states.items()}
@@ -1,8 +1,10 @@
 import logging
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, TypeVar, overload
+from typing import Any, Iterator
 
-from sc2reader.engine.plugins import ContextLoader, CreepTracker
+from sc2reader.engine import GameEngine
+from sc2reader.engine.plugins import ContextLoader, CreepTracker, GameHeartNormalizer
 from sc2reader_plugins import (
     APMTracker,
     EventSecondCorrector,
@@ -15,6 +17,7 @@ import sc2reader
 from log import DEFAULT_LOGGER_NAME
 from src.runtime.settings import Config, get_config
 
+from .cache import TypedReplayCache, file_sha256, reader_version
 from .plugins.ReplayStats import ReplayStats
 from .plugins.SpawningTool import SpawningTool
 from .types import Replay
@@ -22,50 +25,177 @@ from .types import Replay
 log = logging.getLogger(f"{DEFAULT_LOGGER_NAME}.{__name__}")
 
 
-sc2reader.engine.register_plugin(EventSecondCorrector())  # type: ignore
-sc2reader.engine.register_plugin(ContextLoader())  # type: ignore
-sc2reader.engine.register_plugin(APMTracker())  # type: ignore
-sc2reader.engine.register_plugin(CreepTracker())  # type: ignore
-sc2reader.engine.register_plugin(WorkerTracker())  # type: ignore
-sc2reader.engine.register_plugin(SQTracker())  # type: ignore
-sc2reader.engine.register_plugin(PlayerStatsTracker())  # type: ignore
+@dataclass(frozen=True)
+class ReaderProfile:
+    """Selects the sc2reader load level and plugins a ``ReplayReader`` runs.
+
+    Engine plugins are given as classes so every reader gets its own
+    instances. Only profiles with ``typed`` set produce replays that can be
+    converted with ``to_typed_replay``.
+    """
+
+    name: str
+    load_level: int = 4
+    engine_plugins: tuple[type, ...] = ()
+    replay_stats: bool = False
+    spawning_tool: bool = False
+    typed: bool = False
+
+
+FULL_PROFILE = ReaderProfile(
+    name="full",
+    engine_plugins=(
+        EventSecondCorrector,
+        ContextLoader,
+        APMTracker,
+        CreepTracker,
+        WorkerTracker,
+        SQTracker,
+        PlayerStatsTracker,
+    ),
+    replay_stats=True,
+    spawning_tool=True,
+    typed=True,
+)
+
+# The live coach never sends creep data to the LLM, so it skips CreepTracker.
+COACH_LIVE_PROFILE = ReaderProfile(
+    name="coach-live",
+    engine_plugins=tuple(
+        plugin for plugin in FULL_PROFILE.engine_plugins if plugin is not CreepTracker
+    ),
+    replay_stats=True,
+    spawning_tool=True,
+    typed=True,
+)
+
+# Details, attributes and players only: enough for the header filters.
+METADATA_ONLY_PROFILE = ReaderProfile(name="metadata-only", load_level=2)
+
+READER_PROFILES = {
+    profile.name: profile
+    for profile in (FULL_PROFILE, COACH_LIVE_PROFILE, METADATA_ONLY_PROFILE)
+}
+
+
+def get_reader_profile(profile: str | ReaderProfile) -> ReaderProfile:
+    if isinstance(profile, ReaderProfile):
+        return profile
+    try:
+        return READER_PROFILES[profile]
+    except KeyError:
+        raise ValueError(
+            f"Unknown reader profile {profile!r}, expected one of {sorted(READER_PROFILES)}"
+        ) from None
+
+
+def build_engine(profile: ReaderProfile) -> GameEngine | None:
+    if profile.load_level < 4:
+        return None
+    # sc2reader's default engine plugins come first, as with the global engine.
+    return GameEngine(
+        plugins=[
+            GameHeartNormalizer(),
+            ContextLoader(),
+            *(plugin() for plugin in profile.engine_plugins),
+        ]
+    )
 
 
 # DoubleCachedSC2Factory
 class ReplayReader:
     default_filters = []
 
-    def __init__(self, settings: Config | None = None):
+    def __init__(
+        self,
+        settings: Config | None = None,
+        profile: str | ReaderProfile = FULL_PROFILE,
+    ):
         self.settings = settings or get_config()
+        self.profile = get_reader_profile(profile)
+        self.engine = build_engine(self.profile)
         if self.settings.reader_cache_dir:
             self.factory = sc2reader.factories.DoubleCachedSC2Factory(
                 cache_dir=str(self.settings.reader_cache_dir), cache_max_size=1000
             )
         else:
             self.factory = sc2reader.factories.DictCachedSC2Factory(cache_max_size=1000)
-        self.factory.register_plugin("Replay", ReplayStats())  # type: ignore
-        self.factory.register_plugin(
-            "Replay",
-            SpawningTool(include_map_details=self.settings.include_map_details),  # type: ignore
-        )
-        self.default_filters = [
+        if self.profile.replay_stats:
+            self.factory.register_plugin("Replay", ReplayStats())  # type: ignore
+        if self.profile.spawning_tool:
+            self.factory.register_plugin(
+                "Replay",
+                SpawningTool(include_map_details=self.settings.include_map_details),  # type: ignore
+            )
+        self.replay_cache = None
+        if self.settings.replay_cache_dir and self.profile.typed:
+            self.replay_cache = TypedReplayCache(
+                self.settings.replay_cache_dir,
+                reader_version=reader_version(
+                    self.profile, self.settings.include_map_details
+                ),
+                max_bytes=self.settings.replay_cache_max_mb * 1024 * 1024,
+            )
+        self.header_filters = [
             lambda x: not self.is_ladder(x),
             self.is_archon_mode,
             self.is_instant_leave,
+        ]
+        self.default_filters = [
+            *self.header_filters,
             self.has_afk_player,
         ]
 
     def load_replay_raw(self, file_path: str | Path):
         if isinstance(file_path, Path):
             file_path = str(file_path)
-        replay = self.factory.load_replay(file_path)
+        replay = self.factory.load_replay(
+            file_path, load_level=self.profile.load_level, engine=self.engine
+        )
+
+        log.debug(f"Loaded {replay.filename} with profile {self.profile.name}")
+        return replay
+
+    def load_replay_header(self, file_path: str | Path):
+        """Load header, details, attributes and players only.
+
+        No game or tracker events are read and neither the engine nor the
+        factory plugins run, so this is cheap enough to decide the header
+        filters before committing to a full load.
+        """
+        if isinstance(file_path, Path):
+            file_path = str(file_path)
+        replay = self.factory.load_replay(
+            file_path,
+            load_level=METADATA_ONLY_PROFILE.load_level,
+            engine=None,
+            plugins=[],
+        )
 
-        log.debug(f"Loaded {replay.filename}")
+        log.debug(f"Loaded header of {replay.filename}")
         return replay
 
     def load_replay(self, file_path: str | Path) -> Replay:
+        if self.replay_cache is not None:
+            cached = self.get_cached_replay(file_sha256(file_path))
+            if cached is not None:
+                return cached
+        # Not cached here: no filter checked this replay, and ingest treats a
+        # cache hit as a replay that passed every filter
         return self.to_typed_replay(self.load_replay_raw(file_path))
 
+    def get_cached_replay(self, filehash: str | None) -> Replay | None:
+        if self.replay_cache is None or filehash is None:
+            return None
+        replay = self.replay_cache.get(filehash)
+        if replay is not None:
+            log.debug(f"Loaded {replay.filename} from replay cache")
+        return replay
+
+    def cache_replay(self, replay: Replay) -> None:
+        if self.replay_cache is not None:
+            self.replay_cache.put(replay)
+
     def is_ladder(self, replay):
         is_ladder = replay.game_type == "1v1" and replay.is_ladder is True
         log.debug(f"is_ladder: {is_ladder}")
@@ -90,10 +220,17 @@ class ReplayReader:
         log.debug(f"is_archon_mode: {is_archon_mode}")
         return is_archon_mode
 
+    def apply_header_filters(self, replay_header) -> bool:
+        return not any(f(replay_header) for f in self.header_filters)
+
     def apply_filters(self, replay, filters=[]):
         return not any(f(replay) for f in filters + self.default_filters)
 
     def to_typed_replay(self, replay_raw) -> Replay:
+        if not self.profile.typed:
+            raise ValueError(
+                f"Reader profile {self.profile.name!r} does not load enough data for a typed replay"
+            )
         replay_dict = replay_to_dict(replay_raw)
         return Replay(**replay_dict)
 
@@ -131,10 +268,6 @@ def replay_to_dict(replay) -> dict:
 
     players = list()
     for player in replay.players:
-        supply = getattr(player, "supply", None)
-        if supply is not None:
-            supply = convert_keys_to_strings(supply)
-
         max_creep_spread = getattr(player, "max_creep_spread", None)
         if type(max_creep_spread) is not tuple and max_creep_spread is not None:
             max_creep_spread = (0, 0)
@@ -142,10 +275,10 @@ def replay_to_dict(replay) -> dict:
         worker_stats = {
             "worker_micro": getattr(player, "worker_micro", None),
             "worker_split": getattr(player, "worker_split", None),
-            "worker_count": getattr(player, "worker_count", None),
-            "worker_trained": getattr(player, "worker_trained", None),
-            "worker_killed": getattr(player, "worker_killed", None),
-            "worker_lost": getattr(player, "worker_lost", None),
+            "worker_count": _str_keys(getattr(player, "worker_count", None)),
+            "worker_trained": _str_keys(getattr(player, "worker_trained", None)),
+            "worker_killed": _str_keys(getattr(player, "worker_killed", None)),
+            "worker_lost": _str_keys(getattr(player, "worker_lost", None)),
             "worker_trained_total": getattr(player, "worker_trained_total", None),
             "worker_killed_total": getattr(player, "worker_killed_total", None),
             "worker_lost_total": getattr(player, "worker_lost_total", None),
@@ -160,8 +293,8 @@ def replay_to_dict(replay) -> dict:
                 "clan_tag": getattr(player, "clan_tag", None),
                 "clock_position": getattr(player, "clock_position", None),
                 "color": player.color.__dict__ if hasattr(player, "color") else None,
-                "creep_spread_by_minute": getattr(
-                    player, "creep_spread_by_minute", None
+                "creep_spread_by_minute": _str_keys(
+                    getattr(player, "creep_spread_by_minute", None)
                 ),
                 "highest_league": getattr(player, "highest_league", None),
                 "name": getattr(player, "name", None),
@@ -177,9 +310,9 @@ def replay_to_dict(replay) -> dict:
                     if hasattr(player, "init_data")
                     else None
                 ),
-                "stats": getattr(player, "stats", None),
+                "stats": _player_stats(getattr(player, "stats", None)),
                 "sid": getattr(player, "sid", None),
-                "supply": supply,
+                "supply": getattr(player, "supply", None),
                 "toon_handle": getattr(player, "toon_handle", None),
                 "toon_id": getattr(player, "toon_id", None),
                 "uid": getattr(player, "uid", None),
@@ -189,33 +322,6 @@ def replay_to_dict(replay) -> dict:
             }
         )
 
-    # Build events into dictionary
-    events = list()
-    for event in replay.game_events:
-        events.append(
-            {
-                "ability_id": getattr(event, "ability_id", None),
-                "ability_link": getattr(event, "ability_link", None),
-                "ability_name": getattr(event, "ability_name", None),
-                "ability_type": getattr(event, "ability_type", None),
-                "control_group": getattr(event, "control_group", None),
-                "frame": getattr(event, "frame", None),
-                "hotkey": getattr(event, "hotkey", None),
-                "name": getattr(event, "name", None),
-                "player_pid": (
-                    getattr(event.player, "pid", None)
-                    if hasattr(event, "player")
-                    else None
-                ),
-                "second": getattr(event, "second", None),
-                "target_unit_type": getattr(event, "target_unit_type", None),
-                "target_unit_id": getattr(event, "target_unit_id", None),
-                "x": getattr(event, "x", None),
-                "y": getattr(event, "y", None),
-                "z": getattr(event, "z", None),
-            }
-        )
-
     # Consolidate replay metadata into dictionary
     replay_dict = {
         "id": replay.filehash,
@@ -255,28 +361,48 @@ def replay_to_dict(replay) -> dict:
         "versions": getattr(replay, "versions", None),
     }
 
-    return convert_keys_to_strings(replay_dict)
-
-
-T = TypeVar("T")
+    return replay_dict
 
 
-@overload
-def convert_keys_to_strings(d: Dict[Any, Any]) -> Dict[str, Any]: ...
+def iter_replay_events(replay) -> Iterator[dict]:
+    """Yield one dict per game event on demand.
 
-
-@overload
-def convert_keys_to_strings(d: List[Any]) -> List[Any]: ...
+    Event-level data is not part of the stored replay, so ``replay_to_dict``
+    does not materialize it; callers that need it iterate this lazily.
+    """
+    for event in replay.game_events:
+        yield {
+            "ability_id": getattr(event, "ability_id", None),
+            "ability_link": getattr(event, "ability_link", None),
+            "ability_name": getattr(event, "ability_name", None),
+            "ability_type": getattr(event, "ability_type", None),
+            "control_group": getattr(event, "control_group", None),
+            "frame": getattr(event, "frame", None),
+            "hotkey": getattr(event, "hotkey", None),
+            "name": getattr(event, "name", None),
+            "player_pid": (
+                getattr(event.player, "pid", None) if hasattr(event, "player") else None
+            ),
+            "second": getattr(event, "second", None),
+            "target_unit_type": getattr(event, "target_unit_type", None),
+            "target_unit_id": getattr(event, "target_unit_id", None),
+            "x": getattr(event, "x", None),
+            "y": getattr(event, "y", None),
+            "z": getattr(event, "z", None),
+        }
 
 
-@overload
-def convert_keys_to_strings(d: T) -> T: ...
+def _str_keys(d: dict | None) -> dict[str, Any] | None:
+    """Copy of a per-second or per-minute dict with the string keys Mongo needs."""
+    if d is None:
+        return None
+    return {str(k): v for k, v in d.items()}
 
 
-def convert_keys_to_strings(d):
-    if isinstance(d, dict):
-        return {str(k): convert_keys_to_strings(v) for k, v in d.items()}
-    elif isinstance(d, list):
-        return [convert_keys_to_strings(i) for i in d]
-    else:
-        return d
+def _player_stats(stats: dict | None) -> dict[str, Any] | None:
+    if stats is None:
+        return None
+    return {
+        name: _str_keys(value) if isinstance(value, dict) else value
+        for name, value in stats.items()
+    }
@@ -19,6 +19,7 @@ import bson
 import pydantic
 from pydantic import BaseModel, Field, ValidationError
 from pydantic_core import CoreSchema, core_schema
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from pyodmongo import DbModel, MainBaseModel
 
 from shared import REGION_MAP
@@ -302,6 +303,16 @@ class Replay(DbModel):
     versions: List[int] = []
 
     _collection: ClassVar = "replays"
+    _indexes: ClassVar = [
+        IndexModel([("players.name", ASCENDING), ("unix_timestamp", DESCENDING)]),
+        IndexModel(
+            [("players.toon_handle", ASCENDING), ("unix_timestamp", DESCENDING)]
+        ),
+        IndexModel([("filehash", ASCENDING)]),
+        IndexModel([("unix_timestamp", DESCENDING)]),
+        IndexModel([("map_name", ASCENDING), ("date", DESCENDING)]),
+        IndexModel([("date", DESCENDING)]),
+    ]
 
     def get_player(self, name: str, opponent: bool = False) -> Player:
         for player in self.players:
@@ -300,6 +300,8 @@ class Config(ApiSettings):
     bnet_cache_dir: Optional[DirectoryPath] = None
     include_map_details: bool = True
     reader_cache_dir: Optional[DirectoryPath] = None
+    replay_cache_dir: Optional[DirectoryPath] = None
+    replay_cache_max_mb: int = 1024
 
     twitch: TwitchConfig | None = None
 
@@ -16,6 +16,7 @@ from pydantic import BaseModel, ValidationError
 from pymongo import MongoClient
 from pytest_mock import MockerFixture
 
+from src.mapstats import record_map_stats
 from src.persistence.conversation_store import ConversationStore
 from src.persistence.database import MongoDatabase, MongoDatabaseConfig
 from src.persistence.replay_store import ReplayStore
@@ -201,6 +202,8 @@ def seeded_replay_mongo_container(
             seeded_replays.append(replay)
 
         assert seeded_replays
+        replay_store.ensure_indexes()
+        record_map_stats(seeded_replays, replay_store, settings=runtime_settings)
 
         yield SeededReplayMongoContainer(  # type: ignore[return-value]
             service=handle,
@@ -664,3 +664,54 @@ def test_append_conversation_item_assigns_server_order_and_rejects_path_mismatch
 
     assert ordered_items.status_code == 200
     assert [item["order"] for item in ordered_items.json()] == [0, 1]
+
+
+@pytest.mark.mongo
+def test_get_conversation_usage_sums_response_records(
+    mongo_database: MongoDatabase,
+    runtime_settings: Config,
+    replay_store: ReplayStore,
+    conversation_store: ConversationStore,
+    session_store: SessionStore,
+) -> None:
+    conversation = conversation_store.create_conversation(
+        trigger=AIConversationTrigger.twitch_chat,
+        metadata={"test_scope": "api_conversation_usage"},
+    )
+    for index, (input_tokens, cached_tokens) in enumerate([(1000, 0), (1200, 900)]):
+        conversation_store.save(
+            AIResponseRecord(
+                conversation=conversation.id,
+                response_id=f"resp-usage-{conversation.id}-{index}",
+                input_tokens=input_tokens,
+                cached_tokens=cached_tokens,
+                output_tokens=50,
+                total_cost=0.01,
+            )
+        )
+
+    api_app = importlib.import_module("src.api.app")
+    app = api_app.create_app(
+        settings_loader=lambda: runtime_settings,
+        persistence_builder=lambda _settings: PersistenceServices(
+            database=mongo_database,
+            replay_store=replay_store,
+            conversation_store=conversation_store,
+            session_store=session_store,
+        ),
+    )
+
+    with TestClient(app) as client:
+        usage = client.get(f"/api/conversations/{conversation.id}/usage")
+        missing = client.get("/api/conversations/0123456789abcdef01234567/usage")
+
+    assert usage.status_code == 200
+    assert usage.json() == {
+        "responses": 2,
+        "input_tokens": 2200,
+        "cached_tokens": 900,
+        "output_tokens": 100,
+        "total_cost": pytest.approx(0.02),
+        "cached_token_ratio": pytest.approx(900 / 2200),
+    }
+    assert missing.status_code == 404
@@ -1,20 +1,23 @@
 from __future__ import annotations
 
 import importlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from datetime import timedelta
 
 import pytest
 from fastapi.testclient import TestClient
 
+from src.mapstats import rebuild_map_stats
 from src.persistence.conversation_store import ConversationStore
 from src.persistence.runtime import PersistenceServices
 from src.persistence.session_store import SessionStore
 
 
-def _create_app(seeded_replay_mongo_container):
+def _create_app(seeded_replay_mongo_container, runtime_settings=None):
     api_app = importlib.import_module("src.api.app")
     database = seeded_replay_mongo_container.database
-    runtime_settings = seeded_replay_mongo_container.settings
+    runtime_settings = runtime_settings or seeded_replay_mongo_container.settings
     replay_store = seeded_replay_mongo_container.replay_store
 
     return api_app.create_app(
@@ -153,3 +156,58 @@ def test_get_map_stats_by_name_returns_404_when_filter_removes_all_grouped_resul
             "details": {"resource": "map-stats", "id": target_replay.map_name},
         }
     }
+
+
+@pytest.mark.mongo
+def test_concurrent_map_stats_requests_for_different_students_do_not_interleave(
+    seeded_replay_mongo_container,
+) -> None:
+    replays = seeded_replay_mongo_container.seeded_replays
+    base_settings = seeded_replay_mongo_container.settings
+    students = sorted(
+        {
+            (player.name, player.play_race)
+            for replay in replays
+            for player in replay.players
+        }
+    )[:4]
+    assert len(students) > 1
+    # Not at midnight, so the rest of the first day is aggregated from replays
+    min_date = min(replay.date for replay in replays) + timedelta(seconds=1)
+
+    expected = {}
+    apps = {}
+    for name, race in students:
+        settings = base_settings.model_copy(
+            update={
+                "student": base_settings.student.model_copy(
+                    update={"name": name, "race": race}
+                )
+            }
+        )
+        rebuild_map_stats(seeded_replay_mongo_container.replay_store, settings=settings)
+        apps[(name, race)] = _create_app(seeded_replay_mongo_container, settings)
+        expected[(name, race)] = _serialized_map_stats(
+            _expected_map_stats(
+                replays, student_name=name, student_race=race, min_date=min_date
+            )
+        )
+
+    with ExitStack() as stack:
+        clients = {
+            student: stack.enter_context(TestClient(app))
+            for student, app in apps.items()
+        }
+
+        def fetch(student: tuple[str, str]):
+            response = clients[student].get(
+                "/api/map-stats", params={"min_date": min_date.isoformat()}
+            )
+            return student, response.status_code, response.json()
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(fetch, list(clients) * 25))
+
+    for student, status_code, body in results:
+        assert status_code == 200
+        assert body == expected[student], student
@@ -54,6 +54,39 @@ def test_list_and_get_replays_use_replay_ids(
     assert fetched.json()["map_name"] == expected[0].map_name
 
 
+@pytest.mark.mongo
+def test_list_replays_cursor_pagination_walks_all_replays(
+    seeded_replay_mongo_container,
+) -> None:
+    app = _create_app(seeded_replay_mongo_container)
+    expected = sorted(
+        seeded_replay_mongo_container.seeded_replays,
+        key=lambda replay: (replay.date, replay.id),
+        reverse=True,
+    )
+
+    seen = []
+    with TestClient(app) as client:
+        params = {"pagination": "cursor", "docs_per_page": 1}
+        while True:
+            response = client.get("/api/replays", params=params)
+            assert response.status_code == 200
+            body = response.json()
+            assert "docs_quantity" not in body
+            seen.extend(doc["id"] for doc in body["docs"])
+            if body["next_cursor"] is None:
+                break
+            params["after"] = body["next_cursor"]
+
+        invalid = client.get(
+            "/api/replays", params={"after": "garbage", "pagination": "cursor"}
+        )
+
+    assert seen == [replay.id for replay in expected]
+    assert invalid.status_code == 400
+    assert invalid.json()["error"]["code"] == "invalid_cursor"
+
+
 @pytest.mark.mongo
 def test_replay_crud_and_query_cover_documented_replay_routes(
     seeded_replay_mongo_container,
@@ -0,0 +1,129 @@
+from datetime import datetime
+from unittest.mock import Mock
+
+from src.ai.aicoach import AICoach
+from src.ai.prompt import Templates
+from src.persistence.conversation_store import (
+    AIContentPart,
+    AIConversation,
+    AIConversationItem,
+    AIConversationItemType,
+    AIConversationTrigger,
+    AIMessageRole,
+)
+
+CONVERSATION_ID = "0123456789abcdef01234567"
+
+
+def _message(order: int, text: str) -> AIConversationItem:
+    return AIConversationItem(
+        conversation=CONVERSATION_ID,
+        type=AIConversationItemType.message,
+        order=order,
+        role=AIMessageRole.user,
+        content=[AIContentPart(text=text)],
+    )
+
+
+def _coach(items: list[AIConversationItem]) -> AICoach:
+    coach = object.__new__(AICoach)
+    coach.store = Mock()
+    coach.store.list_items.return_value = items
+    coach._input_conversation_id = None
+    coach._input_items = []
+    coach._input_item_count = 0
+    return coach
+
+
+def _conversation(item_count: int) -> AIConversation:
+    return AIConversation(
+        id=CONVERSATION_ID,
+        trigger=AIConversationTrigger.twitch_chat,
+        item_count=item_count,
+    )
+
+
+def test_assemble_input_extends_history_without_reloading():
+    coach = _coach([_message(0, "hello"), _message(1, "again")])
+    coach._rebuild_input(CONVERSATION_ID)
+
+    coach._track_item(
+        AIConversationItem(
+            conversation=CONVERSATION_ID,
+            type=AIConversationItemType.function_call,
+            order=2,
+            call_id="call-1",
+            name="QueryReplayDB",
+            arguments={},
+        )
+    )
+    input_items = coach._assemble_input(_conversation(item_count=3))
+
+    coach.store.list_items.assert_called_once_with(CONVERSATION_ID)
+    assert [item.get("content") for item in input_items] == ["hello", "again", None]
+    assert input_items[2]["call_id"] == "call-1"
+
+
+def test_assemble_input_reloads_history_appended_elsewhere():
+    coach = _coach([_message(0, "hello")])
+    coach._rebuild_input(CONVERSATION_ID)
+    coach.store.list_items.return_value = [_message(0, "hello"), _message(1, "api")]
+
+    input_items = coach._assemble_input(_conversation(item_count=2))
+
+    assert coach.store.list_items.call_count == 2
+    assert [item["content"] for item in input_items] == ["hello", "api"]
+
+
+def test_items_of_other_conversations_are_not_tracked():
+    coach = _coach([])
+    coach._rebuild_input(CONVERSATION_ID)
+
+    other = _message(0, "elsewhere")
+    other.conversation = "fedcba9876543210fedcba98"
+    coach._track_item(other)
+
+    assert coach._input_items == []
+    assert coach._input_item_count == 0
+
+
+def test_instructions_stay_identical_and_clock_trails_the_input(mocker):
+    coach = _coach([_message(0, "hello")])
+    coach.settings = Mock()
+    coach.settings.student.name = "Student"
+    conversation = _conversation(item_count=1)
+    conversation.handler_context = "Twitch chat"
+
+    instructions = coach._render_instructions(conversation)
+    mocker.patch("src.ai.aicoach.datetime").now.return_value = datetime(2030, 1, 1)
+    clock = coach._clock_input()
+
+    assert coach._render_instructions(conversation) == instructions
+    assert "Today is" not in instructions
+    assert clock["role"] == "developer"
+    assert clock["content"].startswith("Today is Tuesday, January 01, 2030")
+
+
+def test_static_instructions_render_once_per_student(mocker):
+    render = mocker.spy(Templates, "render")
+
+    first = Templates.render_static("initial_instructions.jinja2", student="Cached")
+    second = Templates.render_static("initial_instructions.jinja2", student="Cached")
+    other = Templates.render_static("initial_instructions.jinja2", student="Other")
+
+    assert first == second
+    assert '"Cached"' in first and '"Other"' in other
+    assert render.call_count == 2
+
+
+def test_added_messages_are_written_without_a_following_turn():
+    coach = _coach([])
+    coach.active_conversation_id = CONVERSATION_ID
+    coach.store.append_message.return_value = _message(0, "intro")
+
+    coach.add_message("intro", role="assistant")
+
+    coach.store.flush.assert_called_once_with(CONVERSATION_ID)
+    coach._tool_executor = Mock()
+    coach.close()
+    coach.store.flush.assert_called_with()
@@ -85,10 +85,14 @@ def test_get_response_assembles_full_history_and_persists_response(
         "Use the replay context when answering."
         in client.responses.calls[0]["instructions"]
     )
-    assert client.responses.calls[0]["input"] == [
+    assert "Today is" not in client.responses.calls[0]["instructions"]
+    *history, clock = client.responses.calls[0]["input"]
+    assert history == [
         {"role": "user", "content": "Seed context"},
         {"role": "user", "content": "What was the turning point?"},
     ]
+    assert clock["role"] == "developer"
+    assert clock["content"].startswith("Today is")
     assert [item.role.value for item in items if item.role is not None] == [
         "user",
         "user",
@@ -0,0 +1,124 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic, sleep
+from unittest.mock import Mock
+
+from src.ai.aicoach import AICoach
+
+
+class SlowTool:
+    def __init__(self, name: str, seconds: float):
+        self.name = name
+        self.seconds = seconds
+
+    def invoke(self, arguments):
+        sleep(self.seconds)
+        return {"tool": self.name, **arguments}
+
+
+def _coach(*tools, max_parallel_tools: int = 4, tool_timeout: float = 5.0):
+    coach = object.__new__(AICoach)
+    coach.store = Mock()
+    coach.functions = {tool.name: tool for tool in tools}
+    coach.max_parallel_tools = max_parallel_tools
+    coach.tool_timeout = tool_timeout
+    coach._tool_executor = ThreadPoolExecutor(max_workers=max_parallel_tools)
+    coach._input_conversation_id = None
+    return coach
+
+
+def _calls(*names: str):
+    return [
+        {"name": name, "call_id": f"call-{index}", "arguments": {"index": index}}
+        for index, name in enumerate(names)
+    ]
+
+
+def _outputs(coach):
+    return [
+        call.kwargs["output"]
+        for call in coach.store.append_function_call_output.call_args_list
+    ]
+
+
+def test_tool_calls_run_concurrently_and_persist_in_call_order():
+    coach = _coach(SlowTool("slow", 0.3), SlowTool("fast", 0.0))
+
+    start = monotonic()
+    coach._execute_function_calls("conversation", _calls("slow", "fast", "slow"))
+    elapsed = monotonic() - start
+
+    assert elapsed < 0.6
+    assert [json.loads(output) for output in _outputs(coach)] == [
+        {"tool": "slow", "index": 0},
+        {"tool": "fast", "index": 1},
+        {"tool": "slow", "index": 2},
+    ]
+    assert [
+        call.kwargs["call_id"]
+        for call in coach.store.append_function_call.call_args_list
+    ] == ["call-0", "call-1", "call-2"]
+
+
+def test_parallel_tools_are_capped():
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    class CountingTool:
+        name = "count"
+
+        def invoke(self, arguments):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            sleep(0.05)
+            with lock:
+                running -= 1
+            return "ok"
+
+    coach = _coach(CountingTool(), max_parallel_tools=2)
+    coach._execute_function_calls("conversation", _calls(*["count"] * 5))
+
+    assert peak == 2
+    assert _outputs(coach) == ["ok"] * 5
+
+
+def test_tool_past_its_timeout_reports_an_error():
+    coach = _coach(SlowTool("hang", 1.0), SlowTool("fast", 0.0), tool_timeout=0.1)
+
+    start = monotonic()
+    coach._execute_function_calls("conversation", _calls("hang", "fast", "unknown"))
+
+    assert monotonic() - start < 0.5
+    hang, fast, unknown = (json.loads(output) for output in _outputs(coach))
+    assert hang["error"] == "Tool hang timed out"
+    assert fast == {"tool": "fast", "index": 1}
+    assert unknown == {"error": "Unknown tool: unknown"}
+
+
+def test_tool_pool_is_shared_across_turns_and_stops_with_the_coach():
+    coach = _coach(SlowTool("hang", 0.5), max_parallel_tools=2, tool_timeout=0.05)
+
+    for _ in range(3):
+        coach._execute_function_calls("conversation", _calls("hang", "hang"))
+
+    assert len(coach._tool_executor._threads) == 2
+    hang = json.loads(_outputs(coach)[-1])
+    assert hang["error"] == "Tool hang timed out"
+
+    coach.close()
+    assert coach._tool_executor._shutdown
+
+
+def test_tool_timeout_runs_from_when_the_tool_starts():
+    coach = _coach(SlowTool("slow", 0.2), max_parallel_tools=1, tool_timeout=0.3)
+
+    coach._execute_function_calls("conversation", _calls("slow", "slow"))
+
+    assert [json.loads(output) for output in _outputs(coach)] == [
+        {"tool": "slow", "index": 0},
+        {"tool": "slow", "index": 1},
+    ]
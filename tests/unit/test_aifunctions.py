@@ -72,3 +72,76 @@ def test_function_meta_wrong_input():
 def test_clean_tag(tags, expected):
     result = get_clean_tags(tags)
     assert result == expected
+
+
+def test_query_replay_db_projects_and_trims_in_pipeline(mocker):
+    from src.ai.functions.QueryReplayDB import _query_replay_db
+
+    mocker.patch("src.ai.functions.QueryReplayDB.get_config")
+    replay_store = mocker.Mock()
+    replay_store.aggregate_replays.return_value = [{"map_name": "Hecate LE"}]
+
+    result = _query_replay_db(
+        filter='{"players.name": "Driftoss"}',
+        projection='{"map_name": 1, "players.build_order.name": 1}',
+        sort='{"game_length": -1}',
+        limit=3,
+        limit_time=120,
+        replay_store=replay_store,
+    )
+
+    assert result == [{"map_name": "Hecate LE"}]
+    replay_store.db.find_many.assert_not_called()
+    pipeline = replay_store.aggregate_replays.call_args.args[0]
+    assert pipeline[:3] == [
+        {"$match": {"players.name": "Driftoss"}},
+        {"$sort": {"game_length": -1}},
+        {"$limit": 3},
+    ]
+    trimmed = pipeline[3]["$set"]["players"]["$map"]["in"]["$mergeObjects"][1]
+    assert set(trimmed) == {"build_order", "abilities_used", "units_lost"}
+    time_filter = trimmed["units_lost"]["$cond"][1]["$filter"]
+    assert time_filter["cond"]["$lte"][1] == 120
+    assert {
+        "$project": {"map_name": 1, "players.build_order.name": 1, "_id": 0}
+    } in pipeline
+
+
+@pytest.mark.mongo
+def test_query_replay_db_pipeline_returns_projected_replays(
+    seeded_replay_mongo_container, mocker
+):
+    from src.ai.functions.QueryReplayDB import _query_replay_db
+    from src.util import time2secs
+
+    mocker.patch("src.ai.functions.QueryReplayDB.get_config")
+    seeded_replays = seeded_replay_mongo_container.seeded_replays
+    map_name = seeded_replays[0].map_name
+    expected = sorted(
+        (replay for replay in seeded_replays if replay.map_name == map_name),
+        key=lambda replay: replay.unix_timestamp,
+        reverse=True,
+    )[:2]
+
+    result = _query_replay_db(
+        filter=f'{{"map_name": "{map_name}"}}',
+        projection='{"id": 1, "map_name": 1, "players.name": 1, "players.build_order": 1}',
+        sort='{"unix_timestamp": -1}',
+        limit=2,
+        limit_time=120,
+        replay_store=seeded_replay_mongo_container.replay_store,
+    )
+
+    assert [document["id"] for document in result] == [replay.id for replay in expected]
+    for document, replay in zip(result, expected):
+        assert set(document) == {"id", "map_name", "players"}
+        assert document["map_name"] == map_name
+        assert [player["name"] for player in document["players"]] == [
+            player.name for player in replay.players
+        ]
+        for player in document["players"]:
+            assert set(player) == {"name", "build_order"}
+            assert player["build_order"]
+            for item in player["build_order"]:
+                assert time2secs(item["time"]) <= 120
+                assert item.get("is_chronoboosted", True) is True
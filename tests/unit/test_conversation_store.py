@@ -0,0 +1,121 @@
+from unittest.mock import MagicMock
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from src.persistence.conversation_store import (
+    AIConversation,
+    AIConversationItem,
+    AIConversationTrigger,
+    AIMessageRole,
+    ConversationStore,
+)
+
+CONVERSATION_ID = "0123456789abcdef01234567"
+
+
+@pytest.fixture
+def database():
+    database = MagicMock()
+    collections = {
+        AIConversation._collection: MagicMock(),
+        AIConversationItem._collection: MagicMock(),
+    }
+    database.raw.__getitem__.side_effect = collections.__getitem__
+    database.engine.find_one.side_effect = lambda Model, **_: (
+        AIConversation(id=CONVERSATION_ID, trigger=AIConversationTrigger.wake)
+        if Model is AIConversation
+        else None
+    )
+    return database
+
+
+def _items(database):
+    return database.raw[AIConversationItem._collection]
+
+
+def _conversations(database):
+    return database.raw[AIConversation._collection]
+
+
+def test_appended_items_are_buffered_until_flush(database):
+    store = ConversationStore(database)
+
+    store.append_message(CONVERSATION_ID, role=AIMessageRole.user, text="hello")
+    store.append_function_call(
+        CONVERSATION_ID, call_id="call-1", name="QueryReplayDB", arguments={}
+    )
+    output = store.append_function_call_output(
+        CONVERSATION_ID, call_id="call-1", output="{}"
+    )
+
+    # Looking up the conversation and its last order once, nothing written
+    assert database.engine.find_one.call_count == 2
+    _items(database).insert_many.assert_not_called()
+    assert output.order == 2
+    assert output.id is not None
+
+    assert store.flush(CONVERSATION_ID) == 3
+
+    (documents,), _ = _items(database).insert_many.call_args
+    assert [document["order"] for document in documents] == [0, 1, 2]
+    assert all(
+        document["conversation"] == ObjectId(CONVERSATION_ID) for document in documents
+    )
+    (query, update), _ = _conversations(database).update_one.call_args
+    assert query == {"_id": ObjectId(CONVERSATION_ID)}
+    assert update["$inc"] == {"item_count": 3}
+    assert update["$set"]["last_item_at"] == output.created_at
+
+    assert store.flush(CONVERSATION_ID) == 0
+    assert _items(database).insert_many.call_count == 1
+
+
+def test_reading_the_conversation_flushes_its_items(database):
+    store = ConversationStore(database)
+    store.append_message(CONVERSATION_ID, role=AIMessageRole.user, text="hello")
+
+    store.list_items(CONVERSATION_ID)
+
+    _items(database).insert_many.assert_called_once()
+    _conversations(database).update_one.assert_called_once()
+
+
+def test_flush_continues_after_items_of_another_writer(database):
+    store = ConversationStore(database)
+    first = store.append_message(CONVERSATION_ID, role=AIMessageRole.user, text="a")
+    second = store.append_message(CONVERSATION_ID, role=AIMessageRole.user, text="b")
+
+    _items(database).insert_many.side_effect = [
+        BulkWriteError(
+            {
+                "nInserted": 1,
+                "writeErrors": [{"index": 1, "code": 11000, "errmsg": "duplicate"}],
+            }
+        ),
+        None,
+    ]
+    database.engine.find_one.side_effect = lambda Model, **_: (
+        AIConversationItem.model_construct(order=4)
+        if Model is AIConversationItem
+        else None
+    )
+
+    assert store.flush(CONVERSATION_ID) == 2
+
+    (retried,), _ = _items(database).insert_many.call_args
+    assert [document["_id"] for document in retried] == [ObjectId(second.id)]
+    assert (first.order, second.order) == (0, 5)
+    next_item = store.append_message(CONVERSATION_ID, role=AIMessageRole.user, text="c")
+    assert next_item.order == 6
+
+
+def test_patch_conversation_runs_field_validators(database):
+    store = ConversationStore(database)
+    _conversations(database).find_one_and_update.return_value = None
+
+    assert store.patch_conversation(CONVERSATION_ID, {"metadata": None}) is None
+
+    _, update = _conversations(database).find_one_and_update.call_args.args
+    assert update[0]["$set"]["metadata"] == {"$literal": {}}
@@ -48,3 +48,20 @@ def test_invocation_adapter_rejects_extra_arguments():
                 "unexpected": True,
             }
         )
+
+
+def test_tool_definitions_are_generated_once(mocker):
+    class CachedArgs(BaseModel):
+        model_config = ConfigDict(extra="forbid")
+
+        query: str
+
+    to_schema = mocker.patch(
+        "src.ai.functions.base.to_strict_json_schema", return_value={"type": "object"}
+    )
+    tool = AIFunction(fn=lambda query: query, args_model=CachedArgs, name="Cached")
+    sibling = AIFunction(fn=lambda query: query, args_model=CachedArgs, name="Sibling")
+
+    assert tool.json() is tool.json()
+    assert sibling.json()["parameters"] is tool.json()["parameters"]
+    to_schema.assert_called_once_with(CachedArgs)
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import base64
+from datetime import datetime
+
+import bson
+import pytest
+from pydantic import BaseModel, Field
+
+from src.persistence.conversation_store import AIConversation
+from src.persistence.keyset import (
+    InvalidCursorError,
+    InvalidSortError,
+    decode_cursor,
+    encode_cursor,
+    find_cursor_page,
+    seek_query,
+)
+from src.replays.types import Replay
+
+
+class Doc(BaseModel):
+    id: str = Field(alias="_id")
+    date: datetime
+
+
+def test_cursor_round_trips_sort_values_and_id() -> None:
+    date = datetime(2024, 5, 1, 12, 30)
+    cursor = encode_cursor({"date": -1}, {"_id": "abc", "date": date})
+
+    assert decode_cursor({"date": -1}, cursor) == [date, "abc"]
+
+
+def test_cursor_rejects_other_sort_and_garbage() -> None:
+    cursor = encode_cursor({"date": -1}, {"_id": "abc", "date": datetime(2024, 5, 1)})
+
+    with pytest.raises(InvalidCursorError):
+        decode_cursor({"date": 1}, cursor)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor({"date": -1}, "not-a-cursor")
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        {"sort": [["date", -1], ["_id", -1]]},
+        {"sort": [["date", -1], ["_id", -1]], "values": "abc"},
+        {"sort": [["date", -1], ["_id", -1]], "values": [datetime(2024, 5, 1)]},
+        {"sort": "date", "values": [datetime(2024, 5, 1), "abc"]},
+        {"sort": [1, 2], "values": [datetime(2024, 5, 1), "abc"]},
+    ],
+)
+def test_cursor_rejects_forged_token(token) -> None:
+    cursor = base64.urlsafe_b64encode(bson.encode(token)).decode().rstrip("=")
+
+    with pytest.raises(InvalidCursorError):
+        decode_cursor({"date": -1}, cursor)
+
+
+def test_seek_query_continues_after_sort_key_and_id() -> None:
+    date = datetime(2024, 5, 1)
+
+    assert seek_query({"date": -1}, [date, "abc"]) == {
+        "$or": [
+            {"$or": [{"date": {"$lt": date}}, {"date": None}]},
+            {"date": date, "_id": {"$lt": "abc"}},
+        ]
+    }
+
+
+def test_seek_query_continues_after_null_sort_key() -> None:
+    closed_at = datetime(2024, 5, 1)
+
+    # Null sorts first: ascending continues with every non-null value
+    assert seek_query({"twitch_user": 1}, [None, "abc"]) == {
+        "$or": [
+            {"twitch_user": {"$ne": None}},
+            {"twitch_user": None, "_id": {"$gt": "abc"}},
+        ]
+    }
+    # and descending only with the remaining nulls
+    assert seek_query({"closed_at": -1}, [None, "abc"]) == {
+        "$or": [{"closed_at": None, "_id": {"$lt": "abc"}}]
+    }
+    assert seek_query({"closed_at": -1}, [closed_at, "abc"])["$or"][0] == {
+        "$or": [{"closed_at": {"$lt": closed_at}}, {"closed_at": None}]
+    }
+
+
+def test_cursor_page_of_nullable_sort_key_continues_past_null(mocker):
+    collection = mocker.Mock()
+    collection.find.return_value = iter(
+        [{"_id": "0123456789abcdef01234567", "trigger": "wake"}] * 2
+    )
+
+    page = find_cursor_page(
+        collection, AIConversation, {}, {"twitch_user": 1}, docs_per_page=1
+    )
+
+    assert decode_cursor({"twitch_user": 1}, page.next_cursor) == [
+        None,
+        "0123456789abcdef01234567",
+    ]
+
+
+@pytest.mark.parametrize("field", ["players", "players.name"])
+def test_find_cursor_page_rejects_array_sort_keys(mocker, field) -> None:
+    collection = mocker.Mock()
+
+    with pytest.raises(InvalidSortError):
+        find_cursor_page(collection, Replay, {}, {field: 1})
+
+    collection.find.assert_not_called()
+
+
+def test_find_cursor_page_fetches_one_extra_document_for_next_cursor(mocker):
+    documents = [
+        {"_id": str(index), "date": datetime(2024, 5, 10 - index)} for index in range(3)
+    ]
+    collection = mocker.Mock()
+    collection.find.return_value = iter(documents)
+
+    page = find_cursor_page(
+        collection, Doc, {"map_name": "Alcyone"}, {"date": -1}, docs_per_page=2
+    )
+
+    collection.find.assert_called_once_with(
+        {"map_name": "Alcyone"}, None, sort=[("date", -1), ("_id", -1)], limit=3
+    )
+    assert [doc.id for doc in page.docs] == ["0", "1"]
+    assert decode_cursor({"date": -1}, page.next_cursor) == [documents[1]["date"], "1"]
+
+    collection.find.return_value = iter(documents[2:])
+    last = find_cursor_page(
+        collection,
+        Doc,
+        {"map_name": "Alcyone"},
+        {"date": -1},
+        after=page.next_cursor,
+        docs_per_page=2,
+    )
+
+    query = collection.find.call_args.args[0]
+    assert query["$and"][0] == {"map_name": "Alcyone"}
+    assert query["$and"][1] == seek_query({"date": -1}, [documents[1]["date"], "1"])
+    assert [doc.id for doc in last.docs] == ["2"]
+    assert last.next_cursor is None
+
+
+def test_find_cursor_page_projection_keeps_sort_keys_and_skips_validation(mocker):
+    collection = mocker.Mock()
+    collection.find.return_value = iter(
+        [{"_id": "a", "map_name": "Alcyone", "date": datetime(2024, 5, 1)}]
+    )
+
+    page = find_cursor_page(
+        collection, Doc, {}, {"date": -1}, projection={"map_name": 1}
+    )
+
+    assert collection.find.call_args.args[1] == {
+        "map_name": 1,
+        "date": 1,
+        "_id": 1,
+    }
+    assert page.docs == [
+        {"id": "a", "map_name": "Alcyone", "date": datetime(2024, 5, 1)}
+    ]
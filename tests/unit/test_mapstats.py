@@ -1,17 +1,18 @@
 from __future__ import annotations
 
+import pytest
+
 from src.replays.types import Replay
 
 
 def test_matchups_by_map_aggregates_seeded_replays_in_fresh_container(
     seeded_replay_mongo_container,
 ):
-    from src.mapstats import MatchupsByMap, _configure_matchups_pipeline
+    from src.mapstats import MatchupsByMap, _map_stats_pipeline
 
     runtime_settings = seeded_replay_mongo_container.settings
     replay_store = seeded_replay_mongo_container.replay_store
     seeded_replays = seeded_replay_mongo_container.seeded_replays
-    _configure_matchups_pipeline(runtime_settings)
 
     expected_maps = sorted(
         {
@@ -29,11 +30,215 @@ def test_matchups_by_map_aggregates_seeded_replays_in_fresh_container(
     assert expected_maps
 
     for map_name in expected_maps:
-        maps: list[MatchupsByMap] = replay_store.db.find_many(
-            Model=MatchupsByMap,
-            query=Replay.map_name == map_name,
-        )
+        maps = [
+            MatchupsByMap(**document)
+            for document in replay_store.aggregate_replays(
+                [
+                    {"$match": {"map_name": map_name}},
+                    *_map_stats_pipeline(runtime_settings),
+                ]
+            )
+        ]
 
         assert len(maps) == 1, map_name
         assert maps[0].map == map_name
         assert maps[0].matchups, map_name
+
+
+def _settings(season_start=None):
+    from types import SimpleNamespace
+
+    return SimpleNamespace(
+        student=SimpleNamespace(name="Student", race="Zerg"),
+        season_start=season_start,
+    )
+
+
+def _replay(replay_id: str, date, result: str = "Win") -> Replay:
+    from src.replays.types import Player
+
+    return Replay.model_construct(
+        id=replay_id,
+        date=date,
+        map_name="Alcyone LE",
+        players=[
+            Player.model_construct(name="Opponent", play_race="Terran", result="Loss"),
+            Player.model_construct(name="Student", play_race="Zerg", result=result),
+        ],
+    )
+
+
+def test_record_map_stats_counts_student_games_per_day(mocker):
+    from datetime import datetime
+
+    from src.mapstats import record_map_stats
+
+    replay_store = mocker.Mock()
+    replay_store.increment_map_stats.return_value = 1
+    other = _replay("b" * 64, datetime(2024, 5, 1, 21, 5))
+    other.players[1].name = "Someone"
+
+    record_map_stats(
+        [_replay("a" * 64, datetime(2024, 5, 1, 21, 5)), other],
+        replay_store,
+        settings=_settings(),
+    )
+
+    (days,) = replay_store.increment_map_stats.call_args.args
+    assert [
+        day.model_dump(exclude={"id", "created_at", "updated_at"}) for day in days
+    ] == [
+        {
+            "student": "Student",
+            "race": "Zerg",
+            "map": "Alcyone LE",
+            "matchup": "ZergvTerran",
+            "day": datetime(2024, 5, 1),
+            "totalGames": 1,
+            "wins": 1,
+            "losses": 0,
+            "replays": ["a" * 64],
+        }
+    ]
+
+
+def test_map_stats_windows_sum_days_in_one_facet_and_partial_days_in_another(
+    mocker,
+):
+    from datetime import datetime
+
+    from src.mapstats import list_map_stats_windows
+
+    replay_store = mocker.Mock()
+    replay_store.aggregate_map_stats.return_value = [
+        {
+            "season": [
+                {
+                    "map": "Alcyone LE",
+                    "matchups": [
+                        {
+                            "matchup": "ZergvTerran",
+                            "totalGames": 3,
+                            "wins": 1,
+                            "losses": 2,
+                        },
+                        {
+                            "matchup": "ZergvProtoss",
+                            "totalGames": 1,
+                            "wins": 0,
+                            "losses": 1,
+                        },
+                    ],
+                }
+            ],
+            "today": [],
+        }
+    ]
+    replay_store.aggregate_replays.return_value = [
+        {
+            "season": [
+                {
+                    "map": "Alcyone LE",
+                    "matchups": [
+                        {
+                            "matchup": "ZergvTerran",
+                            "totalGames": 1,
+                            "wins": 1,
+                            "losses": 0,
+                        }
+                    ],
+                }
+            ]
+        }
+    ]
+
+    windows = list_map_stats_windows(
+        {"season": datetime(2024, 5, 1, 12), "today": datetime(2024, 6, 1)},
+        map_name="Alcyone LE",
+        replay_store=replay_store,
+        settings=_settings(),
+    )
+
+    (days_pipeline,) = replay_store.aggregate_map_stats.call_args.args
+    assert days_pipeline[0] == {
+        "$match": {"student": "Student", "race": "Zerg", "map": "Alcyone LE"}
+    }
+    facet = days_pipeline[1]["$facet"]
+    assert facet["season"][0] == {"$match": {"day": {"$gte": datetime(2024, 5, 2)}}}
+    assert facet["today"][0] == {"$match": {"day": {"$gte": datetime(2024, 6, 1)}}}
+
+    (replays_pipeline,) = replay_store.aggregate_replays.call_args.args
+    assert replays_pipeline[0] == {
+        "$match": {
+            "players.name": "Student",
+            "date": {"$gte": datetime(2024, 5, 1, 12), "$lt": datetime(2024, 5, 2)},
+            "map_name": "Alcyone LE",
+        }
+    }
+    assert list(replays_pipeline[1]["$facet"]) == ["season"]
+
+    (season,) = windows["season"]
+    assert [
+        (matchup.matchup, matchup.totalGames, matchup.wins, matchup.losses)
+        for matchup in season.matchups
+    ] == [("ZergvProtoss", 1, 0, 1), ("ZergvTerran", 4, 2, 2)]
+    assert windows["today"] == []
+
+
+@pytest.mark.mongo
+def test_rebuild_map_stats_matches_counts_recorded_on_ingest(
+    seeded_replay_mongo_container,
+):
+    from src.mapstats import list_map_stats, rebuild_map_stats, record_map_stats
+
+    settings = seeded_replay_mongo_container.settings
+    replay_store = seeded_replay_mongo_container.replay_store
+    seeded_replays = seeded_replay_mongo_container.seeded_replays
+
+    recorded = list_map_stats(replay_store=replay_store, settings=settings)
+    # Re-ingesting does not count replays twice
+    assert record_map_stats(seeded_replays, replay_store, settings=settings) == 0
+    assert list_map_stats(replay_store=replay_store, settings=settings) == recorded
+
+    games = rebuild_map_stats(replay_store, settings=settings)
+
+    assert games == sum(
+        1
+        for replay in seeded_replays
+        if any(player.name == settings.student.name for player in replay.players)
+    )
+    assert list_map_stats(replay_store=replay_store, settings=settings) == recorded
+
+
+def test_update_map_stats_renders_overlay_only_when_stats_key_changes(mocker, tmp_path):
+    from src import mapstats
+    from src.mapstats import Matchup, MatchupsByMap
+
+    settings = _settings()
+    settings.obs_dir = tmp_path
+    replay_store = mocker.Mock()
+    replay_store.get_latest_replay_id.return_value = "a" * 64
+    season = MatchupsByMap(
+        map="Alcyone LE",
+        matchups=[Matchup(matchup="ZergvTerran", totalGames=3, wins=2, losses=1)],
+    )
+    windows = mocker.patch.object(
+        mapstats,
+        "list_map_stats_windows",
+        return_value={"season": [season], "today": []},
+    )
+    overlay = tmp_path / "map_stats_obs.html"
+
+    mapstats.update_map_stats("Alcyone LE", replay_store, settings=settings)
+    rendered = overlay.read_text()
+    mapstats.update_map_stats("Alcyone LE", replay_store, settings=settings)
+
+    assert windows.call_count == 1
+    assert "<h1>Alcyone LE</h1>" in rendered
+    assert "<td>2-1</td>" in rendered
+    assert not overlay.with_suffix(".tmp").exists()
+
+    replay_store.get_latest_replay_id.return_value = "b" * 64
+    mapstats.update_map_stats("Alcyone LE", replay_store, settings=settings)
+
+    assert windows.call_count == 2
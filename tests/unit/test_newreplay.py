@@ -13,6 +13,7 @@ def test_process_new_file_logs_and_continues_on_player_identity_enrichment_failu
 
     replay = Replay.model_construct(id="a" * 64)
     reader = mocker.Mock()
+    reader.get_cached_replay.return_value = None
     reader.load_replay_raw.return_value = object()
     reader.apply_filters.return_value = True
     reader.to_typed_replay.return_value = replay
@@ -21,6 +22,7 @@ def test_process_new_file_logs_and_continues_on_player_identity_enrichment_failu
     replay_store = mocker.Mock()
     replay_store.upsert.return_value = SimpleNamespace(acknowledged=True)
     signal_put = mocker.patch.object(newreplay.signal_queue, "put")
+    record_map_stats = mocker.patch.object(newreplay, "record_map_stats")
 
     player_identity_enricher = mocker.Mock()
     player_identity_enricher.save_from_replay.side_effect = (
@@ -42,5 +44,8 @@ def test_process_new_file_logs_and_continues_on_player_identity_enrichment_failu
 
     signal_put.assert_called_once()
     assert signal_put.call_args.args[0].replay is replay
+    record_map_stats.assert_called_once_with(
+        [replay], replay_store, settings=runtime_settings
+    )
     assert "Failed to persist player identity" in caplog.text
     assert "KnownOpponent" in caplog.text
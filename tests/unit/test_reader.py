@@ -1,8 +1,17 @@
+from types import SimpleNamespace
+
 import pytest
 
 import sc2reader
+from src.replays.ingest import parse_replay_file
+from src.replays.plugins.APMTracker import APMTracker
 from src.replays.plugins.ReplayStats import is_gg, player_worker_micro
-from src.replays.reader import ReplayReader
+from src.replays.reader import (
+    FULL_PROFILE,
+    ReplayReader,
+    build_engine,
+    iter_replay_events,
+)
 from src.util import time2secs
 from tests.conftest import load_test_settings, only_in_debugging
 
@@ -205,11 +214,91 @@ def test_is_gg(message, expected):
     indirect=["replay_file"],
 )
 def test_replaystats_worker_micro(replay_file, expected):
-    replay = sc2reader.load_replay(replay_file)
+    # Worker micro is measured in real-time seconds, set by EventSecondCorrector
+    replay = sc2reader.load_replay(replay_file, engine=build_engine(FULL_PROFILE))
     micro = player_worker_micro(replay)
     assert micro == expected
 
 
+def test_iter_replay_events_is_lazy():
+    consumed = []
+
+    def game_events():
+        for second in range(3):
+            consumed.append(second)
+            yield SimpleNamespace(
+                name="SelectionEvent",
+                second=second,
+                player=SimpleNamespace(pid=1),
+            )
+
+    events = iter_replay_events(SimpleNamespace(game_events=game_events()))
+
+    first = next(events)
+
+    assert consumed == [0]
+    assert first["name"] == "SelectionEvent"
+    assert first["player_pid"] == 1
+    assert first["ability_id"] is None
+
+
+def test_worker_micro_counts_worker_selections_sent_to_minerals():
+    worker = SimpleNamespace(name="Drone")
+    mineral = SimpleNamespace(name="MineralField750")
+    player = SimpleNamespace(sid=0)
+
+    def event(name, second, **attrs):
+        return SimpleNamespace(name=name, second=second, player=player, **attrs)
+
+    replay = SimpleNamespace(
+        players=[player, SimpleNamespace(sid=1)],
+        game_events=[
+            event("SelectionEvent", 1, objects=[worker]),
+            event("TargetPointCommandEvent", 1),
+            event("UpdateTargetUnitCommandEvent", 1, target=mineral),
+            event("SelectionEvent", 5, objects=[worker]),
+            event("CameraEvent", 5),
+            event("UpdateTargetUnitCommandEvent", 5, target=mineral),
+            event("SelectionEvent", 8, objects=[worker]),
+            event("TargetUnitCommandEvent", 8),
+            event("UpdateTargetUnitCommandEvent", 8, target=mineral),
+            event("SelectionEvent", 40, objects=[worker]),
+            event("UpdateTargetUnitCommandEvent", 40, target=mineral),
+        ],
+    )
+
+    assert player_worker_micro(replay) == {0: (1, 1), 1: (0, 0)}
+
+
+def test_apm_tracker_counts_actions_per_second_and_minute():
+    def event(name, second):
+        return SimpleNamespace(name=name, second=second)
+
+    player = SimpleNamespace(
+        events=[
+            event("SelectionEvent", 1),
+            event("TargetPointCommandEvent", 1),
+            event("CameraEvent", 2),
+            event("SetControlGroupEvent", 61),
+            event("PlayerLeaveEvent", 90),
+        ]
+    )
+    idle = SimpleNamespace(events=[event("CameraEvent", 5)])
+    replay = SimpleNamespace(
+        players=[player, idle], length=SimpleNamespace(seconds=120)
+    )
+
+    APMTracker()(replay)
+
+    assert player.aps == {1: pytest.approx(2.8), 61: pytest.approx(1.4)}
+    assert player.apm == {0: pytest.approx(2.8), 1: pytest.approx(1.4)}
+    assert player.seconds_played == 90
+    assert player.avg_apm == pytest.approx(3 * 1.4 / 90 * 60)
+    assert idle.aps == {}
+    assert idle.seconds_played == 120
+    assert idle.avg_apm == 0
+
+
 @pytest.mark.parametrize(
     "replay_file",
     [
@@ -338,6 +427,55 @@ def test_afk_replay(replay_file):
     assert any([p.avg_apm == 0 for p in replay.players])
 
 
+@pytest.mark.parametrize(
+    "replay_file",
+    [
+        "Equilibrium LE (84).SC2Replay",
+        "Oxide LE (147) Archon Mode.SC2Replay",
+        "Amygdala (69) AFK player.SC2Replay",
+    ],
+    indirect=True,
+)
+def test_header_filters_match_full_load(replay_file):
+    reader = ReplayReader(settings=load_test_settings())
+
+    replay_header = reader.load_replay_header(replay_file)
+    replay_raw = reader.load_replay_raw(replay_file)
+
+    assert replay_header.game_events == []
+    assert replay_header.filehash == replay_raw.filehash
+    for header_filter, full_filter in zip(
+        reader.header_filters, reader.default_filters
+    ):
+        assert header_filter(replay_header) == full_filter(replay_raw)
+
+
+@pytest.mark.parametrize(
+    "replay_file",
+    [
+        "Equilibrium LE (84).SC2Replay",
+    ],
+    indirect=True,
+)
+def test_typed_replay_cache_skips_parsing(replay_file, tmp_path, monkeypatch):
+    settings = load_test_settings().model_copy(update={"replay_cache_dir": tmp_path})
+    reader = ReplayReader(settings=settings)
+
+    reader.load_replay(replay_file)
+    assert not list(tmp_path.glob("*/*.bson"))
+
+    replay = parse_replay_file(reader, replay_file).replay
+
+    def fail_parse(file_path):
+        raise AssertionError("cached replay was parsed again")
+
+    monkeypatch.setattr(reader, "load_replay_raw", fail_parse)
+    cached = reader.load_replay(replay_file)
+
+    assert cached == replay
+    assert list(tmp_path.glob("*/*.bson"))
+
+
 @pytest.mark.parametrize(
     "replay_file",
     [
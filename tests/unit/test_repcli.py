@@ -2,6 +2,7 @@ import importlib
 import logging
 import sys
 import types
+from pathlib import Path
 
 from click.testing import CliRunner
 
@@ -82,7 +83,8 @@ def test_build_runtime_constructs_persistence_explicitly(monkeypatch):
     monkeypatch.setattr(repcli, "load_runtime_settings", lambda: settings)
 
     class FakeReplayStore:
-        pass
+        def ensure_indexes(self):
+            calls.append(("indexes",))
 
     fake_replay_store = FakeReplayStore()
 
@@ -114,12 +116,22 @@ def test_build_runtime_constructs_persistence_explicitly(monkeypatch):
     fake_replays_types_module = types.ModuleType("src.replays.types")
     fake_replays_types_module.Replay = type("FakeReplay", (), {})
 
+    fake_manifest_module = types.ModuleType("src.replays.manifest")
+
+    class FakeReplayManifest:
+        def __init__(self, replay_store):
+            calls.append(("manifest", replay_store))
+            self.replay_store = replay_store
+
+    fake_manifest_module.ReplayManifest = FakeReplayManifest
+
     monkeypatch.setitem(
         sys.modules, "src.persistence.replay_store", fake_replay_store_module
     )
     monkeypatch.setitem(sys.modules, "src.persistence.runtime", fake_persistence_module)
     monkeypatch.setitem(sys.modules, "src.replays.reader", fake_reader_module)
     monkeypatch.setitem(sys.modules, "src.replays.types", fake_replays_types_module)
+    monkeypatch.setitem(sys.modules, "src.replays.manifest", fake_manifest_module)
     monkeypatch.setattr(
         repcli, "build_player_identity_services", build_player_identity_services
     )
@@ -129,10 +141,13 @@ def test_build_runtime_constructs_persistence_explicitly(monkeypatch):
     assert runtime.settings is settings
     assert calls == [
         ("persistence", settings),
+        ("indexes",),
         ("player_identity", settings, fake_replay_store),
         ("reader", settings),
+        ("manifest", fake_replay_store),
     ]
     assert runtime.replay_store is fake_replay_store
+    assert runtime.replay_manifest.replay_store is fake_replay_store
     assert runtime.player_identity_enricher is fake_player_identity_enricher
 
 
@@ -201,6 +216,18 @@ def test_add_student_flag_persists_student_player_record(monkeypatch):
         def __init__(self, settings=None):
             self.settings = settings
 
+        def load_replay_header(self, file_path):
+            return file_path
+
+        def apply_header_filters(self, replay_header):
+            return True
+
+        def get_cached_replay(self, filehash):
+            return None
+
+        def cache_replay(self, replay):
+            pass
+
         def load_replay_raw(self, file_path):
             return file_path
 
@@ -234,7 +261,7 @@ def test_add_student_flag_persists_student_player_record(monkeypatch):
 
     monkeypatch.setattr(repcli, "_get_runtime", lambda ctx: fake_runtime)
     monkeypatch.setattr(
-        repcli, "syncreplay", lambda ctx, replay, summary, runtime: None
+        repcli, "syncreplays", lambda ctx, replays, summary, runtime: set()
     )
 
     runner = CliRunner()
@@ -246,3 +273,242 @@ def test_add_student_flag_persists_student_player_record(monkeypatch):
 
     assert result.exit_code == 0
     assert [call["player_name"] for call in enricher_calls] == [None, student_name]
+
+
+def test_sync_with_workers_accounts_parsed_results_in_parent(monkeypatch, tmp_path):
+    sys.modules.pop("repcli", None)
+    repcli = importlib.import_module("repcli")
+    from src.replays.ingest import ReplayParseResult
+
+    accepted = types.SimpleNamespace(name="accepted-replay")
+    instant_leave_file = tmp_path / "instant-leave.SC2Replay"
+    instant_leave_file.write_bytes(b"")
+    archon_file = tmp_path / "archon.SC2Replay"
+    archon_file.write_bytes(b"")
+
+    parse_calls: list[dict] = []
+
+    def fake_parse_replay_files(file_paths, *, reader, workers):
+        parse_calls.append({"files": list(file_paths), "workers": workers})
+        yield ReplayParseResult(file_path="accepted.SC2Replay", replay=accepted)
+        yield ReplayParseResult(
+            file_path=str(instant_leave_file), is_instant_leave=True
+        )
+        yield ReplayParseResult(
+            file_path=str(archon_file), is_archon_mode=True, is_instant_leave=True
+        )
+
+    synced: list[object] = []
+    monkeypatch.setattr(repcli, "parse_replay_files", fake_parse_replay_files)
+    monkeypatch.setattr(
+        repcli,
+        "syncreplays",
+        lambda ctx, replays, summary, runtime: synced.extend(replays),
+    )
+    monkeypatch.setattr(repcli, "syncplayer", lambda *args: None)
+
+    fake_runtime = types.SimpleNamespace(reader=object(), replay_manifest=None)
+    ctx = types.SimpleNamespace(obj={"CLEAN": True, "ADD_STUDENT": False})
+    files = ["accepted.SC2Replay", str(instant_leave_file), str(archon_file)]
+
+    summary = repcli._sync(files, ctx, fake_runtime, workers=4)
+
+    assert parse_calls == [{"files": files, "workers": 4}]
+    assert synced == [accepted]
+    assert summary.total_replays == 3
+    assert summary.filtered_replays == 2
+    assert summary.instant_leave_replays == 1
+    assert summary.deleted_replays == 1
+    assert not instant_leave_file.exists()
+    assert archon_file.exists()
+
+
+def test_sync_skips_unchanged_replays_listed_in_manifest(monkeypatch, tmp_path):
+    sys.modules.pop("repcli", None)
+    repcli = importlib.import_module("repcli")
+    from src.replays.ingest import ReplayParseResult
+    from src.replays.manifest import ReplayManifest
+
+    class FakeReplayStore:
+        def __init__(self):
+            self.entries = {}
+            self.list_calls = 0
+
+        def list_manifest_entries(self, paths):
+            self.list_calls += 1
+            return [self.entries[path] for path in paths if path in self.entries]
+
+        def get_manifest_entry(self, path):
+            raise AssertionError("preloaded manifest should not query per file")
+
+        def save_manifest_entry(self, entry):
+            self.entries[entry.path] = entry
+            return entry
+
+    accepted_file = tmp_path / "accepted.SC2Replay"
+    accepted_file.write_bytes(b"accepted")
+    afk_file = tmp_path / "afk.SC2Replay"
+    afk_file.write_bytes(b"afk")
+    files = [str(accepted_file), str(afk_file)]
+
+    parse_calls: list[list[str]] = []
+
+    def fake_parse_replay_files(file_paths, *, reader, workers):
+        parse_calls.append(list(file_paths))
+        for file_path in file_paths:
+            if file_path == str(accepted_file):
+                yield ReplayParseResult(
+                    file_path=file_path,
+                    replay=types.SimpleNamespace(id="a" * 64),
+                    filehash="a" * 64,
+                )
+            else:
+                yield ReplayParseResult(file_path=file_path, has_afk_player=True)
+
+    monkeypatch.setattr(repcli, "parse_replay_files", fake_parse_replay_files)
+    monkeypatch.setattr(
+        repcli,
+        "syncreplays",
+        lambda ctx, replays, summary, runtime: {replay.id for replay in replays},
+    )
+    monkeypatch.setattr(repcli, "syncplayer", lambda *args: None)
+
+    replay_store = FakeReplayStore()
+
+    def run_sync():
+        runtime = types.SimpleNamespace(
+            reader=object(), replay_manifest=ReplayManifest(replay_store)
+        )
+        ctx = types.SimpleNamespace(
+            obj={"CLEAN": False, "ADD_STUDENT": False, "SIMULATION": False}
+        )
+        return repcli._sync(files, ctx, runtime)
+
+    first = run_sync()
+    second = run_sync()
+
+    assert parse_calls == [files, []]
+    assert first.unchanged_replays == 0
+    assert second.unchanged_replays == 1
+    assert second.filtered_replays == 1
+    assert second.afk_replays == 1
+    assert replay_store.list_calls == 2
+
+    afk_file.write_bytes(b"afk replay rewritten")
+    run_sync()
+
+    assert parse_calls[-1] == [str(afk_file)]
+
+
+def test_sync_rescan_parses_replays_listed_in_manifest(monkeypatch, tmp_path):
+    sys.modules.pop("repcli", None)
+    repcli = importlib.import_module("repcli")
+    from src.replays.ingest import ReplayParseResult
+    from src.replays.manifest import ReplayManifest
+
+    class FakeReplayStore:
+        def __init__(self):
+            self.entries = {}
+
+        def list_manifest_entries(self, paths):
+            return [self.entries[path] for path in paths if path in self.entries]
+
+        def save_manifest_entry(self, entry):
+            self.entries[entry.path] = entry
+            return entry
+
+    replay_file = tmp_path / "accepted.SC2Replay"
+    replay_file.write_bytes(b"accepted")
+
+    parse_calls: list[list[str]] = []
+
+    def fake_parse_replay_files(file_paths, *, reader, workers):
+        parse_calls.append(list(file_paths))
+        for file_path in file_paths:
+            yield ReplayParseResult(
+                file_path=file_path,
+                replay=types.SimpleNamespace(id="a" * 64),
+                filehash="a" * 64,
+            )
+
+    monkeypatch.setattr(repcli, "parse_replay_files", fake_parse_replay_files)
+    monkeypatch.setattr(
+        repcli,
+        "syncreplays",
+        lambda ctx, replays, summary, runtime: {replay.id for replay in replays},
+    )
+    monkeypatch.setattr(repcli, "syncplayer", lambda *args: None)
+
+    fake_runtime = types.SimpleNamespace(
+        settings=types.SimpleNamespace(replay_folder=str(tmp_path)),
+        reader=object(),
+        replay_manifest=ReplayManifest(FakeReplayStore()),
+    )
+    monkeypatch.setattr(repcli, "_get_runtime", lambda ctx: fake_runtime)
+
+    runner = CliRunner()
+    for args in (["sync"], ["sync"], ["sync", "--rescan"]):
+        result = runner.invoke(
+            repcli.cli,
+            [*args, "--from", "2000-01-01"],
+            obj={"CLEAN": False, "SIMULATION": False},
+            catch_exceptions=False,
+        )
+        assert result.exit_code == 0
+
+    assert parse_calls == [[str(replay_file)], [], [str(replay_file)]]
+
+
+def test_sync_rejects_afk_replay_echoed_before(monkeypatch, tmp_path):
+    sys.modules.pop("repcli", None)
+    repcli = importlib.import_module("repcli")
+    from src.replays.reader import ReplayReader
+    from tests.conftest import TESTDATA_DIR, load_test_settings
+
+    replay_folder = tmp_path / "replays"
+    replay_folder.mkdir()
+    afk_file = replay_folder / "afk.SC2Replay"
+    afk_file.write_bytes(
+        (
+            Path(TESTDATA_DIR) / "replays" / "Amygdala (69) AFK player.SC2Replay"
+        ).read_bytes()
+    )
+    settings = load_test_settings().model_copy(
+        update={"replay_folder": str(replay_folder), "replay_cache_dir": tmp_path}
+    )
+
+    synced: list = []
+    monkeypatch.setattr(
+        repcli,
+        "syncreplays",
+        lambda ctx, replays, summary, runtime: synced.extend(replays) or set(),
+    )
+    monkeypatch.setattr(repcli, "syncplayer", lambda *args: None)
+    filtered: list = []
+    sync_filtered = repcli._sync_filtered
+    monkeypatch.setattr(
+        repcli,
+        "_sync_filtered",
+        lambda ctx, parsed, summary: (
+            filtered.append(parsed) or sync_filtered(ctx, parsed, summary)
+        ),
+    )
+    fake_runtime = types.SimpleNamespace(
+        settings=settings,
+        reader=ReplayReader(settings=settings),
+        replay_manifest=None,
+    )
+    monkeypatch.setattr(repcli, "_get_runtime", lambda ctx: fake_runtime)
+
+    runner = CliRunner()
+    for args in (["echo", str(afk_file)], ["sync", "--from", "2000-01-01"]):
+        result = runner.invoke(
+            repcli.cli,
+            args,
+            obj={"CLEAN": False, "SIMULATION": False},
+            catch_exceptions=False,
+        )
+        assert result.exit_code == 0
+
+    assert synced == []
+    assert [parsed.has_afk_player for parsed in filtered] == [True]
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import queue
+from datetime import datetime, timedelta
+from typing import Any
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+from pymongo import MongoClient, monitoring
+
+from src.ai.functions.CastReplay import _cast_replay
+from src.mapstats import list_map_stats_windows
+from src.persistence.database import MongoDatabase
+from src.persistence.replay_store import ReplayStore
+from src.playerresolver import PlayerResolver
+from src.util import is_barcode
+
+EXPLAINED_COMMANDS = {"find", "aggregate"}
+
+
+class CommandRecorder(monitoring.CommandListener):
+    def __init__(self) -> None:
+        self.commands: list[dict[str, Any]] = []
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        if event.command_name in EXPLAINED_COMMANDS:
+            self.commands.append(dict(event.command))
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        pass
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        pass
+
+    def take(self) -> list[dict[str, Any]]:
+        commands, self.commands = self.commands, []
+        return commands
+
+
+def _plan_stages(plan: dict[str, Any]) -> set[str]:
+    stages = {plan["stage"]} if "stage" in plan else set()
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages |= _plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        stages |= _plan_stages(child)
+    return stages
+
+
+def _winning_stages(explain: dict[str, Any]) -> set[str]:
+    planner = explain.get("queryPlanner")
+    if planner is None:
+        planner = explain["stages"][0]["$cursor"]["queryPlanner"]
+    return _plan_stages(planner["winningPlan"])
+
+
+def _scans_everything(command: dict[str, Any]) -> bool:
+    """An unfiltered, unsorted read like the total count of a paginated list."""
+    if command.get("find"):
+        return not command.get("filter") and not command.get("sort")
+    stages = [next(iter(stage)) for stage in command["pipeline"]]
+    match = command["pipeline"][0].get("$match") if stages else None
+    return not match and "$sort" not in stages
+
+
+def _explain(client: MongoClient, command: dict[str, Any]) -> dict[str, Any]:
+    # Drop the session and driver fields the server does not accept in explain
+    db_name = command["$db"]
+    explained = {
+        key: value
+        for key, value in command.items()
+        if not key.startswith("$") and key not in {"lsid", "txnNumber"}
+    }
+    return client[db_name].command({"explain": explained, "verbosity": "queryPlanner"})
+
+
+@pytest.fixture
+def recorded_store(seeded_replay_mongo_container, monkeypatch):
+    """A replay store on the seeded database whose find and aggregate
+    commands are recorded."""
+    config = seeded_replay_mongo_container.database.config
+    recorder = CommandRecorder()
+    client = MongoClient(config.mongo_uri, event_listeners=[recorder])
+    database = MongoDatabase(config)
+    monkeypatch.setattr(database.engine, "_db", client[config.db_name])
+    yield ReplayStore(database), recorder, client
+    client.close()
+    database.close()
+
+
+@pytest.mark.mongo
+def test_replay_store_queries_use_indexes(
+    seeded_replay_mongo_container, recorded_store, monkeypatch
+) -> None:
+    replay_store, recorder, client = recorded_store
+    settings = seeded_replay_mongo_container.settings
+    replay = seeded_replay_mongo_container.seeded_replays[0]
+    # Barcode names are not resolved by name and send no query
+    player = next(player for player in replay.players if not is_barcode(player.name))
+    monkeypatch.setattr("src.ai.functions.CastReplay.signal_queue", queue.Queue())
+    resolver = PlayerResolver(
+        settings,
+        replay_store=replay_store,
+        sc2pulse=Mock(),
+        sc2client=Mock(),
+        portrait_source=Mock(),
+    )
+
+    calls = {
+        "get_most_recent_for_player": lambda: replay_store.get_most_recent_for_player(
+            player.name
+        ),
+        "get_latest_replay_id": lambda: replay_store.get_latest_replay_id(player.name),
+        "get_recent_for_player": lambda: replay_store.get_recent_for_player(
+            player.toon_handle
+        ),
+        "_cast_replay by filehash": lambda: _cast_replay(
+            replay.filehash, replay_store=replay_store
+        ),
+        "_cast_replay by unix timestamp": lambda: _cast_replay(
+            str(replay.unix_timestamp), replay_store=replay_store
+        ),
+        "list_replays": lambda: replay_store.list_replays(),
+        "list_map_stats_windows": lambda: list_map_stats_windows(
+            {
+                "season": replay.date - timedelta(days=30, hours=12),
+                "today": datetime.now(),
+            },
+            map_name=replay.map_name,
+            replay_store=replay_store,
+            settings=settings,
+        ),
+        "get_metadata_by_replay_id": lambda: replay_store.get_metadata_by_replay_id(
+            replay.id
+        ),
+        "resolve_player_with_portrait": lambda: resolver.resolve_player_with_portrait(
+            player.name, np.zeros((64, 64, 3), dtype=np.uint8)
+        ),
+        "_resolve_by_name": lambda: resolver._resolve_by_name(player.name),
+    }
+
+    for name, call in calls.items():
+        call()
+        commands = recorder.take()
+        assert commands, f"{name} sent no query"
+        for command in commands:
+            if _scans_everything(command):
+                continue
+            stages = _winning_stages(_explain(client, command))
+            assert "COLLSCAN" not in stages, (name, command)
+            assert "IXSCAN" in stages, (name, command)
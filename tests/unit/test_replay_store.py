@@ -1,8 +1,18 @@
+from datetime import datetime
 from types import SimpleNamespace
 
+import pytest
+from pydantic import ValidationError
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
 from pyodmongo.queries import eq, sort
 
-from src.persistence.replay_store import ReplayStore
+from src.persistence.replay_store import (
+    REPLAY_TABLE_PROJECTION,
+    MapStatsDay,
+    PlayerInfo,
+    ReplayStore,
+)
 from src.replays.types import Replay
 
 
@@ -45,6 +55,45 @@ def test_list_replays_uses_pyodmongo_pagination(mocker):
     )
 
 
+def test_list_replays_table_projection_returns_lean_documents(mocker):
+    stored = {
+        "_id": "b" * 64,
+        "map_name": "Acropolis",
+        "players": [{"name": "Maru", "play_race": "Terran", "result": "Win"}],
+    }
+    collection = mocker.Mock()
+    collection.count_documents.return_value = 21
+    collection.find.return_value = iter([stored])
+    database = SimpleNamespace(raw={"replays": collection})
+
+    response = ReplayStore(database).list_replays(
+        current_page=3,
+        docs_per_page=10,
+        map_name="Acropolis",
+        projection=REPLAY_TABLE_PROJECTION,
+    )
+
+    query = {"map_name": {"$regex": "Acropolis", "$options": "i"}}
+    collection.count_documents.assert_called_once_with(query)
+    collection.find.assert_called_once_with(
+        query,
+        REPLAY_TABLE_PROJECTION,
+        sort=[("date", -1)],
+        skip=20,
+        limit=10,
+    )
+    assert response.current_page == 3
+    assert response.page_quantity == 3
+    assert response.docs_quantity == 21
+    assert response.docs == [
+        {
+            "id": "b" * 64,
+            "map_name": "Acropolis",
+            "players": [{"name": "Maru", "play_race": "Terran", "result": "Win"}],
+        }
+    ]
+
+
 def test_get_replay_returns_pyodmongo_result_without_raw_fallback(mocker):
     expected = Replay.model_construct(id="c" * 64)
     engine = mocker.Mock()
@@ -131,3 +180,275 @@ def test_get_recent_for_player_queries_by_toon_handle_with_default_depth(mocker)
         raw_query={"players.toon_handle": "2-S2-1-6861867"},
         sort=sort((Replay.unix_timestamp, -1)),  # type: ignore[arg-type]
     )
+
+
+def test_bulk_upsert_reports_per_item_errors(mocker):
+    players = [
+        PlayerInfo(id=toon_handle, name=name, toon_handle=toon_handle)
+        for name, toon_handle in [
+            ("Maru", "2-S2-1-1000001"),
+            ("Serral", "2-S2-1-1000002"),
+            ("Clem", "2-S2-1-1000003"),
+        ]
+    ]
+    collection = mocker.Mock()
+    collection.bulk_write.side_effect = [
+        SimpleNamespace(
+            bulk_api_result={
+                "nMatched": 1,
+                "nModified": 1,
+                "nUpserted": 1,
+                "writeErrors": [],
+            }
+        ),
+        BulkWriteError(
+            {
+                "nMatched": 0,
+                "nModified": 0,
+                "nUpserted": 0,
+                "writeErrors": [{"index": 0, "code": 2, "errmsg": "bad document"}],
+            }
+        ),
+    ]
+    database = SimpleNamespace(raw={"players": collection})
+
+    store = ReplayStore(database)
+
+    result = store.bulk_upsert(players, batch_size=2)
+
+    assert collection.bulk_write.call_count == 2
+    operations, kwargs = (
+        collection.bulk_write.call_args_list[0].args[0],
+        collection.bulk_write.call_args_list[0].kwargs,
+    )
+    assert kwargs == {"ordered": False}
+    assert all(isinstance(operation, UpdateOne) for operation in operations)
+    assert operations[0]._filter == {"_id": "2-S2-1-1000001"}
+    assert operations[0]._doc["$set"]["name"] == "Maru"
+    assert "created_at" not in operations[0]._doc["$set"]
+    assert "created_at" in operations[0]._doc["$setOnInsert"]
+    assert result.matched_count == 1
+    assert result.upserted_count == 1
+    assert [(error.index, error.id) for error in result.errors] == [
+        (2, "2-S2-1-1000003")
+    ]
+    assert result.failed_ids == {"2-S2-1-1000003"}
+
+
+@pytest.mark.mongo
+def test_bulk_upsert_keeps_created_at_of_stored_documents(replay_store: ReplayStore):
+    toon_handle = "2-S2-1-1000009"
+    replay_store.bulk_upsert(
+        [PlayerInfo(id=toon_handle, name="First", toon_handle=toon_handle)]
+    )
+    collection = replay_store.database.raw[PlayerInfo._collection]
+    created = collection.find_one({"_id": toon_handle})
+
+    result = replay_store.bulk_upsert(
+        [PlayerInfo(id=toon_handle, name="Second", toon_handle=toon_handle)]
+    )
+    updated = collection.find_one({"_id": toon_handle})
+
+    assert result.matched_count == 1
+    assert updated["name"] == "Second"
+    assert updated["created_at"] == created["created_at"]
+    assert updated["updated_at"] >= created["updated_at"]
+
+
+def test_patch_player_sets_only_patched_fields(mocker):
+    toon_handle = "2-S2-1-1000001"
+    collection = mocker.Mock()
+    collection.find_one_and_update.return_value = {
+        "_id": toon_handle,
+        "name": "UpdatedName",
+        "toon_handle": toon_handle,
+        "tags": ["reviewed"],
+    }
+    database = SimpleNamespace(raw={"players": collection})
+
+    store = ReplayStore(database)
+
+    player = store.patch_player(
+        toon_handle,
+        {"id": toon_handle, "name": "UpdatedName", "tags": ["reviewed"]},
+    )
+
+    assert player is not None
+    assert player.name == "UpdatedName"
+    query, update = collection.find_one_and_update.call_args.args
+    assert query == {"_id": toon_handle}
+    assert set(update["$set"]) == {"name", "tags", "updated_at"}
+    assert update["$set"]["tags"] == ["reviewed"]
+    assert collection.find_one_and_update.call_args.kwargs == {
+        "return_document": ReturnDocument.AFTER
+    }
+
+
+def test_patch_replay_merges_nested_documents_with_dotted_paths(mocker):
+    collection = mocker.Mock()
+    collection.find_one_and_update.return_value = None
+    database = SimpleNamespace(raw={"replays": collection})
+
+    store = ReplayStore(database)
+
+    assert store.patch_replay("a" * 64, {"stats": {"loserDoesGG": True}}) is None
+    query, update = collection.find_one_and_update.call_args.args
+    assert query == {"_id": "a" * 64}
+    assert update["$set"]["stats.loserDoesGG"] is True
+    assert "stats" not in update["$set"]
+
+    with pytest.raises(ValidationError):
+        store.patch_replay("a" * 64, {"game_length": "long"})
+
+
+def test_get_replay_players_resolves_player_info_in_one_aggregation(mocker):
+    known, unknown = "2-S2-1-1000001", "2-S2-1-1000002"
+    collection = mocker.Mock()
+    collection.aggregate.return_value = iter(
+        [
+            {
+                "_id": "a" * 64,
+                "players": [
+                    {"name": "Known", "toon_handle": known},
+                    {"name": "Unknown", "toon_handle": unknown},
+                ],
+                "player_infos": [
+                    {"_id": known, "name": "Known", "toon_handle": known},
+                ],
+            }
+        ]
+    )
+    database = SimpleNamespace(raw={"replays": collection})
+    mocker.patch(
+        "src.persistence.replay_store.Player.model_validate",
+        side_effect=lambda player: SimpleNamespace(**player),
+    )
+
+    store = ReplayStore(database)
+
+    pairs = store.get_replay_players("a" * 64)
+
+    assert pairs is not None
+    assert [(player.name, info and info.name) for player, info in pairs] == [
+        ("Known", "Known"),
+        ("Unknown", None),
+    ]
+    collection.aggregate.assert_called_once()
+    lookup = collection.aggregate.call_args.args[0][-1]["$lookup"]
+    assert lookup["localField"] == "players.toon_handle"
+    assert lookup["pipeline"] == [
+        {
+            "$project": {
+                "portrait": 0,
+                "portrait_constructed": 0,
+                "aliases.portraits": 0,
+            }
+        }
+    ]
+
+
+def test_find_many_dict_streams_one_cursor(mocker):
+    cursor = mocker.MagicMock()
+    cursor.__enter__.return_value = iter([{"_id": "a"}, {"_id": "b"}])
+    collection = mocker.Mock()
+    collection.find.return_value = cursor
+    database = SimpleNamespace(raw={"replays": collection})
+
+    store = ReplayStore(database)
+
+    documents = store.find_many_dict(
+        Replay, raw_query={}, projection={"filename": 1}, batch_size=500
+    )
+
+    collection.find.assert_not_called()
+    assert [document["_id"] for document in documents] == ["a", "b"]
+    collection.find.assert_called_once_with({}, {"filename": 1}, batch_size=500)
+    cursor.__exit__.assert_called_once()
+
+
+def test_increment_map_stats_skips_replays_already_counted(mocker):
+    day = MapStatsDay(
+        student="Student",
+        race="Zerg",
+        map="Alcyone LE",
+        matchup="ZergvTerran",
+        day=datetime(2024, 5, 1),
+        totalGames=1,
+        wins=1,
+        replays=["a" * 64],
+    )
+    collection = mocker.Mock()
+    collection.bulk_write.side_effect = BulkWriteError(
+        {
+            "nModified": 0,
+            "nUpserted": 0,
+            "writeErrors": [{"index": 0, "code": 11000, "errmsg": "duplicate key"}],
+        }
+    )
+    store = ReplayStore(SimpleNamespace(raw={"map_stats": collection}))
+
+    assert store.increment_map_stats([day]) == 0
+
+    (operation,) = collection.bulk_write.call_args.args[0]
+    assert isinstance(operation, UpdateOne)
+    assert operation._filter == {
+        "student": "Student",
+        "day": datetime(2024, 5, 1),
+        "map": "Alcyone LE",
+        "matchup": "ZergvTerran",
+        "replays": {"$nin": ["a" * 64]},
+    }
+    assert operation._doc["$inc"] == {"totalGames": 1, "wins": 1, "losses": 0}
+    assert operation._upsert is True
+
+    collection.bulk_write.side_effect = BulkWriteError(
+        {
+            "nModified": 0,
+            "nUpserted": 0,
+            "writeErrors": [{"index": 0, "code": 2, "errmsg": "bad update"}],
+        }
+    )
+    with pytest.raises(BulkWriteError):
+        store.increment_map_stats([day])
+
+
+@pytest.mark.mongo
+def test_patch_and_delete_replay_move_its_map_stats(seeded_replay_mongo_container):
+    from src.mapstats import list_map_stats_windows, rebuild_map_stats
+
+    settings = seeded_replay_mongo_container.settings
+    replay_store = seeded_replay_mongo_container.replay_store
+    student = settings.student.name
+    replay = next(
+        replay
+        for replay in seeded_replay_mongo_container.seeded_replays
+        if (day := MapStatsDay.from_replay(replay, student)) is not None
+        and day.race == settings.student.race
+        and (day.wins or day.losses)
+    )
+
+    def all_stats():
+        return list_map_stats_windows(
+            {"all": None}, replay_store=replay_store, settings=settings
+        )["all"]
+
+    def rebuilt_stats():
+        rebuild_map_stats(replay_store, settings=settings)
+        return all_stats()
+
+    before = all_stats()
+    players = [player.model_dump() for player in replay.players]
+    for player in players:
+        if player["name"] == student:
+            player["result"] = "Loss" if player["result"] == "Win" else "Win"
+
+    assert replay_store.patch_replay(replay.id, {"players": players}) is not None
+    patched = all_stats()
+    assert patched != before
+    assert patched == rebuilt_stats()
+
+    assert replay_store.delete_replay(replay.id)
+    deleted = all_stats()
+    assert deleted != patched
+    assert deleted == rebuilt_stats()
+    assert not replay_store.aggregate_map_stats([{"$match": {"replays": replay.id}}])